@@ -1,73 +1,105 @@
-from django.shortcuts import get_object_or_404
-from django.db import transaction
-from django.http import HttpRequest
-from agro_linker.models.models import Product, Order, FarmerProfile
-from ...schemas import *
-from datetime import datetime
-from django.db.models import Q
-from ninja import Router
-from agro_linker.models.models import ChatMessage
-from .auth import AuthBearer
-import logging
-    
-
-router = Router(tags=["Chat"])
-logger = logging.getLogger(__name__)
-
-# ====================== ENDPOINTS ====================
-def get_user_profile(request: HttpRequest):
-    if hasattr(request.auth, 'farmer_profile'):
-        profile = request.auth.farmer_profile
-        return {
-            'id': str(profile.id),
-            'user_id': str(profile.user.id),
-            'location': profile.location,
-            'verification_status': profile.verification_status,
-            'created_at': profile.created_at,
-            'updated_at': profile.updated_at,
-            'profile_type': 'farmer',
-            'farm_size': profile.farm_size,
-            'company_name': None
-        }
-    elif hasattr(request.auth, 'buyer_profile'):
-        profile = request.auth.buyer_profile
-        return {
-            'id': str(profile.id),
-            'user_id': str(profile.user.id),
-            'location': profile.location,
-            'verification_status': profile.verification_status,
-            'created_at': profile.created_at,
-            'updated_at': profile.updated_at,
-            'profile_type': 'buyer',
-            'farm_size': None,
-            'company_name': profile.company_name
-        }
-    return None
-
-def get_chat_history(request: HttpRequest, user_id: str):
-    user_profile = get_user_profile(request)
-    if not user_profile:
-        return {'error': 'User profile not found'}, 404
-    
-    # Get chat history between current user and target user
-    chat_history = ChatMessage.objects.filter(
-        Q(sender=user_profile) | Q(receiver=user_profile),
-        Q(sender=user_id) | Q(receiver=user_id)
-    ).order_by('timestamp')
-    
-    return [ChatMessageOut.from_orm(msg) for msg in chat_history]       
-
-@router.post("/send_message", response=ChatMessageOut, auth=AuthBearer())
-def send_message(request: HttpRequest, payload: ChatMessageIn):
-    user_profile = get_user_profile(request)
-    if not user_profile:
-        return {'error': 'User profile not found'}, 404
-    
-    message = ChatMessage.objects.create(
-        sender=user_profile,
-        receiver=payload.receiver_id,
-        content=payload.content,
-        timestamp=datetime.now()
-    )   
-    return ChatMessageOut.from_orm(message)         
-
+from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.http import HttpRequest
+from agro_linker.models.models import Product, Order, FarmerProfile
+from ...schemas import *
+from django.db.models import Sum
+from ninja import Router
+from ninja.pagination import paginate
+from typing import List
+from agro_linker.models.models import ChatMessage, ChatRoom, ChatUnreadCounter, User
+from ninja.errors import HttpError
+from ...services import chat
+import logging
+    
+
+router = Router(tags=["Chat"])
+logger = logging.getLogger(__name__)
+
+# ====================== ENDPOINTS ====================
+def get_user_profile(request: HttpRequest):
+    if hasattr(request.auth, 'farmer_profile'):
+        profile = request.auth.farmer_profile
+        return {
+            'id': str(profile.id),
+            'user_id': str(profile.user.id),
+            'location': profile.location,
+            'verification_status': profile.verification_status,
+            'created_at': profile.created_at,
+            'updated_at': profile.updated_at,
+            'profile_type': 'farmer',
+            'farm_size': profile.farm_size,
+            'company_name': None
+        }
+    elif hasattr(request.auth, 'buyer_profile'):
+        profile = request.auth.buyer_profile
+        return {
+            'id': str(profile.id),
+            'user_id': str(profile.user.id),
+            'location': profile.location,
+            'verification_status': profile.verification_status,
+            'created_at': profile.created_at,
+            'updated_at': profile.updated_at,
+            'profile_type': 'buyer',
+            'farm_size': None,
+            'company_name': profile.company_name
+        }
+    return None
+
+@router.get("/history/{user_id}", response=List[ChatMessageOut])
+@paginate
+def get_chat_history(request: HttpRequest, user_id: str):
+    """Messages exchanged with another user, oldest first"""
+    # Messages of the rooms both users take part in
+    rooms = ChatRoom.objects.filter(participants=request.auth).filter(participants=user_id).values('pk')
+    return ChatMessage.objects.filter(room__in=rooms).order_by('timestamp')
+
+@router.get("/rooms", response=List[ChatInboxOut])
+@paginate
+def get_inbox(request: HttpRequest):
+    """The user's rooms with their unread counts, most recent first"""
+    return ChatUnreadCounter.objects.filter(user=request.auth).select_related('room').order_by('-last_message_at')
+
+@router.get("/unread", response=dict)
+def get_unread_count(request: HttpRequest):
+    """Unread messages over all the user's rooms"""
+    total = ChatUnreadCounter.objects.filter(user=request.auth).aggregate(total=Sum('unread_count'))['total']
+    return {'unread': total or 0}
+
+@router.get("/rooms/{room_id}/messages", response=List[ChatMessageOut])
+@paginate
+def get_room_messages(request: HttpRequest, room_id: int):
+    """A room's messages, newest first; follow next_cursor to scroll back"""
+    get_object_or_404(ChatRoom.objects.filter(participants=request.auth), pk=room_id)
+    return ChatMessage.objects.filter(room_id=room_id).order_by('-timestamp')
+
+@router.post("/rooms/{room_id}/read", response={200: dict, 404: dict})
+def mark_room_read(request: HttpRequest, room_id: int, payload: ChatReadIn):
+    """Read receipt up to a message; for clients without a WebSocket"""
+    get_object_or_404(ChatRoom.objects.filter(participants=request.auth), pk=room_id)
+    applied = chat.mark_read([(request.auth.pk, room_id, payload.up_to)])
+    if applied:
+        chat.publish(receipts=applied)
+    counter = ChatUnreadCounter.objects.filter(room_id=room_id, user=request.auth).first()
+    return {'unread_count': counter.unread_count if counter else 0, 'last_read_id': counter.last_read_id if counter else 0}
+
+@router.post("/send_message", response={201: ChatMessageOut, 400: dict, 404: dict})
+def send_message(request: HttpRequest, payload: ChatMessageIn):
+    """Send a direct message; for clients without a WebSocket (see agro_linker/consumer.py)"""
+    receiver = get_object_or_404(User, pk=payload.receiver_id)
+    if receiver.pk == request.auth.pk:
+        raise HttpError(400, "You cannot message yourself")
+    if not payload.content.strip() or len(payload.content) > chat.MAX_MESSAGE_LENGTH:
+        raise HttpError(400, f"Messages must have 1 to {chat.MAX_MESSAGE_LENGTH} characters")
+
+    with transaction.atomic():
+        room = (
+            ChatRoom.objects.filter(is_group=False, participants=request.auth)
+            .filter(participants=receiver).order_by('pk').first()
+        )
+        if room is None:
+            room = ChatRoom.objects.create()
+            room.participants.add(request.auth, receiver)
+        message, = chat.save_messages([(room.pk, request.auth.pk, payload.content)])
+        transaction.on_commit(lambda: chat.publish([message]))
+    return 201, message
@@ -1,3 +1,3 @@
-from . import auth, bid, chat, farm, market, microfinance, notification, orders, thrift_service, weather, whatsapp
-
-all_endpoints = [auth, bid, chat, farm, market, microfinance, notification, orders, thrift_service, weather, whatsapp]
+from . import auth, bid, chat, export, farm, market, microfinance, notification, orders, thrift_service, weather, whatsapp
+
+all_endpoints = [auth, bid, chat, export, farm, market, microfinance, notification, orders, thrift_service, weather, whatsapp]
@@ -1,96 +1,143 @@
-# agro_linker/api/v1/market.py
-from ninja import Router
-from django.http import HttpRequest
-from typing import List, Optional
-from agro_linker.schemas import *
-from .auth import AuthBearer
-from django.shortcuts import get_object_or_404
-from agro_linker.models.models import *
-from ...schemas import *
-
-
-router = Router(tags=["Marketplace"])
-
-# ====================== ENDPOINTS ======================
-@router.get("/products", response=List[ProductOut], summary="List all products")
-def list_products(
-    request: HttpRequest,
-    farmer_id: Optional[str] = None,
-    status: Optional[str] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None
-):
-    """
-    List all available products with optional filters:
-    - farmer_id: Filter by specific farmer
-    - status: Filter by product status
-    - min_price/max_price: Price range filtering
-    """
-    queryset = Product.objects.filter(status='ACTIVE').select_related('farmer')
-    
-    if farmer_id:
-        queryset = queryset.filter(farmer_id=farmer_id)
-    if status:
-        queryset = queryset.filter(status=status)
-    if min_price:
-        queryset = queryset.filter(price__gte=min_price)
-    if max_price:
-        queryset = queryset.filter(price__lte=max_price)
-        
-    return queryset.order_by('-created_at')
-
-@router.get("/products/{product_id}", response=ProductOut, summary="Get product details")
-def get_product(request: HttpRequest, product_id: str):
-    """Get detailed information about a specific product"""
-    return get_object_or_404(Product, id=product_id)
-
-@router.post("/products", response=ProductOut, auth=AuthBearer(), summary="Create new product")
-def create_product(request: HttpRequest, payload: ProductIn):
-    """Create a new product listing (Farmer only)"""
-    if not hasattr(request.auth, 'farmer_profile'):
-        return {'error': 'Only farmers can create products'}, 403
-    
-    product = Product.objects.create(
-        farmer=request.auth.farmer_profile,
-        **payload.dict()
-    )
-    return product
-
-@router.put("/products/{product_id}", response=ProductOut, auth=AuthBearer(), summary="Update product")
-def update_product(request: HttpRequest, product_id: str, payload: ProductUpdate):
-    """Update product information (Owner only)"""
-    product = get_object_or_404(Product, id=product_id)
-    
-    # Verify ownership
-    if product.farmer.user != request.auth:
-        return {'error': 'You can only update your own products'}, 403
-    
-    for attr, value in payload.dict(exclude_unset=True).items():
-        setattr(product, attr, value)
-    
-    product.save()
-    return product
-
-
-@router.post('/offers/bulk-discount')
-def request_bulk_discount(request, offer_id: int, min_quantity: float, discount: float):
-    # Validate quantity and apply dynamic pricing
-    offer = get_object_or_404(Offer, id=offer_id)
-    if offer.crop.quantity < min_quantity:
-        return {'error': 'Insufficient quantity'}, 400
-    
-    offer.bulk_discount = discount
-    offer.save()
-    return {'success': 'Bulk discount applied successfully'}
-
-@router.post('/offers/min-quantity')
-def request_min_quantity(request, offer_id: int, min_quantity: float):
-    # Validate quantity and apply dynamic pricing
-    offer = get_object_or_404(Offer, id=offer_id)
-    if offer.crop.quantity < min_quantity:
-        return {'error': 'Insufficient quantity'}, 400  
-
-    offer.min_quantity = min_quantity
-    offer.save()
-    return {'success': 'Minimum quantity applied successfully'}
-
+# agro_linker/api/v1/market.py
+from ninja import Router, Query
+from django.http import HttpRequest
+from typing import List, Optional
+from agro_linker.schemas import *
+from .auth import AuthBearer
+from django.shortcuts import get_object_or_404
+from agro_linker.models.models import *
+from ...schemas import *
+from ninja.pagination import paginate
+from .optimizations import cache_response
+from ...services import search as product_search
+from ...services import price_rollups
+from ninja.errors import HttpError
+from datetime import date
+
+
+router = Router(tags=["Marketplace"])
+
+# ====================== ENDPOINTS ======================
+@router.get("/products", response=List[ProductOut], summary="List all products")
+@cache_response(Product, ProductCategory)
+@paginate
+def list_products(
+    request: HttpRequest,
+    farmer_id: Optional[str] = None,
+    status: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None
+):
+    """
+    List all available products with optional filters:
+    - farmer_id: Filter by specific farmer
+    - status: Filter by product status
+    - min_price/max_price: Price range filtering
+    """
+    queryset = Product.objects.filter(status='ACTIVE').select_related('farmer', 'category')
+    
+    if farmer_id:
+        queryset = queryset.filter(farmer_id=farmer_id)
+    if status:
+        queryset = queryset.filter(status=status)
+    if min_price:
+        queryset = queryset.filter(price__gte=min_price)
+    if max_price:
+        queryset = queryset.filter(price__lte=max_price)
+        
+    return queryset.order_by('-created_at')
+
+@router.get("/products/search", response=ProductSearchOut, summary="Search products")
+@cache_response(Product, ProductCategory)
+def search_products(request: HttpRequest, filters: ProductSearchFilters = Query(...)):
+    """
+    Ranked full-text search over name, description, variety, category and
+    quality grade, with facet counts and typo tolerance:
+    - q: Search terms (misspelt terms are matched against the closest indexed terms)
+    - category/quality_grade/organic_certified/unit: Facet filters
+    - min_price/max_price: Price range filtering
+    """
+    params = filters.dict()
+    limit = min(params.pop('limit'), 100)
+    offset = params.pop('offset')
+    return product_search.search_products(limit=limit, offset=offset, **params)
+
+@router.get("/products/{product_id}", response=ProductOut, summary="Get product details")
+@cache_response(Product, ProductCategory)
+def get_product(request: HttpRequest, product_id: str):
+    """Get detailed information about a specific product"""
+    return get_object_or_404(Product, id=product_id)
+
+@router.get("/prices/{crop_type}/history", response=PriceSeriesOut, summary="Price history")
+@cache_response(PriceTrend, PriceRollup)
+def price_history(
+    request: HttpRequest,
+    crop_type: str,
+    start: date,
+    end: date,
+    market: Optional[str] = None,
+    resolution: Optional[str] = None,
+    points: Optional[int] = None,
+):
+    """
+    Min/avg/max prices of a crop between two dates, in one market or all:
+    - resolution: day, week, month or year; by default the finest giving at most `points` points
+    - Ranges are widened to whole periods
+    """
+    if start > end:
+        raise HttpError(400, "start is after end")
+    if resolution and resolution not in price_rollups.RESOLUTIONS:
+        raise HttpError(400, f"resolution must be one of {', '.join(price_rollups.RESOLUTIONS)}")
+    resolution, series = price_rollups.price_series(crop_type, start, end, market, resolution, points)
+    return {'crop_type': crop_type, 'market': market, 'resolution': resolution, 'points': series}
+
+@router.post("/products", response=ProductOut, auth=AuthBearer(), summary="Create new product")
+def create_product(request: HttpRequest, payload: ProductIn):
+    """Create a new product listing (Farmer only)"""
+    if not hasattr(request.auth, 'farmer_profile'):
+        return {'error': 'Only farmers can create products'}, 403
+    
+    product = Product.objects.create(
+        farmer=request.auth.farmer_profile,
+        **payload.dict()
+    )
+    return product
+
+@router.put("/products/{product_id}", response=ProductOut, auth=AuthBearer(), summary="Update product")
+def update_product(request: HttpRequest, product_id: str, payload: ProductUpdate):
+    """Update product information (Owner only)"""
+    product = get_object_or_404(Product, id=product_id)
+    
+    # Verify ownership
+    if product.farmer.user != request.auth:
+        return {'error': 'You can only update your own products'}, 403
+    
+    for attr, value in payload.dict(exclude_unset=True).items():
+        setattr(product, attr, value)
+    
+    product.save()
+    return product
+
+
+@router.post('/offers/bulk-discount')
+def request_bulk_discount(request, offer_id: int, min_quantity: float, discount: float):
+    # Validate quantity and apply dynamic pricing
+    offer = get_object_or_404(Offer, id=offer_id)
+    if offer.crop.quantity < min_quantity:
+        return {'error': 'Insufficient quantity'}, 400
+    
+    offer.bulk_discount = discount
+    offer.save()
+    return {'success': 'Bulk discount applied successfully'}
+
+@router.post('/offers/min-quantity')
+def request_min_quantity(request, offer_id: int, min_quantity: float):
+    # Validate quantity and apply dynamic pricing
+    offer = get_object_or_404(Offer, id=offer_id)
+    if offer.crop.quantity < min_quantity:
+        return {'error': 'Insufficient quantity'}, 400  
+
+    offer.min_quantity = min_quantity
+    offer.save()
+    return {'success': 'Minimum quantity applied successfully'}
+
@@ -1,28 +1,42 @@
-from ninja import Router
-from agro_linker.schemas import *
-from agro_linker.models.models import *
-from agro_linker.api import *
-from ninja import Router
-router = Router(tags=["Notification"])
-
-def notify_loan_update(loan: LoanApplication):
-    pass
-
-# def notify_contract_update(contract: Contract):
-#     pass
-
-# def notify_product_update(product: Product):
-#     pass
-
-
-# def notify_offer_update(offer: Offer):
-#     pass
-
-def notify_bid_update(bid: Bid):
-    pass        
-
-
-
-
-
-
+from ninja import Router
+from agro_linker.schemas import *
+from agro_linker.models.models import *
+from agro_linker.api import *
+from ninja import Router
+from agro_linker.services.notifications import enqueue
+router = Router(tags=["Notification"])
+
+# Notifications are only queued here; `manage.py dispatch_notifications` sends them
+
+def notify_loan_update(loan: LoanApplication):
+    """Tell the farmer their loan application changed status"""
+    return enqueue(
+        loan.farmer.user,
+        f"Your loan application {loan.reference_id} is now {loan.get_status_display()}.",
+        metadata={'event': 'loan_update', 'loan_id': loan.pk, 'subject': 'Loan application update'},
+    )
+
+# def notify_contract_update(contract: Contract):
+#     pass
+
+# def notify_product_update(product: Product):
+#     pass
+
+
+# def notify_offer_update(offer: Offer):
+#     pass
+
+def notify_bid_update(bid: Bid):
+    """Tell the farmer a bid was placed on their product"""
+    product = bid.product
+    return enqueue(
+        product.farmer.user,
+        f"New bid of {bid.amount} for {bid.quantity} {product.unit} of {product.name}.",
+        metadata={'event': 'bid_update', 'bid_id': bid.pk, 'product_id': str(product.pk), 'subject': 'New bid'},
+    )        
+
+
+
+
+
+
@@ -1,16 +1,154 @@
-# # api/optimizations.py
-# from ninja.operation import PathView
-# from django.core.cache import caches
-# from ninja import NinjaAPI
-# from django.conf import settings
-
-# class CachedAPI(NinjaAPI):
-#     def create_response(self, request, result, *, status=200):
-#         cache_key = f"api:{request.path}:{request.GET.urlencode()}"
-#         if request.method == "GET":
-#             if cached := caches["api"].get(cache_key):
-#                 return cached
-#             response = super().create_response(request, result, status=status)
-#             caches["api"].set(cache_key, response, 60*5)  # 5 min cache
-#             return response
-#         return super().create_response(request, result, status=status)
+# agro_linker/api/v1/optimizations.py
+"""
+Response caching for the v1 API.
+
+GET responses of operations decorated with ``cache_response`` are stored in
+the ``default`` (redis) cache and tagged with the models they are built from.
+Every tag carries a version number that is part of the cache key, so
+invalidating a tag is a single INCR: entries built against the old version are
+never read again and simply expire. Invalidation is triggered from model
+save/delete signals (see ``agro_linker/signals.py``).
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from ninja import NinjaAPI
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = getattr(settings, "API_CACHE_ALIAS", "default")
+DEFAULT_TIMEOUT = getattr(settings, "API_CACHE_TIMEOUT", 60 * 5)
+
+
+def model_tag(model):
+    """Cache tag for a model class (or an already computed tag string)"""
+    if isinstance(model, str):
+        return model
+    return model.__name__
+
+
+class ResponseCache:
+    """Tag-versioned store for rendered API responses"""
+
+    key_prefix = "api"
+
+    def __init__(self, alias=CACHE_ALIAS):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _tag_key(self, tag):
+        return f"{self.key_prefix}:tag:{tag}"
+
+    def tag_versions(self, tags):
+        """Current version of every tag, initialising missing ones"""
+        keys = {self._tag_key(tag): tag for tag in tags}
+        versions = self.cache.get_many(list(keys))
+        for key in keys:
+            if key not in versions:
+                # A fresh, time based version makes sure entries written
+                # before the tag key was evicted can never be served again.
+                self.cache.add(key, time.time_ns(), None)
+                versions[key] = self.cache.get(key)
+        return [versions[key] for key in sorted(keys)]
+
+    def key_for(self, request, tags):
+        """Cache key for a GET request, or None if the cache is unavailable"""
+        try:
+            versions = self.tag_versions(tags)
+        except Exception as e:
+            logger.warning(f"Response cache unavailable: {str(e)}")
+            return None
+        query = sorted(request.GET.lists())
+        raw = f"{request.path}?{query}|{sorted(tags)}|{versions}"
+        return f"{self.key_prefix}:response:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    def fetch(self, key):
+        try:
+            cached = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {str(e)}")
+            return None
+        if cached is None:
+            return None
+        status, content_type, content = cached
+        response = HttpResponse(content, status=status, content_type=content_type)
+        response["X-Cache"] = "HIT"
+        return response
+
+    def store(self, key, response, timeout=None):
+        entry = (response.status_code, response["Content-Type"], response.content)
+        try:
+            self.cache.set(key, entry, timeout or DEFAULT_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {str(e)}")
+
+    def invalidate(self, *models):
+        """Bump the version of each model tag, orphaning its cached responses"""
+        for model in models:
+            key = self._tag_key(model_tag(model))
+            try:
+                try:
+                    self.cache.incr(key)
+                except ValueError:
+                    self.cache.set(key, time.time_ns(), None)
+            except Exception as e:
+                logger.warning(f"Response cache invalidation failed for {key}: {str(e)}")
+
+    def invalidate_on_commit(self, *models):
+        """Invalidate once the surrounding transaction (if any) commits"""
+        transaction.on_commit(lambda: self.invalidate(*models))
+
+
+response_cache = ResponseCache()
+
+
+def cache_response(*models, timeout=None):
+    """
+    Cache the GET response of an operation, tagged with ``models``.
+
+    Only use on operations whose output does not depend on the caller; the
+    cache key is built from the path and query string alone.
+    """
+    tags = [model_tag(model) for model in models]
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method == "GET":
+                key = response_cache.key_for(request, tags)
+                if key is not None:
+                    cached = response_cache.fetch(key)
+                    if cached is not None:
+                        return cached
+                    # Picked up by CachedAPI.create_response once rendered
+                    request._response_cache_entry = (key, timeout)
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class CachedAPI(NinjaAPI):
+    """NinjaAPI that stores the rendered responses of ``cache_response`` operations"""
+
+    response_cache = response_cache
+
+    def create_response(self, request, data, *, status=None, temporal_response=None):
+        response = super().create_response(
+            request, data, status=status, temporal_response=temporal_response
+        )
+        entry = getattr(request, "_response_cache_entry", None)
+        if entry is not None and request.method == "GET" and response.status_code == 200:
+            key, timeout = entry
+            self.response_cache.store(key, response, timeout)
+        return response
@@ -1,131 +1,167 @@
-from ninja import NinjaAPI, Router, Schema, ModelSchema
-from ninja.security import HttpBearer
-from typing import List
-from django.db import transaction
-from django.shortcuts import get_object_or_404
-from agro_linker.models.models import *
-import logging
-from django.http import HttpRequest
-from django.contrib.auth import authenticate
-from datetime import datetime
-from agro_linker.models.models import *
-from agro_linker.schemas import *
-from ...schemas import *
-from .auth import *
-from .notification import *
-from .chat import *
-from .bid import *
-
-# ====================== API SETUP ======================
-router = Router(tags=["Orders"])    
-logger = logging.getLogger(__name__)
-
-
-
-# ====================== AUTH ======================
-class AuthBearer(HttpBearer):
-    def authenticate(self, request, token):
-        user = authenticate(request, token=token)
-        if user and (hasattr(user, 'farmer') or hasattr(user, 'buyer')):
-            return user
-        return None
-
-
-
-# ====================== ENDPOINTS ======================
-@router.get("/", response=List[OrderOut], auth=AuthBearer())
-def list_orders(request):
-    """List orders filtered by user role"""
-    user = request.auth
-    if hasattr(user, 'farmer'):
-        return Order.objects.filter(farmer=user.farmer).prefetch_related('items')
-    elif hasattr(user, 'buyer'):
-        return Order.objects.filter(buyer=user.buyer).prefetch_related('items')
-    return []
-
-@router.post("/", response={201: OrderOut, 400: dict}, auth=AuthBearer())
-@transaction.atomic
-def create_order(request, payload: List[OrderItemIn]):
-    """Create new order with items"""
-    try:
-        user = request.auth
-        order = Order.objects.create(
-            farmer=user.farmer if hasattr(user, 'farmer') else None,
-            buyer=user.buyer if hasattr(user, 'buyer') else None
-        )
-        
-        for item in payload:
-            product = get_object_or_404(Product, id=item.product_id)
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                quantity=item.quantity,
-                unit_price=product.price
-            )
-        
-        order.refresh_from_db()  # Calculate total_price
-        return 201, order
-    except Exception as e:
-        logger.error(f"Order creation failed: {str(e)}")
-        return 400, {"detail": "Order processing failed"}
-
-@router.post("/{order_id}/status", response={200: OrderOut, 400: dict}, auth=AuthBearer())
-def update_status(request, order_id: int, payload: StatusUpdate):
-    """Update order status with validation"""
-    order = get_object_or_404(Order, id=order_id)
-    
-    # Verify ownership
-    user = request.auth
-    if (hasattr(user, 'farmer') and order.farmer != user.farmer) or \
-       (hasattr(user, 'buyer') and order.buyer != user.buyer):
-        return 403, {"detail": "Not authorized"}
-    
-    order.status = payload.status
-    order.save()
-    return 200, order
-
-@router.post("/{order_id}/items", response={201: OrderItemOut, 400: dict}, auth=AuthBearer())
-def add_item(request, order_id: int, payload: OrderItemIn):
-    """Add item to existing order"""
-    order = get_object_or_404(Order, id=order_id)
-    
-    # Verify ownership
-    user = request.auth
-    if not hasattr(user, 'buyer') or order.buyer != user.buyer:
-        return 403, {"detail": "Only order buyer can add items"}
-    
-    try:
-        product = Product.objects.get(id=payload.product_id)
-        item = OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=payload.quantity,
-            unit_price=product.price
-        )
-        order.refresh_from_db()  # Recalculate total
-        return 201, item
-    except Product.DoesNotExist:
-        return 404, {"detail": "Product not found"}
-    
-
-@router.post("/orders/{order_id}/accept", response=OrderOut, auth=AuthBearer(), summary="Accept order")
-def accept_order(request: HttpRequest, order_id: str):
-    """Accept an order (Farmer only)"""
-    order = get_object_or_404(Order, id=order_id)
-    
-    # Verify ownership
-    if order.bid.product.farmer.user != request.auth:
-        return {'error': 'You can only accept orders for your products'}, 403
-    
-    order.status = 'ACCEPTED'
-    order.save()
-    
-    # Update product quantity
-    product = order.bid.product
-    product.quantity -= order.bid.quantity
-    if product.quantity <= 0:
-        product.status = 'SOLD'
-    product.save()
-    
-    return order
-
+from ninja import NinjaAPI, Router, Schema, ModelSchema
+from ninja.pagination import paginate
+from ...services import inventory, ordering
+from typing import List
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from agro_linker.models.models import *
+import logging
+from django.http import HttpRequest
+from datetime import datetime
+from agro_linker.models.models import *
+from agro_linker.schemas import *
+from ...schemas import *
+from .auth import *
+from .notification import *
+from .chat import *
+from .bid import *
+
+# ====================== API SETUP ======================
+router = Router(tags=["Orders"])    
+logger = logging.getLogger(__name__)
+
+
+
+# ====================== OWNERSHIP ======================
+# Endpoints authenticate with the API-wide key; roles come from the profiles
+
+def _farmer_products(order, user):
+    """Ids of the order's products that belong to ``user``'s farm"""
+    farmer = getattr(user, 'farmer_profile', None)
+    if farmer is None:
+        return set()
+    if order.bid_id:
+        return {order.bid.product_id} if order.bid.product.farmer_id == farmer.pk else set()
+    return set(order.items.filter(product__farmer=farmer).values_list('product_id', flat=True))
+
+def _is_buyer(order, user):
+    buyer = getattr(user, 'buyer_profile', None)
+    if buyer is not None and order.buyer_id == buyer.pk:
+        return True
+    # Orders matched from an offer before they carried the buyer's profile
+    return order.bid_id is not None and order.bid.buyer_id == user.pk
+
+
+
+# ====================== ENDPOINTS ======================
+@router.get("/", response=List[OrderOut])
+@paginate
+def list_orders(request):
+    """List orders filtered by user role, newest first"""
+    user = request.auth
+    orders = Order.objects.select_related('bid').prefetch_related('items')
+    if hasattr(user, 'farmer_profile'):
+        return orders.filter(
+            Q(bid__product__farmer=user.farmer_profile) | Q(items__product__farmer=user.farmer_profile)
+        ).distinct().order_by('-created_at')
+    elif hasattr(user, 'buyer_profile'):
+        return orders.filter(Q(buyer=user.buyer_profile) | Q(bid__buyer=user)).order_by('-created_at')
+    return []
+
+def _order_errors(error):
+    return {
+        "detail": "Order processing failed",
+        "errors": [vars(line) for line in error.errors],
+    }
+
+@router.post("/", response={201: OrderOut, 400: OrderErrorsOut, 403: dict})
+def create_order(request, payload: List[OrderItemIn]):
+    """Create new order with items"""
+    user = request.auth
+    if not hasattr(user, 'buyer_profile'):
+        return 403, {"detail": "Only buyers can place orders"}
+    try:
+        order, = ordering.create_orders(
+            user.buyer_profile, [[(item.product_id, item.quantity) for item in payload]]
+        )
+    except ordering.OrderValidationError as e:
+        logger.info(f"Order rejected for buyer {user.pk}: {str(e)}")
+        return 400, _order_errors(e)
+    except inventory.InsufficientStock as e:
+        return 400, {"detail": str(e)}
+    return 201, order
+
+@router.post("/batch", response={201: List[OrderOut], 400: OrderErrorsOut, 403: dict})
+def create_orders_batch(request, payload: BatchOrderIn):
+    """
+    Create many orders at once (wholesalers, processors and exporters).
+    All orders are created or none: every invalid line is reported with its
+    order and line index.
+    """
+    user = request.auth
+    buyer = getattr(user, 'buyer_profile', None)
+    if buyer is None or buyer.business_type not in ('wholesaler', 'processor', 'exporter'):
+        return 403, {"detail": "Batch ordering is available to wholesale buyers only"}
+    try:
+        orders = ordering.create_orders(
+            buyer, [[(item.product_id, item.quantity) for item in cart.items] for cart in payload.orders]
+        )
+    except ordering.OrderValidationError as e:
+        logger.info(f"Batch order rejected for buyer {user.pk}: {str(e)}")
+        return 400, _order_errors(e)
+    except inventory.InsufficientStock as e:
+        return 400, {"detail": str(e)}
+    return 201, orders
+
+@router.post("/{order_id}/status", response={200: OrderOut, 400: dict, 403: dict})
+def update_status(request, order_id: int, payload: StatusUpdate):
+    """Update an order's payment status (its buyer or one of its farmers)"""
+    order = get_object_or_404(Order.objects.select_related('bid__product'), id=order_id)
+    
+    # Verify ownership
+    user = request.auth
+    if not _is_buyer(order, user) and not _farmer_products(order, user):
+        return 403, {"detail": "Not authorized"}
+    if payload.status not in Order.PaymentStatus.values:
+        return 400, {"detail": f"Unknown status {payload.status}"}
+    
+    order.payment_status = payload.status
+    order.save(update_fields=['payment_status', 'updated_at'])
+    return 200, order
+
+@router.post("/{order_id}/items", response={201: OrderItemOut, 400: dict, 403: dict, 404: dict})
+def add_item(request, order_id: int, payload: OrderItemIn):
+    """Add item to existing order"""
+    order = get_object_or_404(Order.objects.select_related('bid'), id=order_id)
+    
+    # Verify ownership
+    user = request.auth
+    if not _is_buyer(order, user):
+        return 403, {"detail": "Only order buyer can add items"}
+    if order.bid_id:
+        return 400, {"detail": "Orders from an offer have no items"}
+    
+    try:
+        product = Product.objects.get(id=payload.product_id)
+        item = OrderItem.objects.create(
+            order=order,
+            product=product,
+            quantity=payload.quantity,
+            unit_price=product.price
+        )
+        return 201, item
+    except Product.DoesNotExist:
+        return 404, {"detail": "Product not found"}
+    
+
+@router.post("/orders/{order_id}/accept", response={200: OrderOut, 403: dict, 409: dict}, summary="Accept order")
+def accept_order(request: HttpRequest, order_id: str):
+    """
+    Accept an order (Farmer only). A farmer accepts the items of their own
+    products; the other farmers of a cart accept theirs separately.
+    """
+    order = get_object_or_404(Order.objects.select_related('bid__product'), id=order_id)
+    
+    # Verify ownership
+    product_ids = _farmer_products(order, request.auth)
+    if not product_ids:
+        return 403, {'detail': 'You can only accept orders for your products'}
+    
+    # Takes the order's holds, or the quantity straight from stock, under a
+    # lock on the product rows only
+    try:
+        inventory.commit_order(order, product_ids)
+    except inventory.InsufficientStock as e:
+        return 409, {'detail': str(e)}
+    
+    return 200, order
@@ -0,0 +1,154 @@
+# agro_linker/api/v1/pagination.py
+"""
+Keyset (cursor) pagination for the v1 API.
+
+Instead of an OFFSET, every page after the first is fetched with a WHERE
+clause seeking past the last row of the previous page on the queryset's
+ordering (``-created_at``, ``-date``, ``timestamp``...) plus the primary key
+as a tie-breaker, so page 200 costs the same index scan as page 1.
+
+The position is handed to clients as an opaque ``next_cursor``, signed with
+SECRET_KEY so it cannot be forged or edited, and bound to the endpoint it was
+issued for.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional
+from uuid import UUID
+
+from django.core import signing
+from django.db.models import F, Q, QuerySet
+from ninja import Field, Schema
+from ninja.conf import settings
+from ninja.errors import HttpError
+from ninja.pagination import PaginationBase
+
+CURSOR_SALT = "agro_linker.api.v1.pagination"
+
+
+def _ordering(queryset):
+    """Ordering of ``queryset`` as (field, descending) pairs, ending on the pk"""
+    order_by = list(queryset.query.order_by or queryset.model._meta.ordering or [])
+    ordering = []
+    for field in order_by:
+        if isinstance(field, F):
+            field = field.name
+        elif not isinstance(field, str):
+            raise TypeError(f"Cursor pagination cannot order by expression {field!r}")
+        descending = field.startswith('-')
+        name = field.lstrip('-')
+        if name == 'pk':
+            name = queryset.model._meta.pk.name
+        ordering.append((name, descending))
+    pk_name = queryset.model._meta.pk.name
+    if pk_name not in {name for name, _ in ordering}:
+        # The pk follows the direction of the last field so the seek stays one index range
+        ordering.append((pk_name, ordering[-1][1] if ordering else False))
+    return ordering
+
+
+def _value(obj, name):
+    for attr in name.split('__'):
+        obj = getattr(obj, attr)
+    if hasattr(obj, 'pk') and not isinstance(obj, (date, datetime)):
+        obj = obj.pk
+    return obj
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _seek_filter(ordering, values):
+    """
+    Rows strictly after ``values`` in ``ordering``:
+    (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+    """
+    condition = Q()
+    equal = {}
+    for (name, descending), value in zip(ordering, values):
+        lookup = 'lt' if descending else 'gt'
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+
+class CursorPagination(PaginationBase):
+    """
+    ?limit=N&cursor=<next_cursor of the previous page>
+
+    Pages are returned as ``{"items": [...], "next_cursor": "..."}``;
+    ``next_cursor`` is null on the last page. No total count is computed,
+    as that would be the full scan keyset pagination avoids.
+    """
+
+    class Input(Schema):
+        limit: int = Field(settings.PAGINATION_PER_PAGE, ge=1)
+        cursor: Optional[str] = None
+
+    class Output(Schema):
+        items: List[Any]
+        next_cursor: Optional[str] = None
+
+    items_attribute: str = "items"
+
+    def __init__(self, max_limit: int = None, **kwargs: Any) -> None:
+        self.max_limit = max_limit or settings.PAGINATION_MAX_LIMIT
+        super().__init__(**kwargs)
+
+    def _salt(self, request):
+        return f"{CURSOR_SALT}:{request.path if request is not None else ''}"
+
+    def encode_cursor(self, request, ordering, values):
+        payload = {
+            'o': [('-' if descending else '') + name for name, descending in ordering],
+            'v': [_encode_value(value) for value in values],
+        }
+        return signing.dumps(payload, salt=self._salt(request), compress=True)
+
+    def decode_cursor(self, request, cursor, ordering):
+        try:
+            payload = signing.loads(cursor, salt=self._salt(request))
+        except signing.BadSignature:
+            raise HttpError(400, "Invalid cursor")
+        expected = [('-' if descending else '') + name for name, descending in ordering]
+        if payload.get('o') != expected or len(payload.get('v', [])) != len(ordering):
+            # Issued for a different ordering (e.g. before a deploy changed it)
+            raise HttpError(400, "Invalid cursor")
+        return payload['v']
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        pagination: Input,
+        request=None,
+        **params: Any,
+    ) -> Any:
+        limit = min(pagination.limit, self.max_limit)
+
+        if not isinstance(queryset, QuerySet):
+            # Plain lists can't be seeked into; they're only ever a single page
+            return {"items": list(queryset)[:limit], "next_cursor": None}
+
+        ordering = _ordering(queryset)
+        queryset = queryset.order_by(
+            *[('-' if descending else '') + name for name, descending in ordering]
+        )
+        if pagination.cursor:
+            values = self.decode_cursor(request, pagination.cursor, ordering)
+            queryset = queryset.filter(_seek_filter(ordering, values))
+
+        # One extra row tells whether there is a next page without a COUNT
+        items = list(queryset[: limit + 1])
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = self.encode_cursor(
+                request, ordering, [_value(last, name) for name, _ in ordering]
+            )
+        return {"items": items, "next_cursor": next_cursor}
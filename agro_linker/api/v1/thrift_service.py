@@ -1,47 +1,73 @@
-from django.db.models import Sum
-from django.db import transaction
-from agro_linker.models.thrift import ThriftGroup, ThriftPayout, ThriftContribution
-from ninja import Router
-
-router = Router(tags=["Thrift Service"])
-
-@router.post("/rotate-payout/{group_id}")
-def rotate_payout(group_id):
-    group = ThriftGroup.objects.get(id=group_id)
-    members = group.thriftmembership_set.filter(is_active=True)
-    
-    # Get last payout to determine the next beneficiary
-    last_payout = ThriftPayout.objects.filter(group=group).order_by('-payout_order').first()
-    next_order = last_payout.payout_order + 1 if last_payout else 1
-    
-    # Circular rotation logic
-    if next_order > members.count():
-        next_order = 1
-    
-    next_beneficiary = members.get(rotation_order=next_order)
-    
-    # Calculate total pot
-    total_contributions = ThriftContribution.objects.filter(
-        membership__group=group,
-        is_verified=True
-    ).aggregate(total=Sum('amount'))['total']
-    
-    # Create payout record in a transaction
-    with transaction.atomic():
-        payout = ThriftPayout.objects.create(
-            group=group,
-            beneficiary=next_beneficiary.user,
-            amount=total_contributions,
-            payout_order=next_order
-        )
-    
-    return payout
-
-@router.post("/create-thrift-group")
-def create_thrift_group(group_data: dict):
-    group = ThriftGroup.objects.create(**group_data)
-    return group
-
-def create_thrift_membership(membership_data: dict):
-    membership = ThriftMembership.objects.create(**membership_data)
-    return membership
+from django.shortcuts import get_object_or_404
+from agro_linker.models.thrift import ThriftGroup, ThriftMembership, ThriftPot
+from agro_linker.services import reconciliation, thrift_pot
+from ninja import File, Router
+from ninja.files import UploadedFile
+from ninja.errors import HttpError
+
+router = Router(tags=["Thrift Service"])
+
+@router.post("/rotate-payout/{group_id}", response={201: dict, 400: dict, 403: dict})
+def rotate_payout(request, group_id: int):
+    """
+    Pay the current cycle's pot to the next member in rotation
+    (services/thrift_pot.py). Only the group admin may pay out.
+    """
+    group = get_object_or_404(ThriftGroup, id=group_id)
+    if group.admin_id != request.auth.pk:
+        raise HttpError(403, "Only the group admin can pay out the pot")
+    try:
+        payout = thrift_pot.rotate_payout(group)
+    except thrift_pot.ThriftPotError as e:
+        raise HttpError(400, str(e))
+    
+    return 201, {
+        "id": payout.id,
+        "beneficiary": str(payout.beneficiary_id),
+        "cycle": payout.cycle,
+        "payout_order": payout.payout_order,
+        "amount": float(payout.amount)
+    }
+
+@router.get("/groups/{group_id}/pot")
+def get_pot(request, group_id: int, cycle: int = None):
+    """Totals of a cycle's pot, the group's current cycle by default"""
+    group = get_object_or_404(ThriftGroup, id=group_id)
+    cycle = cycle or group.current_cycle
+    pot = ThriftPot.objects.filter(group=group, cycle=cycle).first() or ThriftPot(group=group, cycle=cycle)
+    return {
+        "cycle": cycle,
+        "total_contributions": float(pot.total_contributions),
+        "contribution_count": pot.contribution_count,
+        "total_payouts": float(pot.total_payouts),
+        "balance": float(pot.balance)
+    }
+
+@router.post("/groups/{group_id}/reconcile", response={200: dict, 400: dict, 403: dict})
+def reconcile_statement(request, group_id: int, statement: UploadedFile = File(...), dry_run: bool = False):
+    """
+    Verify the group's contributions against a mobile-money statement
+    (CSV, JSON Lines or JSON) and report what did not match
+    (services/reconciliation.py). Only the group admin may reconcile.
+    """
+    group = get_object_or_404(ThriftGroup, id=group_id)
+    if group.admin_id != request.auth.pk:
+        raise HttpError(403, "Only the group admin can reconcile contributions")
+    
+    try:
+        report = reconciliation.reconcile(
+            statement.file, reconciliation.format_for(statement.name), group,
+            verified_by=request.auth, dry_run=dry_run
+        )
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HttpError(400, f"Could not read the statement: {str(e)}")
+    return 200, report.as_dict()
+
+@router.post("/create-thrift-group")
+def create_thrift_group(group_data: dict):
+    group = ThriftGroup.objects.create(**group_data)
+    return group
+
+def create_thrift_membership(membership_data: dict):
+    membership = ThriftMembership.objects.create(**membership_data)
+    return membership
@@ -1,44 +1,63 @@
-from django.http import HttpRequest
-from django.shortcuts import get_object_or_404
-from django.contrib.auth.models import User
-from django.contrib.auth import authenticate
-from django.contrib.auth.hashers import check_password
-from django.contrib.auth.models import User
-from django.http import JsonResponse
-from ninja import Router
-
-router = Router(tags=["WhatsApp"])
-
-def send_whatsapp_message(request: HttpRequest, message: str):
-    """
-    Send a WhatsApp message to the user
-    """
-    user = get_object_or_404(User, id=request.user.id)
-    user.send_whatsapp_message(message)
-    return JsonResponse({"message": "WhatsApp message sent successfully"})  
-
-def send_whatsapp_message_to_all(request: HttpRequest, message: str):
-    """
-    Send a WhatsApp message to all users
-    """
-    users = User.objects.all()
-    for user in users:
-        send_whatsapp_message(request, message)
-    return JsonResponse({"message": "WhatsApp message sent to all users successfully"})
-
-def send_whatsapp_message_to_user(request: HttpRequest, message: str, user: User):
-    """
-    Send a WhatsApp message to a specific user
-    """ 
-    user.send_whatsapp_message(message)
-    return JsonResponse({"message": "WhatsApp message sent to user successfully"})
-
-def send_whatsapp_message_to_all_except_user(request: HttpRequest, message: str, user: User):
-    """
-    Send a WhatsApp message to all users except a specific user
-    """ 
-    users = User.objects.all()
-    for user in users:
-        if user != user:
-            send_whatsapp_message(request, message)
-    return JsonResponse({"message": "WhatsApp message sent to all users except user successfully"})
+from django.http import HttpRequest
+from django.shortcuts import get_object_or_404
+from ninja import Router
+from ninja.errors import HttpError
+from agro_linker.models.models import Broadcast, Notification, User
+from agro_linker.schemas import BroadcastIn, BroadcastOut
+from agro_linker.services import broadcast as broadcasts
+from agro_linker.services.notifications import enqueue
+from .auth import StaffAuthBearer
+
+router = Router(tags=["WhatsApp"])
+
+
+# ====================== MESSAGES ======================
+# Messages are queued; `manage.py dispatch_notifications` sends single
+# messages and `manage.py send_broadcasts` sends broadcasts
+
+def send_whatsapp_message_to_user(request: HttpRequest, message: str, user: User):
+    """
+    Send a WhatsApp message to a specific user
+    """
+    return enqueue(user, message, types=[Notification.NotificationType.WHATSAPP])
+
+def send_whatsapp_message(request: HttpRequest, message: str):
+    """
+    Send a WhatsApp message to the user
+    """
+    return send_whatsapp_message_to_user(request, message, request.user)
+
+def send_whatsapp_message_to_all(request: HttpRequest, message: str, roles=None, languages=None):
+    """
+    Send a WhatsApp message to all users who opted in (optionally only some roles or languages)
+    """
+    return broadcasts.queue(request.user, message=message, roles=roles, languages=languages)
+
+
+# ====================== BROADCASTS ======================
+@router.post("/broadcasts", response={201: BroadcastOut, 400: dict}, auth=StaffAuthBearer())
+def create_broadcast(request, payload: BroadcastIn):
+    """Queue a broadcast to every opted-in user matching the roles and languages"""
+    if not payload.message and not payload.template:
+        raise HttpError(400, "A broadcast needs a message or a template")
+    unknown = set(payload.roles) - set(User.Role.values)
+    if unknown:
+        raise HttpError(400, f"Unknown roles: {', '.join(sorted(unknown))}")
+    broadcast = broadcasts.queue(request.auth, **payload.dict())
+    return 201, broadcast
+
+@router.get("/broadcasts/{broadcast_id}", response=BroadcastOut, auth=StaffAuthBearer())
+def get_broadcast(request, broadcast_id: int):
+    """Broadcast with its progress"""
+    return get_object_or_404(Broadcast, id=broadcast_id)
+
+@router.post("/broadcasts/{broadcast_id}/cancel", response={200: BroadcastOut, 409: dict}, auth=StaffAuthBearer())
+def cancel_broadcast(request, broadcast_id: int):
+    """Stop a queued or running broadcast (chunks already being sent still go out)"""
+    updated = Broadcast.objects.filter(
+        id=broadcast_id, status__in=[Broadcast.Status.QUEUED, Broadcast.Status.RUNNING]
+    ).update(status=Broadcast.Status.CANCELLED)
+    broadcast = get_object_or_404(Broadcast, id=broadcast_id)
+    if not updated:
+        raise HttpError(409, f"Broadcast is already {broadcast.get_status_display().lower()}")
+    return broadcast
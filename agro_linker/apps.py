@@ -1,7 +1,10 @@
-from django.apps import AppConfig
-
-
-class AgroLinkerConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'agro_linker'
-    verbose_name = 'Agro Linker'
+from django.apps import AppConfig
+
+
+class AgroLinkerConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'agro_linker'
+    verbose_name = 'Agro Linker'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,43 +1,192 @@
-# from django.dispatch import receiver
-# from django.db.models.signals import post_save
-# from .models import *
-# from .api.notification import *
-# from .api.whatsapp import *
-
-
-
-
-
-
-# async def notify_loan_update(loan: LoanApplication):
-#     pass
-
-# async def notify_contract_update(contract: Contract):
-#     pass
-
-# async def notify_product_update(product: Product):
-#     pass
-
-# async def notify_crop_update(crop: Crop):
-#     pass    
-
-# async def notify_offer_update(offer: Offer):
-#     pass
-
-# async def notify_bid_update(bid: Bid):
-#     pass            
-
-# async def notify_wallet_transaction_update(wallet_transaction: WalletTransaction):
-#     pass        
-
-# async def notify_chat_message_update(chat_message: ChatMessage):
-#     pass
-
-
-
-
-
-
-
-
-
+"""
+WebSocket consumers (routed in agro_linker/routing.py, served by project/asgi.py).
+
+``ChatConsumer`` speaks JSON frames with a ``type``:
+
+- client to server: ``message`` {room, content, client_id}, ``typing``
+  {room}, ``read`` {room, up_to}
+- server to client: ``message`` {id, room, sender, content, timestamp,
+  client_id}, ``typing`` {room, user}, ``read`` {room, user, up_to} and
+  ``error`` {code, detail, client_id}
+
+Storage, fan-out and backpressure are in agro_linker/services/chat.py.
+"""
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+
+from .services import chat
+
+logger = logging.getLogger(__name__)
+
+
+# ====================== AUTH ======================
+
+@database_sync_to_async
+def _token_user(key):
+    # The API's keys (ApiKeyAuth in agro_linker/api/v1/api.py)
+    from .models.user import APIToken
+    return APIToken.user_for(key)
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """
+    Authenticate WebSockets with the API key, from the ``X-API-Key`` header
+    or, for browsers that cannot set headers, the ``token`` query parameter
+    """
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get('headers', []))
+        key = headers.get(b'x-api-key', b'').decode('latin1').strip()
+        key = key or (parse_qs(scope.get('query_string', b'').decode()).get('token') or [None])[0]
+        if key:
+            scope = dict(scope, user=await _token_user(key) or AnonymousUser())
+        return await super().__call__(scope, receive, send)
+
+
+def TokenAuthMiddlewareStack(inner):
+    """API key auth, falling back to the Django session"""
+    return AuthMiddlewareStack(TokenAuthMiddleware(inner))
+
+
+# ====================== CHAT ======================
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.user_id = user.pk
+        self.group = chat.user_group(user.pk)
+        self.rooms = await database_sync_to_async(chat.room_ids)(user.pk)
+        self.left = set()  # rooms left since the connection opened (chat.leave)
+        self.limiter = chat.RateLimiter()
+        self.typing = {}  # room id: when this connection last announced typing
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group'):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        if not self.limiter.allow():
+            if self.limiter.refused > chat.RATE_BURST:
+                await self.close(code=4429)
+            else:
+                await self.error('rate_limited', "Too many frames, slow down")
+            return
+        try:
+            content = json.loads(text_data or bytes_data)
+        except (TypeError, ValueError):
+            await self.error('invalid', "Frames must be JSON objects")
+            return
+        if not isinstance(content, dict):
+            await self.error('invalid', "Frames must be JSON objects")
+            return
+        await self.receive_json(content)
+
+    async def receive_json(self, content, **kwargs):
+        handler = {
+            'message': self.send_message,
+            'typing': self.send_typing,
+            'read': self.send_read,
+        }.get(content.get('type'))
+        if handler is None:
+            await self.error('invalid', f"Unknown frame type {content.get('type')!r}", content)
+            return
+        try:
+            room = int(content.get('room'))
+        except (TypeError, ValueError):
+            await self.error('invalid', "room must be a chat room id", content)
+            return
+        if room not in self.rooms:
+            # Rooms created since the connection opened
+            self.rooms = await database_sync_to_async(chat.room_ids)(self.user_id)
+            self.left -= self.rooms
+            if room not in self.rooms:
+                await self.error('forbidden', "Not a participant of this room", content)
+                return
+        await handler(room, content)
+
+    async def send_message(self, room, content):
+        text = content.get('content')
+        if not isinstance(text, str) or not text.strip():
+            await self.error('invalid', "content must be a non-empty string", content)
+            return
+        if len(text) > chat.MAX_MESSAGE_LENGTH:
+            await self.error('too_long', f"Messages are limited to {chat.MAX_MESSAGE_LENGTH} characters", content)
+            return
+        try:
+            saved = chat.get_buffer().add_message(room, self.user_id, text, content.get('client_id'))
+        except chat.ChatBusy as e:
+            await self.error(e.code, str(e), content)
+            return
+        # Delivery, to the sender's devices too, follows the flush; only failures are reported here
+        asyncio.ensure_future(self._confirm(saved, content))
+
+    async def _confirm(self, saved, content):
+        try:
+            await saved
+        except chat.ChatError as e:
+            await self.error(e.code, str(e), content)
+
+    async def send_typing(self, room, content):
+        now = time.monotonic()
+        if now - self.typing.get(room, 0) < chat.TYPING_INTERVAL:
+            return
+        self.typing[room] = now
+        members = await database_sync_to_async(chat.participants)([room])
+        await chat.fan_out(members, [(room, 'chat.typing', {'room': room, 'user': str(self.user_id)}, self.user_id)])
+
+    async def send_read(self, room, content):
+        try:
+            up_to = int(content.get('up_to'))
+        except (TypeError, ValueError):
+            await self.error('invalid', "up_to must be a message id", content)
+            return
+        chat.get_buffer().add_receipt(self.user_id, room, up_to)
+
+    async def error(self, code, detail, content=None):
+        await self.send_json({
+            'type': 'error', 'code': code, 'detail': detail,
+            'client_id': (content or {}).get('client_id'),
+        })
+
+    # Channel-layer events (see chat.fan_out)
+
+    async def chat_message(self, event):
+        for payload in event['events']:
+            if payload['room'] not in self.left:
+                await self.send_json({'type': 'message', **payload})
+
+    async def chat_typing(self, event):
+        for payload in event['events']:
+            if payload['room'] not in self.left:
+                await self.send_json({'type': 'typing', **payload})
+
+    async def chat_read(self, event):
+        for payload in event['events']:
+            if payload['room'] not in self.left:
+                await self.send_json({'type': 'read', **payload})
+
+    async def chat_join(self, event):
+        for payload in event['events']:
+            self.rooms.add(payload['room'])
+            self.left.discard(payload['room'])
+
+    async def chat_leave(self, event):
+        # Fan-out from other processes may still name the user until their participant cache expires
+        for payload in event['events']:
+            self.rooms.discard(payload['room'])
+            self.typing.pop(payload['room'], None)
+            self.left.add(payload['room'])
@@ -0,0 +1,24 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from agro_linker.services import analytics
+
+
+class Command(BaseCommand):
+    help = "Recompute hourly and daily analytics for a range of dates (today by default)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, default=None, help="YYYY-MM-DD")
+        parser.add_argument('--end', type=date.fromisoformat, default=None, help="YYYY-MM-DD, inclusive")
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--days-per-task', type=int, default=None)
+
+    def handle(self, *args, **options):
+        end = options['end'] or timezone.localdate()
+        start = options['start'] or end
+        if start > end:
+            raise CommandError("--start is after --end")
+        days = analytics.backfill(start, end, options['workers'], options['days_per_task'])
+        self.stdout.write(self.style.SUCCESS(f"Built analytics for {days} days ({start} to {end})"))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from agro_linker.services.notifications import NotificationDispatcher
+
+
+class Command(BaseCommand):
+    help = "Send pending notifications in rate-limited batches (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--once', action='store_true', help="Exit once nothing is due")
+        parser.add_argument('--idle-sleep', type=float, default=2.0,
+                            help="Seconds to wait when nothing is due")
+
+    def handle(self, *args, **options):
+        dispatcher = NotificationDispatcher(options['batch_size'])
+        total = 0
+        try:
+            while True:
+                processed = dispatcher.dispatch()
+                total += processed
+                if not processed:
+                    if options['once']:
+                        break
+                    time.sleep(options['idle_sleep'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            dispatcher.close()
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} notifications"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from agro_linker.services import export
+
+
+class Command(BaseCommand):
+    help = "Export datasets to month-partitioned Parquet files, incrementally from their last watermark"
+
+    def add_arguments(self, parser):
+        parser.add_argument('datasets', nargs='*', help=f"Any of {', '.join(export.DATASETS)} (default: all)")
+        parser.add_argument('--root', default=None, help="Output directory (default: settings.EXPORT_ROOT)")
+        parser.add_argument('--full', action='store_true', help="Export every row, ignoring the watermark")
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        names = options['datasets'] or list(export.DATASETS)
+        unknown = set(names) - set(export.DATASETS)
+        if unknown:
+            raise CommandError(f"Unknown datasets: {', '.join(sorted(unknown))}")
+        total = 0
+        for name in names:
+            rows, files = export.export(
+                export.DATASETS[name], options['root'], options['full'], options['batch_size']
+            )
+            self.stdout.write(f"{name}: {rows} rows in {len(files)} files")
+            total += rows
+        self.stdout.write(self.style.SUCCESS(f"Exported {total} rows"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from agro_linker.services import forecasting
+
+
+class Command(BaseCommand):
+    help = "Fit all price series, fill PriceTrend.predicted_price and publish forecasts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--crop-type', default=None)
+        parser.add_argument('--refit', action='store_true',
+                            help="Rewrite predicted_price of every row in the history window")
+
+    def handle(self, *args, **options):
+        series, written, published = forecasting.run(options['crop_type'], options['refit'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Fitted {series} series: {written} predictions written, {published} forecasts published"
+        ))
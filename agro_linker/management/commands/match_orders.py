@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from agro_linker.models.market import Offer, Product
+from agro_linker.services.orderbook import match_offers
+
+
+class Command(BaseCommand):
+    help = "Fill pending offers that meet their product's reserve price"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        product_ids = (
+            Offer.objects.filter(
+                status=Offer.Status.PENDING,
+                expires_at__gt=timezone.now(),
+                product__status=Product.Status.ACTIVE,
+                amount__gte=F('product__price'),
+            )
+            .values_list('product_id', flat=True)
+            .distinct()
+        )
+        filled = 0
+        for product_id in list(product_ids):
+            filled += len(match_offers(product_id, batch_size=options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"Filled {filled} offers"))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from agro_linker.services.repayment_events import RepaymentEventWorker
+
+
+class Command(BaseCommand):
+    help = "Post received MFI repayment webhooks in batches (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--once', action='store_true', help="Exit once nothing is due")
+        parser.add_argument('--idle-sleep', type=float, default=1.0,
+                            help="Seconds to wait when nothing is due")
+
+    def handle(self, *args, **options):
+        worker = RepaymentEventWorker(options['batch_size'])
+        total = 0
+        try:
+            while True:
+                processed = worker.process()
+                total += processed
+                if not processed:
+                    if options['once']:
+                        break
+                    time.sleep(options['idle_sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} repayment events"))
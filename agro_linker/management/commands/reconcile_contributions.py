@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agro_linker.models.thrift import ThriftGroup
+from agro_linker.services import reconciliation
+
+
+class Command(BaseCommand):
+    help = "Verify thrift contributions against a mobile-money statement file (CSV, JSON Lines or JSON)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help="Path of the statement file")
+        parser.add_argument('--format', choices=reconciliation.FORMATS, default=None,
+                            help="Statement format (by default from the file extension)")
+        parser.add_argument('--group', type=int, default=None,
+                            help="Only match this thrift group, and report its contributions missing")
+        parser.add_argument('--dry-run', action='store_true', help="Report without verifying")
+
+    def handle(self, *args, **options):
+        group = None
+        if options['group'] is not None:
+            group = ThriftGroup.objects.filter(pk=options['group']).first()
+            if group is None:
+                raise CommandError(f"Thrift group {options['group']} does not exist")
+        statement_format = options['format'] or reconciliation.format_for(options['statement'])
+        try:
+            with open(options['statement'], 'rb') as stream:
+                report = reconciliation.reconcile(stream, statement_format, group, dry_run=options['dry_run'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read the statement: {str(e)}")
+        self.stdout.write(json.dumps(report.as_dict(), indent=2))
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {report.lines} lines: {report.verified} contributions verified"
+            + (" (dry run)" if options['dry_run'] else "")
+        ))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from agro_linker.services import price_discovery
+
+
+class Command(BaseCommand):
+    help = "Keep the price discovery index current (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Recompute every crop once and exit")
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help="Seconds between passes over the dirty crops")
+        parser.add_argument('--full-every', type=float, default=3600.0,
+                            help="Seconds between full recomputations")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            published, removed = price_discovery.refresh()
+            self.stdout.write(self.style.SUCCESS(f"Published {published} entries, removed {removed}"))
+            return
+
+        refreshed = 0
+        last_full = None
+        try:
+            while True:
+                if last_full is None or time.monotonic() - last_full >= options['full_every']:
+                    # Everything is recomputed, so dirty marks so far are covered
+                    price_discovery.redis_client().delete(price_discovery.DIRTY_KEY)
+                    refreshed += sum(price_discovery.refresh())
+                    last_full = time.monotonic()
+                else:
+                    refreshed += price_discovery.refresh_dirty()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} crops"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from agro_linker.services.inventory import release_expired
+
+
+class Command(BaseCommand):
+    help = "Return the stock of expired inventory holds to their products"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        total = release_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Released {total} holds"))
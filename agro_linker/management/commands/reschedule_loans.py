@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from agro_linker.models.finance import LoanApplication
+from agro_linker.services import amortization
+
+
+class Command(BaseCommand):
+    help = "Recompute the repayment schedules of many loans, keeping installments already (partly) paid"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', nargs='+', default=['approved', 'disbursed'],
+                            help="Loan statuses to reschedule")
+        parser.add_argument('--method', choices=amortization.METHODS, default=None,
+                            help="Switch the loans to this repayment method")
+        parser.add_argument('--interest-rate', type=float, default=None,
+                            help="Set this yearly interest rate (%%) on the loans")
+        parser.add_argument('--loan', nargs='+', type=int, default=None, help="Only these loan ids")
+
+    def handle(self, *args, **options):
+        loans = LoanApplication.objects.filter(status__in=options['status'])
+        if options['loan']:
+            loans = loans.filter(pk__in=options['loan'])
+        if options['interest_rate'] is not None:
+            if options['interest_rate'] < 0:
+                raise CommandError("The interest rate cannot be negative")
+            loans.update(interest_rate=options['interest_rate'])
+        ids = list(loans.values_list('pk', flat=True))
+        written = amortization.schedule_loans(ids, options['method'])
+        self.stdout.write(self.style.SUCCESS(f"Rescheduled {len(ids)} loans: {written} installments"))
@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from agro_linker.services import price_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild weekly, monthly and yearly price rollups from the daily price trends"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--crop-type', default=None)
+        parser.add_argument('--start', type=date.fromisoformat, default=None, help="YYYY-MM-DD")
+        parser.add_argument('--end', type=date.fromisoformat, default=None, help="YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        written = price_rollups.rebuild(options['crop_type'], options['start'], options['end'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} price rollups"))
@@ -0,0 +1,22 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agro_linker.services import thrift_scheduler
+
+
+class Command(BaseCommand):
+    help = "Roll thrift cycles, assess missed contributions and schedule meetings for all active groups (daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', default=None, help="Run as of this day (YYYY-MM-DD), today by default")
+        parser.add_argument('--max-passes', type=int, default=12,
+                            help="Most cycles a group is moved on by one run")
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options['date']) if options['date'] else None
+        except ValueError:
+            raise CommandError(f"Invalid date {options['date']}")
+        counts = thrift_scheduler.run(today, options['max_passes'])
+        self.stdout.write(self.style.SUCCESS(", ".join(f"{name}: {count}" for name, count in counts.items())))
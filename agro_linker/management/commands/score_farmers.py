@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from agro_linker.services import credit_scoring
+
+
+class Command(BaseCommand):
+    help = "Recompute farmer credit scores and cached credit limits (nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farmer', nargs='+', type=int, default=None, help="Only these farmer profile ids")
+
+    def handle(self, *args, **options):
+        scores = credit_scoring.score_farmers(options['farmer'])
+        self.stdout.write(self.style.SUCCESS(f"Scored {len(scores)} farmers"))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from agro_linker.services import broadcast as broadcasts
+
+
+class Command(BaseCommand):
+    help = "Send queued WhatsApp broadcasts across worker processes (runs until stopped unless --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--once', action='store_true', help="Exit once nothing is queued")
+        parser.add_argument('--idle-sleep', type=float, default=5.0,
+                            help="Seconds to wait when nothing is queued")
+
+    def progress(self, broadcast):
+        done = broadcast.sent + broadcast.failed
+        percent = 100 * done / broadcast.total if broadcast.total else 100
+        self.stdout.write(
+            f"Broadcast {broadcast.pk}: {done}/{broadcast.total} ({percent:.0f}%), {broadcast.failed} failed"
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                broadcast = broadcasts.claim()
+                if broadcast is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['idle_sleep'])
+                    continue
+                broadcasts.run(broadcast, options['workers'], options['chunk_size'], self.progress)
+                self.stdout.write(
+                    f"Broadcast {broadcast.pk} {broadcast.status.lower()}: "
+                    f"{broadcast.sent} sent, {broadcast.failed} failed"
+                )
+                total += 1
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Sent {total} broadcasts"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from agro_linker.services import ledger
+
+
+class Command(BaseCommand):
+    help = "Snapshot the balance of every wallet with new ledger entries (run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help="Also check every balance and transfer against the ledger entries")
+
+    def handle(self, *args, **options):
+        taken = ledger.take_snapshots()
+        if options['verify']:
+            wallets, references = ledger.verify()
+            for wallet_id in wallets:
+                self.stderr.write(f"Wallet {wallet_id}: balance does not match its entries")
+            for reference in references:
+                self.stderr.write(f"Transfer {reference}: legs do not sum to zero")
+        self.stdout.write(self.style.SUCCESS(f"Took {taken} balance snapshots"))
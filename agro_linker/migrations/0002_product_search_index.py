@@ -0,0 +1,101 @@
+# Product full-text search index (see agro_linker/services/search.py)
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS agro_linker_product_search USING fts5(
+        product_id UNINDEXED, name, variety, category, quality_grade, description,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS agro_linker_product_search_vocab
+    USING fts5vocab(agro_linker_product_search, 'row')
+    """,
+    """
+    INSERT INTO agro_linker_product_search
+        (product_id, name, variety, category, quality_grade, description)
+    SELECT p.id, p.name, p.variety, c.name, p.quality_grade, p.description
+    FROM agro_linker_product p
+    JOIN agro_linker_productcategory c ON c.id = p.category_id
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TABLE IF EXISTS agro_linker_product_search_vocab",
+    "DROP TABLE IF EXISTS agro_linker_product_search",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE TABLE IF NOT EXISTS agro_linker_product_search (
+        product_id uuid PRIMARY KEY REFERENCES agro_linker_product (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS agro_linker_product_search_document_gin
+    ON agro_linker_product_search USING gin (document)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS agro_linker_product_search_terms (
+        word text PRIMARY KEY
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS agro_linker_product_search_terms_trgm
+    ON agro_linker_product_search_terms USING gin (word gin_trgm_ops)
+    """,
+    """
+    INSERT INTO agro_linker_product_search (product_id, document)
+    SELECT p.id,
+        setweight(to_tsvector('english', p.name), 'A') ||
+        setweight(to_tsvector('english', p.variety || ' ' || c.name), 'B') ||
+        setweight(to_tsvector('english', p.quality_grade), 'C') ||
+        setweight(to_tsvector('english', p.description), 'D')
+    FROM agro_linker_product p
+    JOIN agro_linker_productcategory c ON c.id = p.category_id
+    ON CONFLICT (product_id) DO NOTHING
+    """,
+    """
+    INSERT INTO agro_linker_product_search_terms (word)
+    SELECT DISTINCT word FROM (
+        SELECT regexp_split_to_table(
+            lower(p.name || ' ' || p.variety || ' ' || c.name || ' ' || p.description), '\\W+'
+        ) AS word
+        FROM agro_linker_product p
+        JOIN agro_linker_productcategory c ON c.id = p.category_id
+    ) words
+    WHERE length(word) > 2
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP TABLE IF EXISTS agro_linker_product_search_terms",
+    "DROP TABLE IF EXISTS agro_linker_product_search",
+]
+
+
+def run_for_vendor(statements):
+    def operation(apps, schema_editor):
+        vendor_statements = statements.get(schema_editor.connection.vendor, [])
+        for statement in vendor_statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("agro_linker", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run_for_vendor({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:40
+
+from django.db import migrations, models
+
+from agro_linker.services.geo import extract_coordinates, geohash_encode
+
+
+def extract_farmer_coordinates(apps, schema_editor):
+    FarmerProfile = apps.get_model("agro_linker", "FarmerProfile")
+    batch = []
+    for farmer in FarmerProfile.objects.only("id", "location").iterator(
+        chunk_size=1000
+    ):
+        coordinates = extract_coordinates(farmer.location)
+        if not coordinates:
+            continue
+        farmer.latitude, farmer.longitude = coordinates
+        farmer.geohash = geohash_encode(*coordinates)
+        batch.append(farmer)
+        if len(batch) >= 1000:
+            FarmerProfile.objects.bulk_update(
+                batch, ["latitude", "longitude", "geohash"]
+            )
+            batch = []
+    FarmerProfile.objects.bulk_update(batch, ["latitude", "longitude", "geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0002_product_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="farmerprofile",
+            name="geohash",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=12
+            ),
+        ),
+        migrations.AddField(
+            model_name="farmerprofile",
+            name="latitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="farmerprofile",
+            name="longitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="farmerprofile",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="agro_linker_latitud_c3b1e6_idx"
+            ),
+        ),
+        migrations.RunPython(extract_farmer_coordinates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0003_farmerprofile_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bid",
+            index=models.Index(
+                fields=["buyer", "-created_at"], name="agro_linker_buyer_i_2e14da_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["-created_at"], name="agro_linker_created_c456d4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["status", "-created_at"], name="agro_linker_status_4e20df_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="weatherdata",
+            index=models.Index(fields=["-date"], name="agro_linker_date_7333ce_idx"),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0005_inventoryhold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="buyer",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="orders",
+                to="agro_linker.buyerprofile",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="bid",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="order",
+                to="agro_linker.offer",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["buyer", "-created_at"], name="agro_linker_buyer_i_0f12ce_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0006_order_buyer"),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name="MobileMoneyProcessor",
+        ),
+        migrations.DeleteModel(
+            name="SMSGateway",
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.10 on 2026-10-16 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0009_broadcast"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AgroAnalyticsHourly",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(unique=True)),
+                ("new_registrations", models.PositiveIntegerField(default=0)),
+                ("transactions_completed", models.PositiveIntegerField(default=0)),
+                (
+                    "total_transaction_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "transaction_units",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                ("loans_disbursed", models.PositiveIntegerField(default=0)),
+                (
+                    "loan_amount_disbursed",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+            ],
+            options={
+                "verbose_name": "hourly agro analytics",
+                "verbose_name_plural": "hourly agro analytics",
+                "ordering": ["-hour"],
+            },
+        ),
+        migrations.AddField(
+            model_name="loanapplication",
+            name="disbursement_date",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0010_analytics_hourly"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("crop_type", models.CharField(max_length=50)),
+                ("market", models.CharField(max_length=100)),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[
+                            ("week", "Week"),
+                            ("month", "Month"),
+                            ("year", "Year"),
+                        ],
+                        max_length=5,
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("min_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("max_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("price_total", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("days", models.PositiveIntegerField()),
+            ],
+            options={
+                "verbose_name": "price rollup",
+                "verbose_name_plural": "price rollups",
+                "ordering": ["crop_type", "market", "resolution", "period_start"],
+                "indexes": [
+                    models.Index(
+                        fields=["crop_type", "resolution", "period_start"],
+                        name="agro_linker_crop_ty_178561_idx",
+                    )
+                ],
+                "unique_together": {
+                    ("crop_type", "market", "resolution", "period_start")
+                },
+            },
+        ),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def open_ledger(apps, schema_editor):
+    """Carry every existing balance into the ledger as an opening snapshot"""
+    Wallet = apps.get_model("agro_linker", "Wallet")
+    WalletBalanceSnapshot = apps.get_model("agro_linker", "WalletBalanceSnapshot")
+    now = django.utils.timezone.now()
+    batch = []
+    for pk, balance in Wallet.objects.values_list("pk", "balance").iterator(
+        chunk_size=1000
+    ):
+        batch.append(
+            WalletBalanceSnapshot(wallet_id=pk, sequence=0, balance=balance, as_of=now)
+        )
+        if len(batch) >= 1000:
+            WalletBalanceSnapshot.objects.bulk_create(batch)
+            batch = []
+    WalletBalanceSnapshot.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0011_price_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WalletBalanceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence", models.PositiveBigIntegerField()),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("as_of", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="wallet",
+            name="code",
+            field=models.CharField(blank=True, max_length=30, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="wallet",
+            name="entry_count",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="wallettransaction",
+            name="sequence",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="wallet",
+            name="balance",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name="wallet",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="wallettransaction",
+            name="amount",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="wallettransaction",
+            name="transaction_date",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name="wallettransaction",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("sequence__gt", 0)),
+                fields=("transaction_reference", "wallet"),
+                name="wallet_entry_reference_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="wallettransaction",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("sequence__gt", 0)),
+                fields=("wallet", "sequence"),
+                name="wallet_entry_sequence_unique",
+            ),
+        ),
+        migrations.AddField(
+            model_name="walletbalancesnapshot",
+            name="wallet",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="snapshots",
+                to="agro_linker.wallet",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="walletbalancesnapshot",
+            index=models.Index(
+                fields=["wallet", "as_of"], name="agro_linker_wallet__4ed6da_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="walletbalancesnapshot",
+            unique_together={("wallet", "sequence")},
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
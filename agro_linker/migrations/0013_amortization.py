@@ -0,0 +1,56 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:13
+
+from django.db import migrations, models
+
+
+def split_existing_installments(apps, schema_editor):
+    """Installments so far were equal parts of the principal, without interest"""
+    RepaymentSchedule = apps.get_model("agro_linker", "RepaymentSchedule")
+    RepaymentSchedule.objects.update(principal=models.F("amount"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0012_wallet_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="loanapplication",
+            name="repayment_method",
+            field=models.CharField(
+                choices=[
+                    ("flat", "Flat"),
+                    ("reducing_balance", "Reducing balance"),
+                    ("annuity", "Annuity"),
+                ],
+                default="annuity",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="repaymentschedule",
+            name="interest",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="repaymentschedule",
+            name="principal",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="thriftloan",
+            name="repayment_method",
+            field=models.CharField(
+                choices=[
+                    ("flat", "Flat"),
+                    ("reducing_balance", "Reducing balance"),
+                    ("annuity", "Annuity"),
+                ],
+                default="flat",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(split_existing_installments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0013_amortization"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="loanapplication",
+            name="amount_paid",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="loanapplication",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("approved", "Approved"),
+                    ("rejected", "Rejected"),
+                    ("disbursed", "Disbursed"),
+                    ("partially_paid", "Partially Paid"),
+                    ("repaid", "Repaid"),
+                    ("defaulted", "Defaulted"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="loanrepayment",
+            name="payment_date",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="loanrepayment",
+            name="transaction_reference",
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
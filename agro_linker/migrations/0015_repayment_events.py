@@ -0,0 +1,72 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:19
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0014_loan_repayments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RepaymentEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "transaction_reference",
+                    models.CharField(max_length=100, unique=True),
+                ),
+                ("loan_reference", models.CharField(max_length=50)),
+                (
+                    "payload",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("PROCESSING", "Processing"),
+                            ("PROCESSED", "Processed"),
+                            ("REJECTED", "Rejected"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                    ),
+                ),
+                ("received_at", models.DateTimeField(auto_now_add=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True)),
+            ],
+            options={
+                "verbose_name": "repayment event",
+                "verbose_name_plural": "repayment events",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "id"], name="agro_linker_status_5fd69a_idx"
+                    ),
+                    models.Index(
+                        fields=["loan_reference", "status"],
+                        name="agro_linker_loan_re_e7c8ae_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_pots(apps, schema_editor):
+    """Total the contributions and payouts made so far into pots and memberships"""
+    from django.db.models import Count, Sum
+
+    ThriftContribution = apps.get_model("agro_linker", "ThriftContribution")
+    ThriftMembership = apps.get_model("agro_linker", "ThriftMembership")
+    ThriftPayout = apps.get_model("agro_linker", "ThriftPayout")
+    ThriftPot = apps.get_model("agro_linker", "ThriftPot")
+
+    pots = {}
+    for group_id, cycle, total, count in (
+        ThriftContribution.objects.filter(is_verified=True)
+        .values("membership__group", "cycle")
+        .annotate(total=Sum("amount"), count=Count("pk"))
+        .order_by()
+        .values_list("membership__group", "cycle", "total", "count")
+    ):
+        pots[(group_id, cycle)] = ThriftPot(
+            group_id=group_id,
+            cycle=cycle,
+            total_contributions=total,
+            contribution_count=count,
+        )
+    for group_id, cycle, total in (
+        ThriftPayout.objects.values("group", "cycle")
+        .annotate(total=Sum("amount"))
+        .order_by()
+        .values_list("group", "cycle", "total")
+    ):
+        pot = pots.setdefault(
+            (group_id, cycle), ThriftPot(group_id=group_id, cycle=cycle)
+        )
+        pot.total_payouts = total
+    ThriftPot.objects.bulk_create(pots.values(), batch_size=1000)
+
+    contributed = dict(
+        ThriftContribution.objects.filter(is_verified=True)
+        .values("membership")
+        .annotate(total=Sum("amount"))
+        .order_by()
+        .values_list("membership", "total")
+    )
+    received = dict(
+        ((group_id, user_id), total)
+        for group_id, user_id, total in ThriftPayout.objects.values(
+            "group", "beneficiary"
+        )
+        .annotate(total=Sum("amount"))
+        .order_by()
+        .values_list("group", "beneficiary", "total")
+    )
+    memberships = list(ThriftMembership.objects.only("pk", "group_id", "user_id"))
+    for membership in memberships:
+        membership.total_contributions = contributed.get(membership.pk, 0)
+        membership.total_payouts = received.get(
+            (membership.group_id, membership.user_id), 0
+        )
+    ThriftMembership.objects.bulk_update(
+        memberships, ["total_contributions", "total_payouts"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0015_repayment_events"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="thriftmembership",
+            name="total_payouts",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.CreateModel(
+            name="ThriftPot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cycle", models.PositiveIntegerField()),
+                (
+                    "total_contributions",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("contribution_count", models.PositiveIntegerField(default=0)),
+                (
+                    "total_payouts",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("updated_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pots",
+                        to="agro_linker.thriftgroup",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "thrift pot",
+                "verbose_name_plural": "thrift pots",
+                "unique_together": {("group", "cycle")},
+            },
+        ),
+        migrations.RunPython(fill_pots, migrations.RunPython.noop),
+    ]
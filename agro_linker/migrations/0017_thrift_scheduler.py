@@ -0,0 +1,39 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0016_thrift_pot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="thriftpenalty",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("MISSED_CONTRIBUTION", "Missed contribution"),
+                    ("OTHER", "Other"),
+                ],
+                default="OTHER",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="thriftmeeting",
+            index=models.Index(
+                fields=["group", "meeting_date"], name="agro_linker_group_i_152164_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="thriftpenalty",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("kind", "MISSED_CONTRIBUTION")),
+                fields=("membership", "cycle"),
+                name="thrift_missed_contribution_unique",
+            ),
+        ),
+    ]
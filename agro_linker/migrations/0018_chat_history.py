@@ -0,0 +1,122 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_counters(apps, schema_editor):
+    """
+    Give every participant a counter; what is unread so far comes from the
+    messages' is_read flag, the first read receipt recounts it
+    """
+    from collections import Counter
+
+    from django.db.models import Count
+
+    ChatMessage = apps.get_model("agro_linker", "ChatMessage")
+    ChatRoom = apps.get_model("agro_linker", "ChatRoom")
+    ChatUnreadCounter = apps.get_model("agro_linker", "ChatUnreadCounter")
+
+    unread, by_sender = Counter(), Counter()
+    for room_id, sender_id, count in (
+        ChatMessage.objects.filter(is_read=False)
+        .values("room", "sender")
+        .annotate(count=Count("pk"))
+        .order_by()
+        .values_list("room", "sender", "count")
+    ):
+        unread[room_id] += count
+        by_sender[(room_id, sender_id)] = count
+    rooms = {
+        pk: last_message or created_at
+        for pk, last_message, created_at in ChatRoom.objects.values_list(
+            "pk", "last_message", "created_at"
+        )
+    }
+    ChatUnreadCounter.objects.bulk_create(
+        [
+            ChatUnreadCounter(
+                room_id=room_id,
+                user_id=user_id,
+                unread_count=unread[room_id] - by_sender[(room_id, user_id)],
+                last_message_at=rooms[room_id],
+            )
+            for room_id, user_id in ChatRoom.participants.through.objects.values_list(
+                "chatroom_id", "user_id"
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0017_thrift_scheduler"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatUnreadCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("unread_count", models.PositiveIntegerField(default=0)),
+                ("last_read_id", models.BigIntegerField(default=0)),
+                (
+                    "last_message_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "chat unread counter",
+                "verbose_name_plural": "chat unread counters",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["room", "timestamp", "id"],
+                name="agro_linker_room_id_099891_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatunreadcounter",
+            name="room",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="unread_counters",
+                to="agro_linker.chatroom",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatunreadcounter",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="chat_unread_counters",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chatunreadcounter",
+            index=models.Index(
+                fields=["user", "-last_message_at", "-id"],
+                name="agro_linker_user_id_dd5ddd_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="chatunreadcounter",
+            unique_together={("room", "user")},
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
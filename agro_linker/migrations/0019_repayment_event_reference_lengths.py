@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-16 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0018_chat_history"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="repaymentevent",
+            name="loan_reference",
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AlterField(
+            model_name="repaymentevent",
+            name="transaction_reference",
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
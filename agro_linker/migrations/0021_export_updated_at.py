@@ -0,0 +1,46 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0020_apitoken"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bid",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="pricetrend",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="weatherdata",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="bid",
+            index=models.Index(
+                fields=["updated_at"], name="agro_linker_updated_c69968_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pricetrend",
+            index=models.Index(
+                fields=["updated_at"], name="agro_linker_updated_48aa5f_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="weatherdata",
+            index=models.Index(
+                fields=["updated_at"], name="agro_linker_updated_134eaa_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("agro_linker", "0021_export_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="thriftpayout",
+            name="amount",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+    ]
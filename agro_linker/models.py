@@ -1,6 +1,6 @@
-from .models.user import User, FarmerProfile, BuyerProfile
-from .models.models import *
-from .models.finance import *
-from .models.market import *
-from .models.thrift import *
+from .models.user import User, FarmerProfile, BuyerProfile
+from .models.models import *
+from .models.finance import *
+from .models.market import *
+from .models.thrift import *
 from .models.chat import * 
\ No newline at end of file
@@ -1,6 +1,6 @@
-from .user import User, FarmerProfile, BuyerProfile
-from .models import *
-from .finance import *
-from .market import *
-from .thrift import *
+from .user import User, FarmerProfile, BuyerProfile, APIToken
+from .models import *
+from .finance import *
+from .market import *
+from .thrift import *
 from .chat import * 
\ No newline at end of file
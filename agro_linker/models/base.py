@@ -1,7 +1,90 @@
-from django.db import models
-
-class BaseIntegration(models.Model):
-    class Meta:
-        abstract = True
-
-
+import logging
+
+from django.conf import settings
+
+from ..services.transport import get_transport
+
+logger = logging.getLogger(__name__)
+
+
+class BaseIntegration:
+    """
+    Base class for all integration services.
+
+    Requests go through the provider's shared transport
+    (``services/transport.py``): pooled keep-alive connections, backoff with
+    jitter, a circuit breaker and a concurrency limit per provider. With
+    ``async_mode=True`` the public methods return coroutines and requests
+    are sent with aiohttp.
+    """
+    CONFIG_NAMESPACE = None
+
+    def __init__(self, provider, async_mode=False):
+        self.provider = provider
+        self.async_mode = async_mode
+        self.config = self._get_provider_config()
+
+    def _get_provider_config(self):
+        """Get configuration for the specified provider"""
+        config_key = f"{self.CONFIG_NAMESPACE}_PROVIDERS"
+        return getattr(settings, config_key, {}).get(self.provider, {})
+
+    @property
+    def transport(self):
+        return get_transport(f"{self.CONFIG_NAMESPACE}:{self.provider}", self.config)
+
+    def _call_provider(self, prefix, action, *args):
+        """
+        Run the ``{prefix}_{provider}`` method, turning errors into a failed
+        result dict (awaitable in async mode)
+        """
+        method = getattr(self, f'{prefix}_{self.provider.lower()}', None)
+        if self.async_mode:
+            return self._acall_provider(method, action, *args)
+        try:
+            if method:
+                return method(*args)
+            raise ValueError(f"Unsupported provider: {self.provider}")
+        except Exception as e:
+            logger.error(f"{action} failed: {str(e)}")
+            return self._failure(e)
+
+    async def _acall_provider(self, method, action, *args):
+        try:
+            if method:
+                return await method(*args)
+            raise ValueError(f"Unsupported provider: {self.provider}")
+        except Exception as e:
+            logger.error(f"{action} failed: {str(e)}")
+            return self._failure(e)
+
+    def _failure(self, error):
+        failure = {
+            'status': 'failed',
+            'error': str(error),
+            'provider': self.provider
+        }
+        # HTTP errors of requests (response.status_code) and aiohttp (status)
+        status = getattr(getattr(error, 'response', None), 'status_code', None) or getattr(error, 'status', None)
+        if isinstance(status, int):
+            failure['status_code'] = status
+        return failure
+
+    def _make_request(self, method, url, **kwargs):
+        """Send a request through the provider transport and return the decoded JSON"""
+        headers = self._get_default_headers()
+        headers.update(kwargs.pop('headers', {}))
+        if self.async_mode:
+            return self._amake_request(method, url, headers=headers, **kwargs)
+        return self.transport.request(method, url, headers=headers, **kwargs).json()
+
+    async def _amake_request(self, method, url, **kwargs):
+        status, headers, body = await self.transport.arequest(method, url, **kwargs)
+        return body
+
+    def _get_default_headers(self):
+        """Get default headers for the provider"""
+        return {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
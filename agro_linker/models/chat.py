@@ -1,43 +1,71 @@
-from django.db import models
-from django.utils.translation import gettext_lazy as _
-from django.utils import timezone
-import logging
-from datetime import datetime
-from .user import User
-
-logger = logging.getLogger(__name__)
-from django.core.exceptions import ValidationError
-
-class ChatRoom(models.Model):
-    participants = models.ManyToManyField(User, related_name='chat_rooms')
-    created_at = models.DateTimeField(auto_now_add=True)
-    last_message = models.DateTimeField(null=True, blank=True)
-    is_group = models.BooleanField(default=False)
-    name = models.CharField(max_length=100, blank=True)
-    
-    class Meta:
-        verbose_name = _('chat room')
-        verbose_name_plural = _('chat rooms')
-        ordering = ['-last_message']
-    
-    def __str__(self):
-        if self.is_group:
-            return self.name or f"Group Chat {self.id}"
-        participants = self.participants.all()
-        return f"Chat between {participants[0]} and {participants[1]}"
-
-class ChatMessage(models.Model):
-    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='messages')
-    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
-    content = models.TextField()
-    is_read = models.BooleanField(default=False)
-    timestamp = models.DateTimeField(auto_now_add=True)
-    
-    class Meta:
-        ordering = ['timestamp']
-        verbose_name = _('chat message')
-        verbose_name_plural = _('chat messages')
-    
-    def __str__(self):
-        return f"Message from {self.sender} in {self.room}"
-
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
+import logging
+from datetime import datetime
+from .user import User
+
+logger = logging.getLogger(__name__)
+from django.core.exceptions import ValidationError
+
+class ChatRoom(models.Model):
+    participants = models.ManyToManyField(User, related_name='chat_rooms')
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_message = models.DateTimeField(null=True, blank=True)
+    is_group = models.BooleanField(default=False)
+    name = models.CharField(max_length=100, blank=True)
+    
+    class Meta:
+        verbose_name = _('chat room')
+        verbose_name_plural = _('chat rooms')
+        ordering = ['-last_message']
+    
+    def __str__(self):
+        if self.is_group:
+            return self.name or f"Group Chat {self.id}"
+        participants = self.participants.all()
+        return f"Chat between {participants[0]} and {participants[1]}"
+
+class ChatMessage(models.Model):
+    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='messages')
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
+    content = models.TextField()
+    is_read = models.BooleanField(default=False)
+    timestamp = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['timestamp']
+        verbose_name = _('chat message')
+        verbose_name_plural = _('chat messages')
+        indexes = [
+            # Keyset pages of a room's history, either direction
+            models.Index(fields=['room', 'timestamp', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"Message from {self.sender} in {self.room}"
+
+class ChatUnreadCounter(models.Model):
+    """
+    A participant's inbox entry for a room: messages from others since
+    their last read receipt, and when the room last had a message. Kept by
+    services/chat.py as messages are sent and read, never counted on read
+    """
+    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='unread_counters')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_unread_counters')
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_id = models.BigIntegerField(default=0)
+    last_message_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = _('chat unread counter')
+        verbose_name_plural = _('chat unread counters')
+        unique_together = ('room', 'user')
+        indexes = [
+            # The inbox, most recent rooms first
+            models.Index(fields=['user', '-last_message_at', '-id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.unread_count} unread for {self.user} in {self.room}"
+
@@ -1,3 +1,3 @@
-from django.db import models
-from django.utils.translation import gettext_lazy as _
+from django.db import models
+from django.utils.translation import gettext_lazy as _
 from .user import User, FarmerProfile
\ No newline at end of file
@@ -4,12 +4,12 @@ from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+import json
 import uuid
-import requests
 import logging
-from django.conf import settings
 from datetime import datetime
-from .user import User, FarmerProfile
+from .user import User, FarmerProfile, APIToken
+from .base import BaseIntegration
 # from .market import *
 from .thrift import ThriftGroup
 from .finance import *
@@ -17,7 +17,7 @@ from .chat import *
 
 logger = logging.getLogger(__name__)
 from django.core.exceptions import ValidationError
-from django.db.models import F, Sum
+from django.db.models import Sum
 
 # [Rest of the models.py content, including Cooperative, Vehicle, LogisticsRequest, etc., remains unchanged]
 # For brevity, only showing the imports and necessary context
@@ -140,6 +140,7 @@ class Notification(models.Model):
     
     class NotificationStatus(models.TextChoices):
         PENDING = 'PENDING', _('Pending')
+        SENDING = 'SENDING', _('Sending')
         SENT = 'SENT', _('Sent')
         FAILED = 'FAILED', _('Failed')
         READ = 'READ', _('Read')
@@ -152,17 +153,63 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     read_at = models.DateTimeField(null=True, blank=True)
     
+    # Delivery bookkeeping of the dispatcher (services/notifications.py)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = _('notification')
         verbose_name_plural = _('notifications')
         indexes = [
             models.Index(fields=['user', 'status']),
+            models.Index(fields=['status', 'created_at']),
         ]
     
     def __str__(self):
         return f"{self.get_notification_type_display()} to {self.user.phone}"
 
+class Broadcast(models.Model):
+    """A WhatsApp message to every user matching a role/language filter, sent by services/broadcast.py"""
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', _('Queued')
+        RUNNING = 'RUNNING', _('Running')
+        COMPLETED = 'COMPLETED', _('Completed')
+        FAILED = 'FAILED', _('Failed')
+        CANCELLED = 'CANCELLED', _('Cancelled')
+    
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='broadcasts')
+    message = models.TextField(blank=True)
+    template = models.CharField(max_length=100, blank=True)  # pre-approved template, sent in each user's language
+    parameters = models.JSONField(default=list, blank=True)
+    roles = models.JSONField(default=list, blank=True)  # empty: every role
+    languages = models.JSONField(default=list, blank=True)  # empty: every language
+    provider = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    
+    # Progress, updated as chunks complete
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('broadcast')
+        verbose_name_plural = _('broadcasts')
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Broadcast {self.pk} ({self.get_status_display()})"
+
 class FarmerSubscription(models.Model):
     TIER_CHOICES = [
         ('basic', 'Basic (Free)'),
@@ -209,12 +256,18 @@ class WeatherData(models.Model):
     wind_speed = models.DecimalField(max_digits=5, decimal_places=2)  # km/h
     weather_condition = models.CharField(max_length=50)  # sunny, rainy, etc.
     forecast = models.JSONField(default=dict)  # Extended forecast data
+    # Export watermark (services/export.py)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = _('weather data')
         verbose_name_plural = _('weather data')
         unique_together = ('location', 'date')
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['-date']),
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"Weather for {self.location} on {self.date}"
@@ -224,67 +277,16 @@ class WeatherData(models.Model):
 
 
 
-class BaseIntegration:
-    """Base class for all integration services"""
-    MAX_RETRIES = 3
-    RETRY_DELAY = 1  # seconds
-    
-    def __init__(self, provider):
-        self.provider = provider
-        self.config = self._get_provider_config()
-        
-    def _get_provider_config(self):
-        """Get configuration for the specified provider"""
-        config_key = f"{self.CONFIG_NAMESPACE}_PROVIDERS"
-        return getattr(settings, config_key, {}).get(self.provider, {})
-    
-    def _make_request(self, method, url, **kwargs):
-        """Generic request method with retry logic"""
-        headers = kwargs.pop('headers', {})
-        headers.update(self._get_default_headers())
-        
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                response = requests.request(
-                    method,
-                    url,
-                    headers=headers,
-                    timeout=self.config.get('timeout', 30),
-                    **kwargs
-                )
-                response.raise_for_status()
-                return response.json()
-            except requests.exceptions.RequestException as e:
-                if attempt == self.MAX_RETRIES - 1:
-                    logger.error(f"Request failed after {self.MAX_RETRIES} attempts: {str(e)}")
-                    raise
-                sleep(self.RETRY_DELAY * (attempt + 1))
-    
-    def _get_default_headers(self):
-        """Get default headers for the provider"""
-        return {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-
-
 class EmailService(BaseIntegration):
     CONFIG_NAMESPACE = 'EMAIL'
     
     def send_email(self, to, subject, body, html_body=None):
         """Send email with optional HTML content"""
-        try:
-            sender_method = getattr(self, f'_send_{self.provider.lower()}', None)
-            if sender_method:
-                return sender_method(to, subject, body, html_body)
-            raise ValueError(f"Unsupported provider: {self.provider}")
-        except Exception as e:
-            logger.error(f"Email sending failed: {str(e)}")
-            return {
-                'status': 'failed',
-                'error': str(e),
-                'provider': self.provider
-            }
+        return self._call_provider('_send', 'Email sending', to, subject, body, html_body)
+    
+    def send_bulk_email(self, recipients, subject, body, html_body=None):
+        """Send the same email to many recipients in one request"""
+        return self._call_provider('_send_bulk', 'Bulk email sending', recipients, subject, body, html_body)
     
     def _send_sendgrid(self, to, subject, body, html_body=None):
         content = [{
@@ -330,6 +332,118 @@ class EmailService(BaseIntegration):
             auth=('api', self.config.get('api_key')),
             data=data
         )
+    
+    def _send_bulk_sendgrid(self, recipients, subject, body, html_body=None):
+        content = [{
+            'type': 'text/plain',
+            'value': body
+        }]
+        if html_body:
+            content.append({
+                'type': 'text/html',
+                'value': html_body
+            })
+        
+        # One personalization per recipient keeps the addresses private
+        payload = {
+            'personalizations': [
+                {'to': [{'email': to}], 'subject': subject}
+                for to in recipients
+            ],
+            'from': {'email': self.config.get('from_email')},
+            'content': content
+        }
+        return self._make_request(
+            'POST',
+            self.config.get('api_url'),
+            json=payload,
+            headers={
+                'Authorization': f"Bearer {self.config.get('api_key')}"
+            }
+        )
+    
+    def _send_bulk_mailgun(self, recipients, subject, body, html_body=None):
+        data = {
+            'from': self.config.get('from_email'),
+            'to': list(recipients),
+            'subject': subject,
+            'text': body,
+            # Batch sending: each recipient only sees their own address
+            'recipient-variables': json.dumps({to: {} for to in recipients})
+        }
+        if html_body:
+            data['html'] = html_body
+        
+        return self._make_request(
+            'POST',
+            self.config.get('api_url'),
+            auth=('api', self.config.get('api_key')),
+            data=data
+        )
+
+
+class WhatsAppService(BaseIntegration):
+    CONFIG_NAMESPACE = 'WHATSAPP'
+    
+    def send_message(self, phone, message):
+        """Send a free-form WhatsApp text message"""
+        return self._call_provider('_send', 'WhatsApp sending', phone, message)
+    
+    def send_template(self, phone, template, language='en', parameters=None):
+        """Send a pre-approved WhatsApp template message"""
+        return self._call_provider('_send_template', 'WhatsApp template sending', phone, template, language, parameters or [])
+    
+    def _send_meta(self, phone, message):
+        payload = {
+            'messaging_product': 'whatsapp',
+            'to': phone,
+            'type': 'text',
+            'text': {'body': message}
+        }
+        return self._make_request(
+            'POST',
+            f"{self.config.get('api_url')}/{self.config.get('phone_number_id')}/messages",
+            json=payload,
+            headers={
+                'Authorization': f"Bearer {self.config.get('api_key')}"
+            }
+        )
+    
+    def _send_template_meta(self, phone, template, language, parameters):
+        payload = {
+            'messaging_product': 'whatsapp',
+            'to': phone,
+            'type': 'template',
+            'template': {
+                'name': template,
+                'language': {'code': language},
+                'components': [{
+                    'type': 'body',
+                    'parameters': [{'type': 'text', 'text': str(value)} for value in parameters]
+                }] if parameters else []
+            }
+        }
+        return self._make_request(
+            'POST',
+            f"{self.config.get('api_url')}/{self.config.get('phone_number_id')}/messages",
+            json=payload,
+            headers={
+                'Authorization': f"Bearer {self.config.get('api_key')}"
+            }
+        )
+    
+    def _send_twilio(self, phone, message):
+        payload = {
+            'To': f"whatsapp:{phone}",
+            'From': f"whatsapp:{self.config.get('sender_id')}",
+            'Body': message
+        }
+        return self._make_request(
+            'POST',
+            self.config.get('api_url'),
+            data=payload,
+            auth=(self.config.get('account_sid'), self.config.get('auth_token'))
+        )
 
 class AgroAnalytics(models.Model):
     """Consolidated platform analytics data"""
@@ -354,86 +468,38 @@ class AgroAnalytics(models.Model):
         ]
     
     @classmethod
-    def generate_daily_report(cls):
-        """Generate daily analytics report"""
-        from django.db.models import Count, Sum, Avg
-        from django.utils import timezone
-        
-        today = timezone.now().date()
-        
-        # Prevent duplicate entries
-        if cls.objects.filter(date=today).exists():
-            return
-        
-        # Calculate metrics
-        from .models import (
-            User, Product, Order, 
-            ThriftGroup, LoanApplication
-        )
-        
-        metrics = {
-            'date': today,
-            'active_farmers': User.objects.filter(
-                role=User.Role.FARMER, 
-                is_active=True
-            ).count(),
-            'active_buyers': User.objects.filter(
-                role=User.Role.BUYER, 
-                is_active=True
-            ).count(),
-            'products_listed': Product.objects.filter(
-                status=Product.Status.ACTIVE
-            ).count(),
-            'transactions_completed': Order.objects.filter(
-                payment_status=Order.PaymentStatus.PAID,
-                created_at__date=today
-            ).count(),
-            'thrift_groups_active': ThriftGroup.objects.filter(
-                is_active=True
-            ).count(),
-            'loans_disbursed': LoanApplication.objects.filter(
-                status='disbursed',
-                disbursement_date__date=today
-            ).count()
-        }
-        
-        # Transaction values
-        transaction_data = Order.objects.filter(
-            payment_status=Order.PaymentStatus.PAID,
-            created_at__date=today
-        ).aggregate(
-            total_value=Sum(F('bid__amount') * F('bid__quantity')),
-            avg_price=Avg('bid__amount')
-        )
-        
-        metrics.update({
-            'total_transaction_value': transaction_data['total_value'] or 0,
-            'average_product_price': transaction_data['avg_price'] or 0
-        })
+    def generate_daily_report(cls, date=None):
+        """Build (or rebuild) the analytics of ``date``, by default today"""
+        from ..services import analytics
         
-        # Loan amounts
-        loan_data = LoanApplication.objects.filter(
-            status='disbursed',
-            disbursement_date__date=today
-        ).aggregate(
-            total_amount=Sum('amount')
-        )
-        
-        metrics.update({
-            'loan_amount_disbursed': loan_data['total_amount'] or 0
-        })
-        
-        # New registrations
-        metrics['new_registrations'] = User.objects.filter(
-            created_at__date=today
-        ).count()
-        
-        # Create analytics record
-        cls.objects.create(**metrics)
+        date = date or timezone.localdate()
+        analytics.build(date, date)
+        return cls.objects.get(date=date)
     
     def __str__(self):
         return f"Analytics for {self.date}"
 
+class AgroAnalyticsHourly(models.Model):
+    """
+    Hourly activity, rolled up into AgroAnalytics. Counters are bumped from
+    model signals as things happen and recomputed by services/analytics.py.
+    """
+    hour = models.DateTimeField(unique=True)
+    new_registrations = models.PositiveIntegerField(default=0)
+    transactions_completed = models.PositiveIntegerField(default=0)
+    total_transaction_value = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    transaction_units = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    loans_disbursed = models.PositiveIntegerField(default=0)
+    loan_amount_disbursed = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = _('hourly agro analytics')
+        verbose_name_plural = _('hourly agro analytics')
+        ordering = ['-hour']
+    
+    def __str__(self):
+        return f"Analytics for {self.hour:%Y-%m-%d %H:00}"
+
 class SystemSettings(models.Model):
     """Configuration settings for the platform"""
     key = models.CharField(max_length=50, unique=True)
@@ -1,276 +1,394 @@
-from ninja import Schema
-from datetime import datetime, date
-from typing import List, Optional
-from agro_linker.models.models import *
-from ninja import Schema
-from datetime import date
-from typing import Optional, List
-
-class CropListingIn(Schema):
-    crop_type: str
-    quantity: float
-    price_per_unit: float
-    harvest_date: date
-    description: Optional[str] = None
-    images: Optional[List[str]] = None
-
-class CropListingOut(Schema):
-    id: int
-    crop_type: str
-    quantity: float
-    price_per_unit: float
-    status: str
-    harvest_date: date
-    created_at: datetime
-
-class OfferIn(Schema):
-    offered_price: float
-    quantity: float
-    delivery_date: date
-    notes: Optional[str] = None
-
-class OfferOut(Schema):
-    id: int
-    crop_id: int
-    buyer_id: int
-    offered_price: float
-    status: str
-    created_at: datetime
-
-class CropSearchFilters(Schema):
-    crop_type: Optional[str] = None
-    min_price: Optional[float] = None
-    max_price: Optional[float] = None
-    location: Optional[str] = None
-    radius_km: Optional[int] = None
-
-class TransportRequestIn(Schema):
-    contract_id: int
-    pickup_location: str
-    delivery_location: str
-    preferred_vehicle_type: Optional[str] = None
-    notes: Optional[str] = None
-
-class TransportRequestOut(Schema):
-    id: int
-    status: str
-    pickup_location: str
-    delivery_location: str
-    estimated_cost: Optional[float] = None
-
-class LoanApplicationIn(Schema):
-    amount: float
-    purpose: str
-    repayment_period_months: int
-    collateral_details: Optional[str] = None
-
-class LoanApplicationOut(Schema):
-    id: int
-    amount: float
-    purpose: str
-    status: str
-    approval_date: Optional[date] = None
-
-class LoanRepaymentIn(Schema):
-    loan_reference: str
-    amount: float
-    transaction_reference: str
-    payment_date: date
-    
-class UserOut(Schema):
-    id: str
-    username: str
-    email: str
-
-class BuyerProfileOut(Schema):
-    id: str
-    user_id: str
-    location: dict
-    verification_status: str
-    created_at: datetime    
-    updated_at: datetime
-
-class FarmerProfileOut(Schema):
-    id: str
-    farm_size: float
-    verification_status: str
-    user_id: str
-    location: dict
-
-class FarmerProfileIn(Schema):
-    farm_size: float
-    location: dict
-    user_id: str
-
-class ProductOut(Schema):
-    id: str
-    name: str
-    price: float
-    quantity: int
-    description: Optional[str] = None
-    category: Optional[str] = None
-    created_at: datetime
-
-class ProductIn(Schema):
-    name: str
-    price: float
-    quantity: int
-    description: Optional[str] = None
-    category: Optional[str] = None
-
-class ProductUpdate(Schema):
-    status: Optional[str] = None
-    price: Optional[float] = None
-    quantity: Optional[int] = None
-
-class OrderItemOut(Schema):
-    id: str
-    product_id: str
-    quantity: int
-    unit_price: float
-
-class OrderItemIn(Schema):
-    product_id: int
-    quantity: int
-
-class OrderOut(Schema):
-    id: str
-    status: str
-    created_at: datetime
-    items: List[OrderItemOut] = []
-    total_price: float
-    delivery_address: str
-    delivery_date: datetime
-    payment_status: str
-    payment_method: str
-    payment_date: datetime
-
-class BidOut(Schema):
-    id: str
-    amount: float
-    quantity: int
-    status: str
-    created_at: datetime
-
-
-class WeatherDataOut(Schema):
-    id: int
-    location: str
-    date: date
-    temperature: float
-    humidity: float
-    precipitation: float
-    wind_speed: float
-
-class BidIn(Schema):
-    product_id: str
-    amount: float
-    quantity: int
-    delivery_address: str
-    delivery_date: str
-
-class StatusUpdate(Schema):
-    status: str
-
-class WalletOut(Schema):
-    id: str
-    balance: float
-    created_at: datetime
-
-
-class WalletIn(Schema):
-    amount: float   
-    transaction_type: str
-    transaction_reference: str
-    transaction_date: datetime  
-
-class WalletTransactionOut(Schema):
-    id: str
-    amount: float
-    transaction_type: str
-    transaction_reference: str
-    transaction_date: datetime  
-
-class ContractOut(Schema):
-    id: str
-    buyer: UserOut
-    farmer: FarmerProfileOut
-    product: ProductOut
-    quantity: float
-    price: float    
-    created_at: datetime
-
-
-
-
-
-
-
-class WeatherDataOut(Schema):
-    id: int
-    location: str
-    date: date
-    temperature: float
-    humidity: float
-    precipitation: float
-    wind_speed: float
-    recorded_at: str
-
-class WeatherDataIn(Schema):
-    location: str
-    date: date
-    temperature: float
-    humidity: float
-    precipitation: float
-    wind_speed: float
-
-class WeatherForecastOut(Schema):
-    date: date
-    temperature: float
-    humidity: float
-    precipitation: float
-    wind_speed: float
-
-class WeatherFilter(Schema):
-    location: Optional[str] = None
-    start_date: Optional[date] = None
-    end_date: Optional[date] = None
-
-class ChatMessageOut(Schema):
-    id: str
-    sender: UserOut
-    receiver: UserOut
-    content: str
-    timestamp: datetime 
-
-class ChatMessageIn(Schema):
-    receiver_id: str
-    content: str
-
-class ChatRoomOut(Schema):
-    id: str
-    participants: List[UserOut]
-    created_at: datetime
-
-class ChatRoomIn(Schema):
-    participant_ids: List[str]  
-
-
-class LoanRepaymentOut(Schema):
-    id: str
-    loan_reference: str
-    amount: float
-    transaction_reference: str
-    payment_date: datetime
-
-
-
-
-
-
-
-
-
-
-
-
+from ninja import Field, Schema
+from datetime import datetime, date
+from typing import List, Optional
+from uuid import UUID
+from agro_linker.models.models import *
+from ninja import Schema
+from datetime import date
+from typing import Optional, List
+
+class CropListingIn(Schema):
+    crop_type: str
+    quantity: float
+    price_per_unit: float
+    harvest_date: date
+    description: Optional[str] = None
+    images: Optional[List[str]] = None
+
+class CropListingOut(Schema):
+    id: int
+    crop_type: str = Field(alias='product.name')
+    quantity: float
+    price_per_unit: float = Field(alias='price')
+    status: str = Field(alias='product.status')
+    harvest_date: Optional[date] = Field(None, alias='product.harvest_date')
+    created_at: datetime
+    distance_km: Optional[float] = None
+
+class OfferIn(Schema):
+    offered_price: float
+    quantity: float
+    delivery_date: date
+    notes: Optional[str] = None
+
+class OfferOut(Schema):
+    id: int
+    crop_id: int
+    buyer_id: int
+    offered_price: float
+    status: str
+    created_at: datetime
+
+class CropSearchFilters(Schema):
+    crop_type: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    location: Optional[str] = None  # "lat,lng"
+    radius_km: Optional[int] = None
+    bbox: Optional[str] = None  # "south,west,north,east"
+
+class TransportRequestIn(Schema):
+    contract_id: int
+    pickup_location: str
+    delivery_location: str
+    preferred_vehicle_type: Optional[str] = None
+    notes: Optional[str] = None
+
+class TransportRequestOut(Schema):
+    id: int
+    status: str
+    pickup_location: str
+    delivery_location: str
+    estimated_cost: Optional[float] = None
+
+class LoanApplicationIn(Schema):
+    amount: float
+    purpose: str
+    repayment_period_months: int
+    collateral_details: Optional[str] = None
+
+class LoanApplicationOut(Schema):
+    id: int
+    amount: float
+    purpose: str
+    status: str
+    approval_date: Optional[date] = None
+
+class LoanRepaymentIn(Schema):
+    # Sized to LoanApplication.reference_id and RepaymentEvent.transaction_reference
+    loan_reference: str = Field(max_length=20)
+    amount: float
+    transaction_reference: str = Field(max_length=255)
+    payment_date: date
+    payment_method: str = 'mobile_money'
+    
+class UserOut(Schema):
+    id: str
+    username: str
+    email: str
+
+class BuyerProfileOut(Schema):
+    id: str
+    user_id: str
+    location: dict
+    verification_status: str
+    created_at: datetime    
+    updated_at: datetime
+
+class FarmerProfileOut(Schema):
+    id: str
+    farm_size: float
+    verification_status: str
+    user_id: str
+    location: dict
+
+class FarmerProfileIn(Schema):
+    farm_size: float
+    location: dict
+    user_id: str
+
+class ProductOut(Schema):
+    id: UUID
+    name: str
+    price: float
+    quantity: int
+    description: Optional[str] = None
+    category: Optional[str] = None
+    created_at: datetime
+
+    @staticmethod
+    def resolve_category(obj):
+        category = getattr(obj, 'category', None)
+        return getattr(category, 'name', category)
+
+class ProductIn(Schema):
+    name: str
+    price: float
+    quantity: int
+    description: Optional[str] = None
+    category: Optional[str] = None
+
+class ProductUpdate(Schema):
+    status: Optional[str] = None
+    price: Optional[float] = None
+    quantity: Optional[int] = None
+
+class ProductSearchFilters(Schema):
+    q: Optional[str] = None
+    category: Optional[str] = None
+    quality_grade: Optional[str] = None
+    organic_certified: Optional[bool] = None
+    unit: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    farmer_id: Optional[str] = None
+    limit: int = 20
+    offset: int = 0
+
+class FacetCountOut(Schema):
+    value: str
+    count: int
+
+class ProductFacetsOut(Schema):
+    category: List[FacetCountOut] = []
+    quality_grade: List[FacetCountOut] = []
+    organic_certified: List[FacetCountOut] = []
+    unit: List[FacetCountOut] = []
+    price: List[FacetCountOut] = []
+
+class ProductSearchOut(Schema):
+    total: int
+    items: List[ProductOut]
+    facets: ProductFacetsOut
+    query: Optional[str] = None
+    corrected_query: Optional[str] = None
+    suggestions: dict = {}
+
+class OrderItemOut(Schema):
+    id: int
+    product_id: UUID
+    quantity: float
+    unit_price: float
+
+class OrderItemIn(Schema):
+    product_id: UUID
+    quantity: float
+
+class OrderOut(Schema):
+    id: int
+    buyer_id: Optional[int] = None
+    bid_id: Optional[int] = None
+    created_at: datetime
+    items: List[OrderItemOut] = []
+    total_amount: float
+    payment_status: str
+    payment_method: str
+
+    @staticmethod
+    def resolve_total_amount(obj):
+        return obj.total_amount()
+
+class OrderCartIn(Schema):
+    items: List[OrderItemIn]
+
+class BatchOrderIn(Schema):
+    orders: List[OrderCartIn]
+
+class OrderLineErrorOut(Schema):
+    order: int
+    line: int
+    product_id: str
+    detail: str
+
+class OrderErrorsOut(Schema):
+    detail: str
+    errors: List[OrderLineErrorOut] = []
+
+class BroadcastIn(Schema):
+    message: str = ''
+    template: str = ''
+    parameters: List[str] = []
+    roles: List[str] = []
+    languages: List[str] = []
+
+class BroadcastOut(Schema):
+    id: int
+    message: str
+    template: str
+    roles: List[str]
+    languages: List[str]
+    status: str
+    total: int
+    sent: int
+    failed: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class BidOut(Schema):
+    id: str
+    amount: float
+    quantity: int
+    status: str
+    created_at: datetime
+
+class OrderBookLevelOut(Schema):
+    price: float
+    quantity: float
+    orders: int
+
+class OrderBookOut(Schema):
+    product_id: UUID
+    reserve_price: float
+    available_quantity: float
+    best_bid: Optional[float] = None
+    best_bid_quantity: Optional[float] = None
+    depth: List[OrderBookLevelOut] = []
+
+
+class PricePointOut(Schema):
+    period_start: date
+    min_price: float
+    avg_price: float
+    max_price: float
+    days: int
+
+class PriceSeriesOut(Schema):
+    crop_type: str
+    market: Optional[str] = None
+    resolution: str
+    points: List[PricePointOut]
+
+class WeatherDataOut(Schema):
+    id: int
+    location: str
+    date: date
+    temperature: float
+    humidity: float
+    precipitation: float
+    wind_speed: float
+
+class BidIn(Schema):
+    product_id: str
+    amount: float
+    quantity: int
+    delivery_address: str
+    delivery_date: str
+
+class StatusUpdate(Schema):
+    status: str
+
+class WalletOut(Schema):
+    id: str
+    balance: float
+    created_at: datetime
+
+
+class WalletIn(Schema):
+    amount: float   
+    transaction_type: str
+    transaction_reference: str
+    transaction_date: datetime  
+
+class WalletTransactionOut(Schema):
+    id: str
+    amount: float
+    transaction_type: str
+    transaction_reference: str
+    transaction_date: datetime  
+
+class ContractOut(Schema):
+    id: str
+    buyer: UserOut
+    farmer: FarmerProfileOut
+    product: ProductOut
+    quantity: float
+    price: float    
+    created_at: datetime
+
+
+
+
+
+
+
+class WeatherDataOut(Schema):
+    id: int
+    location: str
+    date: date
+    temperature: float
+    humidity: float
+    precipitation: float
+    wind_speed: float
+    recorded_at: str
+
+class WeatherDataIn(Schema):
+    location: str
+    date: date
+    temperature: float
+    humidity: float
+    precipitation: float
+    wind_speed: float
+
+class WeatherForecastOut(Schema):
+    date: date
+    temperature: float
+    humidity: float
+    precipitation: float
+    wind_speed: float
+
+class WeatherFilter(Schema):
+    location: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+class ChatMessageOut(Schema):
+    id: int
+    room_id: int
+    sender_id: UUID
+    content: str
+    is_read: bool
+    timestamp: datetime 
+
+class ChatMessageIn(Schema):
+    receiver_id: str
+    content: str
+
+class ChatReadIn(Schema):
+    up_to: int
+
+class ChatInboxOut(Schema):
+    room_id: int
+    name: str = Field(alias='room.name')
+    is_group: bool = Field(alias='room.is_group')
+    unread_count: int
+    last_read_id: int
+    last_message_at: datetime
+
+class ChatRoomOut(Schema):
+    id: str
+    participants: List[UserOut]
+    created_at: datetime
+
+class ChatRoomIn(Schema):
+    participant_ids: List[str]  
+
+
+class LoanRepaymentOut(Schema):
+    id: str
+    loan_reference: str
+    amount: float
+    transaction_reference: str
+    payment_date: datetime
+
+
+
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,236 @@
+"""
+Loan amortisation.
+
+Schedules are computed for a whole portfolio at once: every loan is a row
+of NumPy matrices (loans x installments, masked past each loan's term) and
+every method is a handful of array expressions. ``interest_rate`` is a
+yearly percentage, charged per period as rate / periods a year:
+
+- flat: interest on the original principal for the whole term, spread
+  evenly; principal repaid in equal parts
+- reducing_balance: principal repaid in equal parts, interest on the
+  balance outstanding before each installment
+- annuity: equal installments, the interest part on the outstanding
+  balance and the rest principal
+
+Amounts are rounded to cents per installment and the last installment
+takes the rounding difference, so principal always adds up to the loan.
+
+Due dates are calendar-aware. Monthly installments fall on the day of the
+month of the start date, the month's last day when it is shorter (a loan
+from 31 January is due 28 February, 31 March, 30 April...). Weekly
+installments fall every 7 days. Any date on a weekend or a
+``LOAN_HOLIDAYS`` day rolls forward to the next business day.
+
+``schedule_loans`` (re)writes the ``RepaymentSchedule`` of many
+``LoanApplication`` rows with one delete and one ``bulk_create``. Paid and
+partly paid installments are kept and the principal they did not cover is
+rescheduled over the remaining term, so a policy change can be applied to
+a live portfolio (``manage.py reschedule_loans``). ``ThriftLoan`` is
+repaid weekly and keeps its schedule in its ``repayment_schedule`` JSON
+(``schedule_thrift_loans``).
+"""
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HOLIDAYS = getattr(settings, "LOAN_HOLIDAYS", [])
+BATCH_SIZE = getattr(settings, "AMORTIZATION_BATCH_SIZE", 2000)
+
+METHODS = ['flat', 'reducing_balance', 'annuity']
+MONTHLY, WEEKLY = 12, 52
+# Installments that have received money are never rescheduled
+SETTLED = Q(status__in=['paid', 'partially_paid']) | Q(amount_paid__gt=0)
+
+
+def _day(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+# ====================== COMPUTATION ======================
+
+def amortize(principal, annual_rate, installments, methods, periods_per_year=MONTHLY):
+    """
+    (principal, interest) cents of every installment of every loan, as
+    int64 matrices (loans x longest term); zero past a loan's term.
+    ``methods`` are names from METHODS, one per loan.
+    """
+    import numpy as np
+
+    cents = np.round(np.asarray(principal, dtype=float) * 100)
+    count = np.maximum(np.asarray(installments, dtype=np.int64), 1)
+    rate = np.asarray(annual_rate, dtype=float) / 100 / periods_per_year
+    method = np.array([METHODS.index(name) for name in methods], dtype=np.int64)
+
+    steps = np.arange(count.max(initial=1))[None, :]  # installments paid before each one
+    live = steps < count[:, None]
+    p, r, n = cents[:, None], rate[:, None], count[:, None].astype(float)
+    flat, reducing = method[:, None] == 0, method[:, None] == 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Equal annuity installment P r / (1 - (1 + r)^-n), or P / n without interest
+        payment = np.where(r > 0, p * r / (1 - (1 + r) ** -n), p / n)
+        growth = (1 + r) ** steps
+        annuity_balance = np.where(r > 0, p * growth - payment * (growth - 1) / r, p - payment * steps)
+    balance = np.where(reducing, p - p / n * steps, annuity_balance)
+    interest = np.round(np.where(flat, p * r, balance * r))
+    # An annuity installment is rounded as a whole, so all but the last are equal
+    principal_part = np.where(flat | reducing, np.round(p / n), np.round(payment) - interest)
+
+    interest = np.where(live, interest, 0).astype(np.int64)
+    principal_part = np.where(live, principal_part, 0).astype(np.int64)
+    # The last installment settles whatever rounding left over
+    rows = np.arange(len(count))
+    principal_part[rows, count - 1] += cents.astype(np.int64) - principal_part.sum(axis=1)
+    return principal_part, interest
+
+
+def due_dates(starts, installments, periods_per_year=MONTHLY, offsets=None):
+    """
+    datetime64[D] matrix (loans x longest term) of due dates, a period apart,
+    from the period after ``starts`` (or after ``offsets`` periods already due)
+    """
+    import numpy as np
+
+    start = np.array([_day(value) for value in starts], dtype='datetime64[D]')
+    steps = np.arange(1, max(installments, default=1) + 1)[None, :]
+    if offsets is not None:
+        steps = steps + np.asarray(offsets, dtype=np.int64)[:, None]
+    if periods_per_year == WEEKLY:
+        due = start[:, None] + 7 * steps
+    else:
+        month = start.astype('datetime64[M]')
+        day = (start - month.astype('datetime64[D]')).astype(np.int64)  # 0-based day of the month
+        target = month[:, None] + steps
+        length = ((target + 1).astype('datetime64[D]') - target.astype('datetime64[D]')).astype(np.int64)
+        due = target.astype('datetime64[D]') + np.minimum(day[:, None], length - 1)
+    holidays = np.array([_day(date.fromisoformat(day) if isinstance(day, str) else day) for day in HOLIDAYS],
+                        dtype='datetime64[D]')
+    return np.busday_offset(due, 0, roll='forward', holidays=holidays)
+
+
+def _decimal(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+
+# ====================== LOAN APPLICATIONS ======================
+
+def schedule_loans(loans, method=None):
+    """
+    Write the repayment schedules of ``loans`` (LoanApplication rows, or
+    their pks), keeping settled installments; ``method`` overrides (and
+    updates) each loan's repayment_method. Returns the installments written.
+    """
+    from ..models.finance import LoanApplication
+
+    ids = [getattr(loan, 'pk', loan) for loan in loans]
+    written = 0
+    for start in range(0, len(ids), BATCH_SIZE):
+        with transaction.atomic():
+            batch = list(
+                LoanApplication.objects.select_for_update().filter(pk__in=ids[start:start + BATCH_SIZE])
+                .only('amount', 'interest_rate', 'repayment_period_months', 'repayment_method',
+                      'application_date', 'disbursement_date')
+            )
+            if method:
+                LoanApplication.objects.filter(pk__in=[loan.pk for loan in batch]).update(repayment_method=method)
+                for loan in batch:
+                    loan.repayment_method = method
+            written += _schedule_batch(batch)
+    logger.info(f"Scheduled {len(ids)} loans: {written} installments")
+    return written
+
+
+def _schedule_batch(loans):
+    from ..models.finance import RepaymentSchedule
+
+    settled = {
+        row['loan']: row for row in
+        RepaymentSchedule.objects.filter(SETTLED, loan__in=loans).values('loan')
+        .annotate(count=Count('pk'), last=Max('installment_number'), principal=Sum('principal'))
+        .order_by()
+    }
+    RepaymentSchedule.objects.filter(loan__in=loans).exclude(SETTLED).delete()
+
+    pending, remaining, terms, starts, offsets = [], [], [], [], []
+    for loan in loans:
+        kept = settled.get(loan.pk)
+        outstanding = loan.amount - ((kept['principal'] or 0) if kept else 0)
+        if outstanding <= 0:
+            continue
+        pending.append(loan)
+        remaining.append(outstanding)
+        terms.append(max(loan.repayment_period_months - (kept['count'] if kept else 0), 1))
+        starts.append(loan.disbursement_date or loan.application_date or timezone.now())
+        offsets.append(kept['last'] if kept else 0)
+    if not pending:
+        return 0
+
+    principal, interest = amortize(
+        remaining, [loan.interest_rate for loan in pending], terms, [loan.repayment_method for loan in pending])
+    due = due_dates(starts, terms, offsets=offsets).astype(object)
+    rows = []
+    for row, loan in enumerate(pending):
+        for step in range(terms[row]):
+            rows.append(RepaymentSchedule(
+                loan=loan,
+                installment_number=offsets[row] + step + 1,
+                due_date=due[row, step],
+                principal=_decimal(principal[row, step]),
+                interest=_decimal(interest[row, step]),
+                amount=_decimal(principal[row, step] + interest[row, step]),
+                status='pending',
+            ))
+    RepaymentSchedule.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+# ====================== THRIFT LOANS ======================
+
+def thrift_schedules(loans):
+    """{loan pk: repayment_schedule list} of ThriftLoan rows, weekly from disbursement (or approval)"""
+    terms = [max(loan.repayment_period, 1) for loan in loans]
+    principal, interest = amortize(
+        [loan.amount for loan in loans], [loan.interest_rate for loan in loans], terms,
+        [loan.repayment_method for loan in loans], WEEKLY,
+    )
+    starts = [
+        loan.disbursement_date or loan.approved_date or loan.application_date or timezone.now() for loan in loans
+    ]
+    due = due_dates(starts, terms, WEEKLY).astype(object)
+    return {
+        loan.pk: [
+            {
+                'installment_number': step + 1,
+                'due_date': due[row, step].isoformat(),
+                'principal': str(_decimal(principal[row, step])),
+                'interest': str(_decimal(interest[row, step])),
+                'amount': str(_decimal(principal[row, step] + interest[row, step])),
+            }
+            for step in range(terms[row])
+        ]
+        for row, loan in enumerate(loans)
+    }
+
+
+def schedule_thrift_loans(loans):
+    """Fill and save ``repayment_schedule`` of ThriftLoan rows with one bulk_update; returns the loans"""
+    from ..models.thrift import ThriftLoan
+
+    loans = list(loans)
+    if not loans:
+        return loans
+    schedules = thrift_schedules(loans)
+    for loan in loans:
+        loan.repayment_schedule = schedules[loan.pk]
+    ThriftLoan.objects.bulk_update([loan for loan in loans if loan.pk], ['repayment_schedule'], batch_size=1000)
+    return loans
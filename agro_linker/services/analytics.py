@@ -0,0 +1,264 @@
+"""
+Platform analytics (``AgroAnalyticsHourly`` rolled up into ``AgroAnalytics``).
+
+Activity metrics (registrations, paid orders, disbursed loans) are kept per
+hour. They are bumped from model signals as things happen, with ``F()``
+increments on the hour's row, so the current hour is always live. Paid
+orders count in the hour they were created in, loans in the hour they were
+disbursed.
+
+``build(start, end)`` recomputes a date range from the source tables,
+overwriting whatever the signals counted (writes through ``update()`` and
+bulk operations send no signals). Whatever the length of the range it runs
+a fixed handful of grouped aggregate queries: one per source for the hourly
+activity, and one per table for the platform totals (active farmers and
+buyers, listed products, active thrift groups), which are counted per
+creation day and accumulated. For past days those totals count the rows
+that existed by the end of the day and are active *now*; there is no status
+history to do better.
+
+``backfill(start, end, workers)`` splits a long range into slices built in
+parallel worker processes (``manage.py build_analytics``).
+"""
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+WORKERS = getattr(settings, "ANALYTICS_BACKFILL_WORKERS", 4)
+DAYS_PER_TASK = getattr(settings, "ANALYTICS_BACKFILL_DAYS_PER_TASK", 7)
+
+HOURLY_FIELDS = [
+    'new_registrations', 'transactions_completed', 'total_transaction_value',
+    'transaction_units', 'loans_disbursed', 'loan_amount_disbursed',
+]
+DAILY_FIELDS = [
+    'active_farmers', 'active_buyers', 'products_listed', 'thrift_groups_active',
+    'new_registrations', 'transactions_completed', 'total_transaction_value',
+    'average_product_price', 'loans_disbursed', 'loan_amount_disbursed',
+]
+
+
+def hour_of(moment):
+    """Start of the (local) hour ``moment`` falls in, as TruncHour computes it"""
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# ====================== INCREMENTAL COUNTERS ======================
+
+def bump(moment, **deltas):
+    """Add ``deltas`` to the counters of the hour of ``moment``"""
+    from ..models.models import AgroAnalyticsHourly
+
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    hour = hour_of(moment)
+    with transaction.atomic():
+        updated = AgroAnalyticsHourly.objects.filter(hour=hour).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+        if not updated:
+            AgroAnalyticsHourly.objects.get_or_create(hour=hour)
+            AgroAnalyticsHourly.objects.filter(hour=hour).update(
+                **{field: F(field) + delta for field, delta in deltas.items()}
+            )
+
+
+def order_figures(order):
+    """(value, units) an order adds to the transaction counters"""
+    from .inventory import order_quantities
+
+    units = sum(order_quantities(order).values(), Decimal(0))
+    return order.total_amount(), units
+
+
+# ====================== RECOMPUTATION ======================
+
+def hourly_activity(start, end):
+    """{hour: {field: value}} of the activity between two datetimes"""
+    from ..models.finance import LoanApplication
+    from ..models.market import Order, OrderItem
+    from ..models.user import User
+
+    hours = defaultdict(lambda: dict.fromkeys(HOURLY_FIELDS, 0))
+
+    registrations = (
+        User.objects.filter(created_at__gte=start, created_at__lt=end)
+        .annotate(hour=TruncHour('created_at')).values('hour')
+        .annotate(count=Count('pk')).order_by()
+    )
+    for row in registrations:
+        hours[row['hour']]['new_registrations'] += row['count']
+
+    paid = Q(payment_status=Order.PaymentStatus.PAID, created_at__gte=start, created_at__lt=end)
+    # Orders on an accepted offer carry their price and quantity on the offer...
+    offer_orders = (
+        Order.objects.filter(paid, bid__isnull=False)
+        .annotate(hour=TruncHour('created_at')).values('hour')
+        .annotate(
+            count=Count('pk'),
+            value=Sum(F('bid__amount') * F('bid__quantity')),
+            units=Sum('bid__quantity'),
+        ).order_by()
+    )
+    # ...the others on their items
+    item_orders = (
+        OrderItem.objects.filter(
+            order__payment_status=Order.PaymentStatus.PAID, order__bid__isnull=True,
+            order__created_at__gte=start, order__created_at__lt=end,
+        )
+        .annotate(hour=TruncHour('order__created_at')).values('hour')
+        .annotate(
+            count=Count('order', distinct=True),
+            value=Sum(F('quantity') * F('unit_price')),
+            units=Sum('quantity'),
+        ).order_by()
+    )
+    for rows in (offer_orders, item_orders):
+        for row in rows:
+            counters = hours[row['hour']]
+            counters['transactions_completed'] += row['count']
+            counters['total_transaction_value'] += row['value'] or 0
+            counters['transaction_units'] += row['units'] or 0
+
+    loans = (
+        LoanApplication.objects.filter(disbursement_date__gte=start, disbursement_date__lt=end)
+        .annotate(hour=TruncHour('disbursement_date')).values('hour')
+        .annotate(count=Count('pk'), amount=Sum('amount')).order_by()
+    )
+    for row in loans:
+        hours[row['hour']]['loans_disbursed'] += row['count']
+        hours[row['hour']]['loan_amount_disbursed'] += row['amount'] or 0
+    return hours
+
+
+def _running_totals(queryset, start_day, end_day, **counts):
+    """
+    {day: {name: count}} of rows created by the end of each day of the
+    range, in one query grouped by creation day
+    """
+    rows = (
+        queryset.filter(created_at__lt=_day_start(end_day + timedelta(days=1)))
+        .annotate(day=TruncDate('created_at')).values('day')
+        .annotate(**{name: Count('pk', filter=condition) for name, condition in counts.items()})
+        .order_by('day')
+    )
+    running = dict.fromkeys(counts, 0)
+    totals = {}
+    day = start_day
+    for row in rows:
+        while day < row['day'] and day <= end_day:
+            totals[day] = dict(running)
+            day += timedelta(days=1)
+        for name in counts:
+            running[name] += row[name]
+    while day <= end_day:
+        totals[day] = dict(running)
+        day += timedelta(days=1)
+    return totals
+
+
+def platform_totals(start_day, end_day):
+    """{day: {field: count}} of the platform-wide totals at the end of each day"""
+    from ..models.market import Product
+    from ..models.thrift import ThriftGroup
+    from ..models.user import User
+
+    users = _running_totals(
+        User.objects.filter(is_active=True, role__in=[User.Role.FARMER, User.Role.BUYER]),
+        start_day, end_day,
+        active_farmers=Q(role=User.Role.FARMER),
+        active_buyers=Q(role=User.Role.BUYER),
+    )
+    products = _running_totals(
+        Product.objects.filter(status=Product.Status.ACTIVE), start_day, end_day, products_listed=Q())
+    groups = _running_totals(
+        ThriftGroup.objects.filter(is_active=True), start_day, end_day, thrift_groups_active=Q())
+    return {day: {**users[day], **products[day], **groups[day]} for day in users}
+
+
+def build(start_day, end_day):
+    """Recompute the hourly and daily analytics of a range of dates (inclusive)"""
+    from ..models.models import AgroAnalytics, AgroAnalyticsHourly
+
+    start, end = _day_start(start_day), _day_start(end_day + timedelta(days=1))
+    hours = hourly_activity(start, end)
+    totals = platform_totals(start_day, end_day)
+
+    daily = {day: dict.fromkeys(HOURLY_FIELDS, 0) for day in totals}
+    for hour, counters in hours.items():
+        day = timezone.localtime(hour).date()
+        for field, value in counters.items():
+            daily[day][field] += value
+
+    with transaction.atomic():
+        # Hours without activity are zeroed rather than left to stale signal counts
+        AgroAnalyticsHourly.objects.filter(hour__gte=start, hour__lt=end).exclude(hour__in=list(hours)).update(
+            **dict.fromkeys(HOURLY_FIELDS, 0)
+        )
+        AgroAnalyticsHourly.objects.bulk_create(
+            [AgroAnalyticsHourly(hour=hour, **counters) for hour, counters in hours.items()],
+            update_conflicts=True, unique_fields=['hour'], update_fields=HOURLY_FIELDS,
+        )
+        rows = []
+        for day, activity in daily.items():
+            units = activity.pop('transaction_units')
+            rows.append(AgroAnalytics(
+                date=day,
+                average_product_price=(activity['total_transaction_value'] / units).quantize(Decimal('0.01'))
+                if units else 0,
+                **activity,
+                **totals[day],
+            ))
+        AgroAnalytics.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['date'], update_fields=DAILY_FIELDS,
+        )
+    logger.info(f"Built analytics for {start_day} to {end_day}: {len(rows)} days, {len(hours)} active hours")
+    return len(rows)
+
+
+# ====================== BACKFILL ======================
+
+def _init_worker():
+    import django
+    django.setup()  # no-op when forked; needed when workers are spawned
+
+
+def _build_slice(start_day, end_day):
+    try:
+        return build(start_day, end_day)
+    finally:
+        connections.close_all()
+
+
+def backfill(start_day, end_day, workers=None, days_per_task=None):
+    """Build a long range in slices of ``days_per_task`` days on worker processes"""
+    workers = workers or WORKERS
+    days_per_task = days_per_task or DAYS_PER_TASK
+    slices = []
+    day = start_day
+    while day <= end_day:
+        slice_end = min(day + timedelta(days=days_per_task - 1), end_day)
+        slices.append((day, slice_end))
+        day = slice_end + timedelta(days=1)
+    if workers == 1 or len(slices) == 1:
+        return sum(build(*bounds) for bounds in slices)
+
+    # Each worker opens its own database connection
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=min(workers, len(slices)), initializer=_init_worker) as pool:
+        return sum(pool.map(_build_slice, *zip(*slices)))
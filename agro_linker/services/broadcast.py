@@ -0,0 +1,235 @@
+"""
+WhatsApp broadcasts to large audiences (market-day announcements to every
+farmer of a cooperative).
+
+A ``Broadcast`` is queued by the API and sent by ``manage.py
+send_broadcasts``:
+
+- the audience (active users matching the roles and languages, with
+  WhatsApp enabled in ``notification_preferences``) is streamed from the
+  database with ``iterator(chunk_size=...)`` as (phone, language) pairs,
+  ordered by language so a chunk mostly shares one template language;
+  no ``User`` instances are built;
+- chunks are sharded across a pool of worker processes. Each worker keeps
+  its own event loop and the provider's pooled async transport, and sends
+  its chunk concurrently, paced by the provider's rate limit shared through
+  the cache (see services/notifications.py);
+- at most ``2 * workers`` chunks are in flight, so memory stays flat
+  whatever the audience size;
+- progress (sent / failed) is added to the broadcast row with ``F()`` as
+  each chunk completes. Cancelling the broadcast stops it after the chunks
+  already in flight.
+"""
+import asyncio
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .notifications import PROVIDERS, RATE_LIMITS, RateLimiter, _chunks, _failed
+
+logger = logging.getLogger(__name__)
+
+WORKERS = getattr(settings, "BROADCAST_WORKERS", 4)
+CHUNK_SIZE = getattr(settings, "BROADCAST_CHUNK_SIZE", 500)
+
+
+def audience(roles=None, languages=None):
+    """Users a broadcast to ``roles`` in ``languages`` (all when empty) goes to"""
+    from ..models.user import User
+
+    users = User.objects.filter(is_active=True, notification_preferences__whatsapp=True).exclude(phone='')
+    if roles:
+        users = users.filter(role__in=roles)
+    if languages:
+        users = users.filter(language__in=languages)
+    return users
+
+
+def recipients(broadcast, chunk_size=None):
+    """Chunks of (phone, language) of the broadcast's audience, streamed"""
+    chunk_size = chunk_size or CHUNK_SIZE
+    rows = (
+        audience(broadcast.roles, broadcast.languages)
+        .order_by('language', 'pk')
+        .values_list('phone', 'language')
+        .iterator(chunk_size=chunk_size)
+    )
+    return _chunks(rows, chunk_size)
+
+
+def queue(created_by, message='', template='', parameters=None, roles=None, languages=None, provider=''):
+    from ..models.models import Broadcast
+
+    return Broadcast.objects.create(
+        created_by=created_by,
+        message=message,
+        template=template,
+        parameters=parameters or [],
+        roles=roles or [],
+        languages=languages or [],
+        provider=provider,
+    )
+
+
+# ====================== WORKERS ======================
+
+_sender = None  # per worker process
+
+
+class ChunkSender:
+    """Sends chunks of one broadcast from a worker process"""
+
+    def __init__(self, provider):
+        from ..models.models import WhatsAppService
+
+        self.loop = asyncio.new_event_loop()
+        self.service = WhatsAppService(provider, async_mode=True)
+        self.limiter = RateLimiter(f"WHATSAPP:{provider}", RATE_LIMITS.get(f"WHATSAPP:{provider}"))
+
+    def send(self, spec, chunk):
+        """(sent, failed, last error) of sending ``spec`` to the (phone, language) pairs of ``chunk``"""
+        results = self.loop.run_until_complete(self._send_chunk(spec, chunk))
+        errors = [result.get('error', 'failed') for result in results if _failed(result)]
+        return len(results) - len(errors), len(errors), errors[-1] if errors else ''
+
+    async def _send_chunk(self, spec, chunk):
+        if not spec['template']:
+            return await asyncio.gather(*[self._send(self.service.send_message, phone, spec['message'])
+                                          for phone, _ in chunk])
+        # Template messages share everything but the recipient within a language
+        by_language = {}
+        for phone, language in chunk:
+            by_language.setdefault(language, []).append(phone)
+        parameters = [str(value) for value in spec['parameters']]
+        return await asyncio.gather(*[
+            self._send(self.service.send_template, phone, spec['template'], language, parameters)
+            for language, phones in by_language.items()
+            for phone in phones
+        ])
+
+    async def _send(self, send, *args):
+        await self.limiter.acquire()
+        return await send(*args)
+
+
+def _init_worker(provider):
+    global _sender
+    import django
+    django.setup()  # no-op when forked; needed when workers are spawned
+    _sender = ChunkSender(provider)
+
+
+def _send_chunk(spec, chunk):
+    return _sender.send(spec, chunk)
+
+
+def _noop():
+    return None
+
+
+# ====================== RUNNING ======================
+
+def claim():
+    """The oldest queued broadcast, marked RUNNING; None if there is none"""
+    from ..models.models import Broadcast
+
+    with transaction.atomic():
+        broadcast = (
+            Broadcast.objects.select_for_update(skip_locked=True)
+            .filter(status=Broadcast.Status.QUEUED)
+            .order_by('created_at')
+            .first()
+        )
+        if broadcast is None:
+            return None
+        broadcast.status, broadcast.started_at = Broadcast.Status.RUNNING, timezone.now()
+        broadcast.total = audience(broadcast.roles, broadcast.languages).count()
+        broadcast.save(update_fields=['status', 'started_at', 'total'])
+    return broadcast
+
+
+def _record(broadcast, futures):
+    """Add the outcome of completed chunks to the broadcast; False once it was cancelled"""
+    from ..models.models import Broadcast
+
+    sent = failed = 0
+    last_error = ''
+    for future in futures:
+        try:
+            chunk_sent, chunk_failed, chunk_error = future.result()
+        except Exception as e:
+            # A crashed worker loses its chunk; count it as failed
+            logger.error(f"Broadcast {broadcast.pk} chunk failed: {str(e)}")
+            chunk_sent, chunk_failed, chunk_error = 0, future.chunk_size, str(e)
+        sent += chunk_sent
+        failed += chunk_failed
+        last_error = chunk_error or last_error
+    updates = {'sent': F('sent') + sent, 'failed': F('failed') + failed}
+    if last_error:
+        updates['last_error'] = last_error[:1000]
+    broadcast.sent += sent
+    broadcast.failed += failed
+    if Broadcast.objects.filter(pk=broadcast.pk, status=Broadcast.Status.RUNNING).update(**updates):
+        return True
+    Broadcast.objects.filter(pk=broadcast.pk).update(**updates)
+    return False
+
+
+def run(broadcast, workers=None, chunk_size=None, progress=None):
+    """
+    Send a RUNNING broadcast; ``progress(broadcast)`` is called after every
+    completed chunk. Returns the broadcast with its final counts.
+    """
+    from ..models.models import Broadcast
+
+    workers = workers or WORKERS
+    provider = broadcast.provider or PROVIDERS.get('WHATSAPP')
+    spec = {'message': broadcast.message, 'template': broadcast.template, 'parameters': broadcast.parameters}
+    status = Broadcast.Status.COMPLETED
+
+    # Children must not inherit open database connections: close them, and
+    # start the whole pool before the audience query opens a new one
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(provider,)) as pool:
+        pool.submit(_noop).result()
+        pending = set()
+        try:
+            for chunk in recipients(broadcast, chunk_size):
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    running = _record(broadcast, done)
+                    if progress:
+                        progress(broadcast)
+                    if not running:
+                        break
+                future = pool.submit(_send_chunk, spec, chunk)
+                future.chunk_size = len(chunk)
+                pending.add(future)
+        except Exception as e:
+            logger.error(f"Broadcast {broadcast.pk} failed: {str(e)}")
+            status = Broadcast.Status.FAILED
+            broadcast.last_error = str(e)[:1000]
+            Broadcast.objects.filter(pk=broadcast.pk).update(last_error=broadcast.last_error)
+        if pending:
+            _record(broadcast, wait(pending).done)
+            if progress:
+                progress(broadcast)
+
+    broadcast.finished_at = timezone.now()
+    finished = Broadcast.objects.filter(pk=broadcast.pk, status=Broadcast.Status.RUNNING).update(
+        status=status, finished_at=broadcast.finished_at
+    )
+    if not finished:
+        # Cancelled while running
+        status = Broadcast.Status.CANCELLED
+        Broadcast.objects.filter(pk=broadcast.pk).update(finished_at=broadcast.finished_at)
+    broadcast.status = status
+    logger.info(
+        f"Broadcast {broadcast.pk} {broadcast.status.lower()}: "
+        f"{broadcast.sent} sent, {broadcast.failed} failed of {broadcast.total}"
+    )
+    return broadcast
@@ -0,0 +1,420 @@
+"""
+Real-time chat delivery.
+
+Clients hold one WebSocket per device (``ws/chat/``, ``consumer.ChatConsumer``)
+and every connection of a user joins the channel-layer group ``chat.user.<id>``.
+A room's events are fanned out to the groups of its participants; with the
+Redis channel layer this reaches every ASGI process, whichever one the
+participants are connected to.
+
+Messages are not written one INSERT per frame. Each process keeps a
+``ChatBuffer`` that collects the messages and read receipts of all its
+connections and flushes them every ``CHAT_FLUSH_INTERVAL`` seconds (sooner
+once ``CHAT_FLUSH_SIZE`` messages are waiting):
+
+- messages are saved with one ``bulk_create``, the rooms' ``last_message``
+  with one ``bulk_update`` and the participants' ``ChatUnreadCounter`` rows
+  with another (``unread_count + n``); only then are they fanned out, with
+  their ids, as one event per recipient for the whole flush
+- read receipts are merged per (user, room) and applied together: one
+  UPDATE marks the messages read and each reader's counter is recounted
+  from the messages after their receipt (the unread tail, not the room)
+- typing events are never stored; they go straight to the other participants
+
+Connections learn of rooms their user joins or leaves from ``chat.join`` and
+``chat.leave`` events sent when the participants change, and stop sending
+to and delivering from rooms left.
+
+Inbox views read the counters, so listing rooms with their unread counts
+never counts messages, however long a room's history.
+
+Backpressure: a process holds at most ``CHAT_MAX_PENDING`` unsaved messages;
+beyond that senders get a ``busy`` error and retry, instead of the buffer
+growing while the database lags. Each connection may send
+``CHAT_RATE_LIMIT`` frames a second (bursts of ``CHAT_RATE_BURST``) and is
+closed when it keeps going over. Events to a client that does not read
+its socket pile up in its channel until the layer's ``capacity``, then are
+dropped; a client that reconnects catches up from the chat history.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, "CHAT_FLUSH_INTERVAL", 0.05)
+FLUSH_SIZE = getattr(settings, "CHAT_FLUSH_SIZE", 500)
+MAX_PENDING = getattr(settings, "CHAT_MAX_PENDING", 5000)
+MAX_MESSAGE_LENGTH = getattr(settings, "CHAT_MAX_MESSAGE_LENGTH", 4000)
+RATE_LIMIT = getattr(settings, "CHAT_RATE_LIMIT", 10)
+RATE_BURST = getattr(settings, "CHAT_RATE_BURST", 30)
+TYPING_INTERVAL = getattr(settings, "CHAT_TYPING_INTERVAL", 3)
+PARTICIPANTS_TTL = getattr(settings, "CHAT_PARTICIPANTS_TTL", 60)
+# Read receipts recounted per query
+RECOUNT_CHUNK = 100
+
+
+class ChatError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class ChatBusy(ChatError):
+    def __init__(self):
+        super().__init__('busy', "Too many messages waiting to be saved, retry shortly")
+
+
+def user_group(user_id):
+    return f"chat.user.{user_id}"
+
+
+# ====================== ROOMS ======================
+
+_participants = {}  # room id: (expires, [user ids])
+
+
+def room_ids(user_id):
+    """Ids of the rooms a user takes part in"""
+    from ..models.chat import ChatRoom
+
+    return set(ChatRoom.objects.filter(participants=user_id).values_list('pk', flat=True))
+
+
+def participants(rooms):
+    """{room id: [user ids]} of ``rooms``; cached for ``CHAT_PARTICIPANTS_TTL`` seconds"""
+    from ..models.chat import ChatRoom
+
+    now = time.monotonic()
+    found = {room: cached[1] for room in rooms if (cached := _participants.get(room)) and cached[0] > now}
+    missing = set(rooms) - set(found)
+    if missing:
+        loaded = defaultdict(list)
+        for room, user_id in ChatRoom.participants.through.objects.filter(
+            chatroom_id__in=missing,
+        ).values_list('chatroom_id', 'user_id'):
+            loaded[room].append(user_id)
+        for room in missing:
+            _participants[room] = (now + PARTICIPANTS_TTL, loaded[room])
+            found[room] = loaded[room]
+    return found
+
+
+def forget_participants(room_id):
+    """Drop a room from the participant cache of this process, after its participants change"""
+    _participants.pop(room_id, None)
+
+
+def add_participants(room_id, user_ids):
+    """Give users who joined a room their unread counter"""
+    from ..models.chat import ChatUnreadCounter
+
+    user_ids = list(user_ids)
+    ChatUnreadCounter.objects.bulk_create(
+        [ChatUnreadCounter(room_id=room_id, user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+    forget_participants(room_id)
+    _announce('chat.join', room_id, user_ids)
+
+
+def remove_participants(room_id, user_ids=None):
+    """Drop the unread counters of users who left a room (everyone by default)"""
+    from ..models.chat import ChatUnreadCounter
+
+    counters = ChatUnreadCounter.objects.filter(room_id=room_id)
+    if user_ids is not None:
+        counters = counters.filter(user_id__in=list(user_ids))
+    # Every participant has a counter: its users are the ones who left
+    user_ids = list(counters.values_list('user_id', flat=True))
+    counters.delete()
+    forget_participants(room_id)
+    _announce('chat.leave', room_id, user_ids)
+
+
+def _announce(kind, room_id, user_ids):
+    """
+    Tell the open connections of users who joined or left a room, once the
+    change commits: the consumers keep their rooms, and other processes
+    cache participants, so a user who left would otherwise go on sending
+    to the room and receiving from it
+    """
+    if user_ids:
+        transaction.on_commit(lambda: async_to_sync(fan_out)(
+            {room_id: user_ids}, [(room_id, kind, {'room': room_id}, None)]))
+
+
+# ====================== STORAGE ======================
+
+def _message_event(message, client_id=None):
+    return {
+        'id': message.pk,
+        'room': message.room_id,
+        'sender': str(message.sender_id),
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat(),
+        'client_id': client_id,
+    }
+
+
+def save_messages(entries):
+    """
+    Save (room id, sender id, content) entries, one INSERT for all, and move
+    the rooms' ``last_message`` and their participants' unread counters;
+    returns the ChatMessages in order
+    """
+    from ..models.chat import ChatMessage, ChatRoom, ChatUnreadCounter
+
+    now = timezone.now()
+    with transaction.atomic():
+        messages = ChatMessage.objects.bulk_create(
+            [ChatMessage(room_id=room, sender_id=sender, content=content) for room, sender, content in entries],
+            batch_size=1000,
+        )
+        sent = defaultdict(Counter)
+        latest = {}
+        for message in messages:
+            sent[message.room_id][message.sender_id] += 1
+            latest[message.room_id] = max(latest.get(message.room_id, message.timestamp), message.timestamp)
+        ChatRoom.objects.bulk_update(
+            [ChatRoom(pk=room, last_message=now) for room in sorted(sent)], ['last_message'], batch_size=1000)
+        # Everyone's counter takes the messages the others sent
+        ChatUnreadCounter.objects.bulk_update(
+            [
+                ChatUnreadCounter(
+                    pk=pk,
+                    unread_count=F('unread_count') + (sum(sent[room].values()) - sent[room][user_id]),
+                    last_message_at=latest[room],
+                )
+                for pk, room, user_id in
+                ChatUnreadCounter.objects.filter(room__in=list(sent)).order_by('pk').values_list('pk', 'room_id', 'user_id')
+            ],
+            ['unread_count', 'last_message_at'], batch_size=1000,
+        )
+    return messages
+
+
+def mark_read(receipts):
+    """
+    Apply (user id, room id, message id) read receipts: the messages others
+    sent in the room up to that one are marked read, and the reader's unread
+    counter is recounted from the messages after it. Receipts naming a
+    message not in the room, or not past the reader's last receipt, are
+    dropped. Returns the receipts applied.
+    """
+    from ..models.chat import ChatMessage, ChatUnreadCounter
+
+    receipts = list(receipts)
+    if not receipts:
+        return []
+    with transaction.atomic():
+        known = set(ChatMessage.objects.filter(
+            reduce(or_, (Q(room_id=room, pk=up_to) for _, room, up_to in receipts)),
+        ).values_list('room_id', 'pk'))
+        # Locked so a message saved meanwhile is either counted here or added after
+        counters = {
+            (counter.room_id, counter.user_id): counter for counter in
+            ChatUnreadCounter.objects.select_for_update().filter(
+                reduce(or_, (Q(room_id=room, user_id=user_id) for user_id, room, _ in receipts)),
+            ).order_by('pk')
+        }
+        applied = [
+            (user_id, room, up_to) for user_id, room, up_to in receipts
+            if (room, up_to) in known and (room, user_id) in counters
+            and up_to > counters[(room, user_id)].last_read_id
+        ]
+        if not applied:
+            return []
+
+        ChatMessage.objects.filter(
+            reduce(or_, (
+                Q(room_id=room, pk__gt=counters[(room, user_id)].last_read_id, pk__lte=up_to) & ~Q(sender_id=user_id)
+                for user_id, room, up_to in applied
+            )),
+            is_read=False,
+        ).update(is_read=True)
+
+        remaining = {}
+        for start in range(0, len(applied), RECOUNT_CHUNK):
+            chunk = list(enumerate(applied[start:start + RECOUNT_CHUNK], start))
+            remaining.update(ChatMessage.objects.filter(
+                reduce(or_, (Q(room_id=room, pk__gt=up_to) for _, (_, room, up_to) in chunk)),
+            ).aggregate(**{
+                f"r{index}": Count('pk', filter=Q(room_id=room, pk__gt=up_to) & ~Q(sender_id=user_id))
+                for index, (user_id, room, up_to) in chunk
+            }))
+        for index, (user_id, room, up_to) in enumerate(applied):
+            counter = counters[(room, user_id)]
+            counter.unread_count, counter.last_read_id = remaining[f"r{index}"], up_to
+        ChatUnreadCounter.objects.bulk_update(
+            [counters[(room, user_id)] for user_id, room, _ in applied], ['unread_count', 'last_read_id'],
+            batch_size=1000,
+        )
+    return applied
+
+
+# ====================== FAN-OUT ======================
+
+async def fan_out(room_members, events):
+    """
+    Send channel-layer events to room participants: ``events`` is a list of
+    (room id, event type, payload, user id to skip); every recipient gets one
+    event with all of its payloads of a type
+    """
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    outbox = defaultdict(list)
+    for room, kind, payload, skip in events:
+        for user_id in room_members.get(room, ()):
+            if user_id != skip:
+                outbox[(user_id, kind)].append(payload)
+    results = await asyncio.gather(
+        *(layer.group_send(user_group(user_id), {'type': kind, 'events': payloads})
+          for (user_id, kind), payloads in outbox.items()),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Chat fan-out failed: {str(result)}")
+
+
+def _read_event(user_id, room, up_to):
+    return {'room': room, 'user': str(user_id), 'up_to': up_to}
+
+
+def publish(messages=(), receipts=()):
+    """
+    Fan out messages and applied read receipts saved outside the WebSocket
+    path (e.g. the REST API); sync code only
+    """
+    events = [(message.room_id, 'chat.message', _message_event(message), None) for message in messages]
+    # Read receipts reach the reader's other devices too
+    events += [(room, 'chat.read', _read_event(user_id, room, up_to), None) for user_id, room, up_to in receipts]
+    if events:
+        async_to_sync(fan_out)(participants({room for room, *_ in events}), events)
+
+
+# ====================== BUFFER ======================
+
+class ChatBuffer:
+    """Messages and read receipts of one process's connections, waiting to be flushed"""
+
+    def __init__(self):
+        self.messages = []  # (room id, sender id, content, client id, future)
+        self.receipts = {}  # (user id, room id): up_to
+        self.saving = 0
+        self._full = asyncio.Event()
+        self._task = None
+
+    def add_message(self, room, sender, content, client_id=None):
+        """Queue a message; returns a future of the saved ChatMessage. Raises ChatBusy when full"""
+        if len(self.messages) + self.saving >= MAX_PENDING:
+            raise ChatBusy()
+        future = asyncio.get_running_loop().create_future()
+        self.messages.append((room, sender, content, client_id, future))
+        if len(self.messages) >= FLUSH_SIZE:
+            self._full.set()
+        self._start()
+        return future
+
+    def add_receipt(self, user_id, room, up_to):
+        key = (user_id, room)
+        self.receipts[key] = max(self.receipts.get(key, 0), up_to)
+        self._start()
+
+    def _start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while self.messages or self.receipts:
+            if len(self.messages) < FLUSH_SIZE:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), FLUSH_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+            batch, self.messages = self.messages[:FLUSH_SIZE], self.messages[FLUSH_SIZE:]
+            receipts, self.receipts = self.receipts, {}
+            self.saving = len(batch)
+            try:
+                await self.flush(batch, receipts)
+            finally:
+                self.saving = 0
+
+    async def flush(self, batch, receipts):
+        events = []
+        if batch:
+            try:
+                messages = await database_sync_to_async(save_messages)(
+                    [(room, sender, content) for room, sender, content, _, _ in batch])
+            except Exception as e:
+                logger.exception(f"Failed to save {len(batch)} chat messages")
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(ChatError('not_saved', str(e)))
+                messages = []
+            for message, (_, _, _, client_id, future) in zip(messages, batch):
+                if not future.done():
+                    future.set_result(message)
+                events.append((message.room_id, 'chat.message', _message_event(message, client_id), None))
+
+        if receipts:
+            try:
+                applied = await database_sync_to_async(mark_read)(
+                    [(user_id, room, up_to) for (user_id, room), up_to in receipts.items()])
+                events.extend(
+                    (room, 'chat.read', _read_event(user_id, room, up_to), None) for user_id, room, up_to in applied
+                )
+            except Exception:
+                logger.exception(f"Failed to save {len(receipts)} chat read receipts")
+
+        if events:
+            members = await database_sync_to_async(participants)({room for room, *_ in events})
+            await fan_out(members, events)
+
+
+_buffers = weakref.WeakKeyDictionary()
+
+
+def get_buffer():
+    """The ChatBuffer of the running event loop"""
+    loop = asyncio.get_running_loop()
+    if loop not in _buffers:
+        _buffers[loop] = ChatBuffer()
+    return _buffers[loop]
+
+
+# ====================== RATE LIMITING ======================
+
+class RateLimiter:
+    """Token bucket of ``rate`` frames a second, ``burst`` at once"""
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate or RATE_LIMIT
+        self.burst = burst or RATE_BURST
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.refused = 0
+
+    def allow(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.refused = 0
+            return True
+        self.refused += 1
+        return False
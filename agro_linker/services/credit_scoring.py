@@ -0,0 +1,252 @@
+"""
+Farmer credit scoring.
+
+Scores are computed for many farmers at once (``manage.py score_farmers``
+scores everyone nightly). Each feature family is one grouped aggregate
+query over all the farmers being scored, never a query per farmer:
+
+- sales: paid orders and revenue over the last ``CREDIT_SALES_WINDOW_DAYS``
+- repayment: share of installments already due that are paid, the share
+  of the amount due still in arrears, and defaulted loans
+- thrift: share of the cycles of the member's groups with a verified
+  contribution
+- farm: farm size, average yield, experience, verification
+
+Features are scored as NumPy arrays: each component is scaled to [0, 1]
+and the score is ``300 + 700 x`` their weighted sum (``CREDIT_SCORE_WEIGHTS``),
+minus ``CREDIT_DEFAULT_PENALTY`` per defaulted loan, in [0, 1000]. Farmers
+without repayment history score neutral (0.5) on it. Only scores that
+changed are written, with ``bulk_update``.
+
+A farmer's credit limit grows with the square of the score above 300, up
+to ``CREDIT_LIMIT_MAX``. It is cached per farmer (written for everyone
+by the nightly run); at application time the loans still outstanding are
+taken off it, so the limit is current without rescoring.
+"""
+import logging
+import math
+from datetime import timedelta
+from decimal import ROUND_DOWN, Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS = getattr(settings, "CREDIT_SCORE_WEIGHTS", {
+    'repayment': 0.35,
+    'sales': 0.25,
+    'thrift': 0.15,
+    'farm': 0.15,
+    'verification': 0.10,
+})
+DEFAULT_PENALTY = getattr(settings, "CREDIT_DEFAULT_PENALTY", 150)
+SALES_WINDOW = timedelta(days=getattr(settings, "CREDIT_SALES_WINDOW_DAYS", 365))
+# Yearly revenue, yearly paid orders and farm size (hectares) that earn full marks
+REFERENCE_REVENUE = getattr(settings, "CREDIT_REFERENCE_REVENUE", 500000)
+REFERENCE_ORDERS = getattr(settings, "CREDIT_REFERENCE_ORDERS", 24)
+REFERENCE_FARM_SIZE = getattr(settings, "CREDIT_REFERENCE_FARM_SIZE", 10)
+LIMIT_MAX = Decimal(str(getattr(settings, "CREDIT_LIMIT_MAX", 200000)))
+BATCH_SIZE = getattr(settings, "CREDIT_SCORE_BATCH_SIZE", 20000)
+CACHE_ALIAS = getattr(settings, "CREDIT_CACHE_ALIAS", "default")
+CACHE_TIMEOUT = getattr(settings, "CREDIT_LIMIT_CACHE_TIMEOUT", 60 * 60 * 26)
+
+MIN_SCORE, MAX_SCORE, BASE_SCORE = 0, 1000, 300
+# Loans whose unpaid amount counts against the limit
+OUTSTANDING = ['approved', 'disbursed', 'partially_paid']
+
+
+def _cache_key(farmer_id):
+    return f"credit:limit:{farmer_id}"
+
+
+# ====================== FEATURES ======================
+
+def features(farmer_ids, now=None):
+    """
+    {name: float array} of scoring features, aligned with ``farmer_ids``;
+    one query per feature family
+    """
+    import numpy as np
+
+    from ..models.finance import LoanApplication, RepaymentSchedule
+    from ..models.market import OrderItem
+    from ..models.thrift import ThriftContribution, ThriftMembership
+    from ..models.user import FarmerProfile
+
+    now = now or timezone.now()
+    farmer_ids = list(farmer_ids)
+    row = {farmer_id: index for index, farmer_id in enumerate(farmer_ids)}
+    columns = {name: np.zeros(len(farmer_ids)) for name in (
+        'farm_size', 'average_yield', 'experience', 'verified', 'orders', 'revenue',
+        'installments_due', 'installments_paid', 'amount_due', 'amount_unpaid', 'defaults',
+        'thrift_cycles', 'thrift_contributed',
+    )}
+
+    def fill(rows, *names):
+        for farmer_id, *values in rows:
+            index = row.get(farmer_id)
+            if index is not None:
+                for name, value in zip(names, values):
+                    columns[name][index] = float(value or 0)
+
+    profiles = list(FarmerProfile.objects.filter(pk__in=farmer_ids).values_list(
+        'pk', 'user_id', 'farm_size', 'average_yield', 'farming_experience', 'verification_status'))
+    users = {user_id: farmer_id for farmer_id, user_id, *_ in profiles}
+    fill(
+        ((farmer_id, farm_size, average_yield, experience, verification == FarmerProfile.VerificationStatus.VERIFIED)
+         for farmer_id, _, farm_size, average_yield, experience, verification in profiles),
+        'farm_size', 'average_yield', 'experience', 'verified',
+    )
+
+    revenue = ExpressionWrapper(F('quantity') * F('unit_price'), output_field=DecimalField())
+    fill(
+        OrderItem.objects.filter(
+            product__farmer__in=farmer_ids, order__payment_status='PAID', order__created_at__gte=now - SALES_WINDOW,
+        ).values('product__farmer').annotate(
+            orders=Count('order', distinct=True), revenue=Sum(revenue),
+        ).order_by().values_list('product__farmer', 'orders', 'revenue'),
+        'orders', 'revenue',
+    )
+
+    due = Q(due_date__lt=now.date())
+    unpaid = ExpressionWrapper(F('amount') - Coalesce(F('amount_paid'), Decimal(0)), output_field=DecimalField())
+    fill(
+        RepaymentSchedule.objects.filter(due, loan__farmer__in=farmer_ids).values('loan__farmer').annotate(
+            due=Count('pk'),
+            paid=Count('pk', filter=Q(status='paid')),
+            amount_due=Sum('amount'),
+            amount_unpaid=Sum(unpaid, filter=~Q(status='paid')),
+        ).order_by().values_list('loan__farmer', 'due', 'paid', 'amount_due', 'amount_unpaid'),
+        'installments_due', 'installments_paid', 'amount_due', 'amount_unpaid',
+    )
+    fill(
+        LoanApplication.objects.filter(farmer__in=farmer_ids, status='defaulted').values('farmer')
+        .annotate(defaults=Count('pk')).order_by().values_list('farmer', 'defaults'),
+        'defaults',
+    )
+
+    # Two queries: joining contributions would multiply the group cycles summed
+    fill(
+        ((users[user_id], cycles) for user_id, cycles in
+         ThriftMembership.objects.filter(user__in=list(users)).values('user')
+         .annotate(cycles=Sum('group__current_cycle')).order_by().values_list('user', 'cycles')),
+        'thrift_cycles',
+    )
+    contributed = {}
+    for user_id, cycles in (
+        ThriftContribution.objects.filter(membership__user__in=list(users), is_verified=True)
+        .values('membership__user', 'membership').annotate(cycles=Count('cycle', distinct=True))
+        .order_by().values_list('membership__user', 'cycles')
+    ):
+        contributed[users[user_id]] = contributed.get(users[user_id], 0) + cycles
+    fill(contributed.items(), 'thrift_contributed')
+    return columns
+
+
+# ====================== SCORING ======================
+
+def score(columns):
+    """Scores (float array) of the farmers described by ``features`` columns"""
+    import numpy as np
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        has_history = columns['installments_due'] > 0
+        punctuality = np.where(has_history, columns['installments_paid'] / columns['installments_due'], 0.5)
+        arrears = np.where(columns['amount_due'] > 0, columns['amount_unpaid'] / columns['amount_due'], 0)
+        repayment = np.where(has_history, 0.6 * punctuality + 0.4 * (1 - arrears), 0.5)
+
+        sales = (
+            0.7 * np.log1p(columns['revenue']) / math.log1p(REFERENCE_REVENUE)
+            + 0.3 * np.log1p(columns['orders']) / math.log1p(REFERENCE_ORDERS)
+        )
+        thrift = np.where(columns['thrift_cycles'] > 0, columns['thrift_contributed'] / columns['thrift_cycles'], 0)
+        farm = (
+            0.5 * np.log1p(columns['farm_size']) / math.log1p(REFERENCE_FARM_SIZE)
+            + 0.3 * (columns['average_yield'] > 0)
+            + 0.2 * np.minimum(columns['experience'] / 10, 1)
+        )
+
+    components = {
+        'repayment': repayment, 'sales': sales, 'thrift': thrift, 'farm': farm, 'verification': columns['verified'],
+    }
+    total = sum(WEIGHTS[name] * np.clip(np.nan_to_num(value), 0, 1) for name, value in components.items())
+    total = total / sum(WEIGHTS.values())
+    scores = BASE_SCORE + (MAX_SCORE - BASE_SCORE) * total - DEFAULT_PENALTY * columns['defaults']
+    return np.round(np.clip(scores, MIN_SCORE, MAX_SCORE), 1)
+
+
+def limit_for(score):
+    """Credit limit earned by a score, before loans outstanding"""
+    if score is None:
+        return Decimal(0)
+    share = max(score - BASE_SCORE, 0) / (MAX_SCORE - BASE_SCORE)
+    # Whole hundreds
+    return (LIMIT_MAX * Decimal(share * share) / 100).to_integral_value(ROUND_DOWN) * 100
+
+
+def score_farmers(farmers=None, now=None):
+    """
+    Score ``farmers`` (FarmerProfile rows or pks; everyone by default),
+    store changed scores and cache the limits; returns {farmer pk: score}
+    """
+    from ..models.user import FarmerProfile
+
+    if farmers is None:
+        farmer_ids = list(FarmerProfile.objects.order_by('pk').values_list('pk', flat=True))
+    else:
+        farmer_ids = [getattr(farmer, 'pk', farmer) for farmer in farmers]
+
+    scores, updated = {}, 0
+    for start in range(0, len(farmer_ids), BATCH_SIZE):
+        batch = farmer_ids[start:start + BATCH_SIZE]
+        batch_scores = dict(zip(batch, score(features(batch, now)).tolist()))
+        changed = [
+            FarmerProfile(pk=farmer_id, credit_score=batch_scores[farmer_id])
+            for farmer_id, current in FarmerProfile.objects.filter(pk__in=batch).values_list('pk', 'credit_score')
+            if current != batch_scores[farmer_id]
+        ]
+        FarmerProfile.objects.bulk_update(changed, ['credit_score'], batch_size=1000)
+        _cache_limits(batch_scores)
+        scores.update(batch_scores)
+        updated += len(changed)
+    logger.info(f"Scored {len(scores)} farmers: {updated} scores changed")
+    return scores
+
+
+def _cache_limits(scores):
+    try:
+        caches[CACHE_ALIAS].set_many(
+            {_cache_key(farmer_id): limit_for(value) for farmer_id, value in scores.items()}, CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Credit limit cache unavailable: {str(e)}")
+
+
+# ====================== LIMITS ======================
+
+def credit_limit(farmer):
+    """
+    What ``farmer`` (a FarmerProfile) may borrow now: the cached limit of
+    their score, scored on the spot when missing, less the loans
+    outstanding
+    """
+    from ..models.finance import LoanApplication
+
+    try:
+        limit = caches[CACHE_ALIAS].get(_cache_key(farmer.pk))
+    except Exception as e:
+        logger.warning(f"Credit limit cache unavailable: {str(e)}")
+        limit = None
+    if limit is None:
+        if farmer.credit_score is None:
+            farmer.credit_score = score_farmers([farmer.pk])[farmer.pk]
+        else:
+            _cache_limits({farmer.pk: farmer.credit_score})
+        limit = limit_for(farmer.credit_score)
+
+    outstanding = LoanApplication.objects.filter(farmer=farmer, status__in=OUTSTANDING).aggregate(
+        total=Coalesce(Sum(F('amount') - F('amount_paid')), Decimal(0)))['total']
+    return max(limit - outstanding, Decimal(0))
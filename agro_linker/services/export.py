@@ -0,0 +1,294 @@
+"""
+Columnar exports for analysts.
+
+Each dataset (``DATASETS``) is one table streamed with a server-side cursor
+(``values_list(...).iterator(chunk_size=...)``) and converted chunk by
+chunk into Arrow record batches, so memory holds one batch whatever the
+size of the table. ``manage.py export_parquet`` writes the batches to
+Parquet files partitioned by month under ``EXPORT_ROOT``:
+
+    {EXPORT_ROOT}/orders/month=2025-03/part-20250401T020000-0.parquet
+
+and ``GET /export/{dataset}`` streams the same batches as an Arrow IPC
+stream.
+
+Exports are incremental. Every dataset has a watermark column (its
+``updated_at``, the time of insertion for rows that never change, or its
+primary key), and a run only exports rows past the watermark of the
+previous run, up to a bound fixed when the run starts:
+``EXPORT_WATERMARK_LAG`` seconds ago for timestamps (so rows committed late
+with an earlier timestamp are not skipped), the current maximum for keys.
+Business dates (a price's ``date``) are never watermarks: rows backfilled
+or corrected for a past date would fall behind the watermark and be
+missed. Watermarks are kept in ``SystemSettings`` and only advance once
+every file of the run is in place; a failed run is simply exported again.
+An updated row is exported again with its new values, so readers keep the
+latest version of each ``id``.
+"""
+import io
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .notifications import _chunks
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, "EXPORT_BATCH_SIZE", 50000)
+FILE_ROWS = getattr(settings, "EXPORT_FILE_ROWS", 1000000)
+ROOT = getattr(settings, "EXPORT_ROOT", os.path.join(settings.BASE_DIR, 'exports'))
+WATERMARK_LAG = timedelta(seconds=getattr(settings, "EXPORT_WATERMARK_LAG", 60))
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    model: str  # "app_label.Model"
+    watermark: str  # column rows are exported in order of, and incrementally by
+
+    @property
+    def model_class(self):
+        return apps.get_model(self.model)
+
+    @property
+    def watermark_field(self):
+        return self.model_class._meta.get_field(self.watermark)
+
+
+DATASETS = {dataset.name: dataset for dataset in [
+    Dataset('orders', 'agro_linker.Order', 'updated_at'),
+    Dataset('order_items', 'agro_linker.OrderItem', 'id'),
+    Dataset('bids', 'agro_linker.Bid', 'updated_at'),
+    Dataset('offers', 'agro_linker.Offer', 'updated_at'),
+    Dataset('price_trends', 'agro_linker.PriceTrend', 'updated_at'),
+    Dataset('weather', 'agro_linker.WeatherData', 'updated_at'),
+    Dataset('wallet_transactions', 'agro_linker.WalletTransaction', 'transaction_date'),
+]}
+
+
+# ====================== SCHEMA ======================
+
+def _column(field):
+    """(Arrow type, converter or None) of a model field"""
+    import pyarrow as pa
+
+    if field.is_relation:
+        return _column(field.target_field)
+    internal = field.get_internal_type()
+    if internal.endswith('IntegerField') or internal.endswith('AutoField'):
+        return pa.int64(), None
+    if internal == 'DecimalField':
+        return pa.decimal128(field.max_digits, field.decimal_places), None
+    if internal == 'FloatField':
+        return pa.float64(), None
+    if internal == 'BooleanField':
+        return pa.bool_(), None
+    if internal == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC'), None
+    if internal == 'DateField':
+        return pa.date32(), None
+    if internal == 'JSONField':
+        return pa.string(), json.dumps
+    return pa.string(), str
+
+
+def schema(dataset):
+    """(Arrow schema, column names, converters) of a dataset"""
+    import pyarrow as pa
+
+    fields = dataset.model_class._meta.concrete_fields
+    columns = [_column(field) for field in fields]
+    arrow_schema = pa.schema([
+        pa.field(field.attname, arrow_type, nullable=field.null)
+        for field, (arrow_type, _) in zip(fields, columns)
+    ])
+    return arrow_schema, [field.attname for field in fields], [converter for _, converter in columns]
+
+
+def _record_batch(arrow_schema, converters, rows):
+    import pyarrow as pa
+
+    arrays = []
+    for values, converter, field in zip(zip(*rows), converters, arrow_schema):
+        if converter is not None:
+            values = [None if value is None else converter(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=arrow_schema)
+
+
+# ====================== WATERMARKS ======================
+
+def _watermark_key(dataset):
+    return f"export_watermark:{dataset.name}"
+
+
+def parse_watermark(dataset, value):
+    """A watermark of ``dataset`` from its ISO (or integer) text; raises ValueError"""
+    if value is None or value == '':
+        return None
+    internal = dataset.watermark_field.get_internal_type()
+    if internal == 'DateTimeField':
+        moment = datetime.fromisoformat(value)
+        return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+    return int(value)
+
+
+def get_watermark(dataset):
+    from ..models.models import SystemSettings
+
+    setting = SystemSettings.objects.filter(key=_watermark_key(dataset)).first()
+    return parse_watermark(dataset, setting.value.get('watermark')) if setting else None
+
+
+def set_watermark(dataset, watermark):
+    from ..models.models import SystemSettings
+
+    value = watermark.isoformat() if isinstance(watermark, (date, datetime)) else watermark
+    SystemSettings.objects.update_or_create(
+        key=_watermark_key(dataset),
+        defaults={'value': {'watermark': value}, 'description': f"Last exported {dataset.watermark} of {dataset.name}"},
+    )
+
+
+def upper_bound(dataset):
+    """The watermark an export starting now goes up to"""
+    internal = dataset.watermark_field.get_internal_type()
+    if internal == 'DateTimeField':
+        return timezone.now() - WATERMARK_LAG
+    return dataset.model_class._default_manager.aggregate(last=Max(dataset.watermark))['last'] or 0
+
+
+# ====================== READING ======================
+
+def record_batches(dataset, since=None, until=None, batch_size=None):
+    """
+    Record batches of the rows of ``dataset`` with a watermark in
+    (``since``, ``until``], in watermark order
+    """
+    batch_size = batch_size or BATCH_SIZE
+    arrow_schema, columns, converters = schema(dataset)
+    rows = dataset.model_class._default_manager.all()
+    if since is not None:
+        rows = rows.filter(**{f"{dataset.watermark}__gt": since})
+    if until is not None:
+        rows = rows.filter(**{f"{dataset.watermark}__lte": until})
+    rows = rows.order_by(dataset.watermark, 'pk').values_list(*columns).iterator(chunk_size=batch_size)
+    for chunk in _chunks(rows, batch_size):
+        yield _record_batch(arrow_schema, converters, chunk)
+
+
+def arrow_stream(dataset, since=None, until=None):
+    """Bytes of an Arrow IPC stream of the dataset, produced batch by batch"""
+    import pyarrow as pa
+
+    sink = io.BytesIO()
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    writer = pa.ipc.new_stream(sink, schema(dataset)[0])
+    yield drain()
+    for batch in record_batches(dataset, since, until):
+        writer.write_batch(batch)
+        yield drain()
+    writer.close()
+    yield drain()
+
+
+# ====================== PARQUET ======================
+
+def _partition(dataset, batch):
+    """Month partitions of a batch as (partition, batch slice); rows are in watermark order"""
+    internal = dataset.watermark_field.get_internal_type()
+    if internal not in ('DateTimeField', 'DateField'):
+        yield None, batch
+        return
+    values = batch.column(dataset.watermark_field.attname).to_pylist()
+    start = 0
+    for index in range(1, len(values) + 1):
+        if index == len(values) or values[index].strftime('%Y-%m') != values[start].strftime('%Y-%m'):
+            yield f"month={values[start]:%Y-%m}", batch.slice(start, index - start)
+            start = index
+
+
+class _PartitionWriter:
+    """Parquet files of one run, rolled per partition and every ``FILE_ROWS`` rows"""
+
+    def __init__(self, directory, run, arrow_schema):
+        self.directory = directory
+        self.run = run
+        self.schema = arrow_schema
+        self.writer = None
+        self.partition = None
+        self.rows = 0
+        self.files = []
+        self._pending = []
+
+    def write(self, partition, batch):
+        import pyarrow.parquet as pq
+
+        if self.writer is None or partition != self.partition or self.rows >= FILE_ROWS:
+            self._close_file()
+            directory = os.path.join(self.directory, partition) if partition else self.directory
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{self.run}-{len(self.files) + len(self._pending)}.parquet")
+            self._pending.append(path)
+            # Written under a temporary name, moved into place once the run succeeds
+            self.writer = pq.ParquetWriter(f"{path}.tmp", self.schema, compression='zstd')
+            self.partition, self.rows = partition, 0
+        self.writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def _close_file(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def commit(self):
+        self._close_file()
+        for path in self._pending:
+            os.replace(f"{path}.tmp", path)
+        self.files.extend(self._pending)
+        self._pending = []
+        return self.files
+
+    def abort(self):
+        self._close_file()
+        for path in self._pending:
+            if os.path.exists(f"{path}.tmp"):
+                os.remove(f"{path}.tmp")
+        self._pending = []
+
+
+def export(dataset, root=None, full=False, batch_size=None):
+    """
+    Write the rows of ``dataset`` past its watermark (all rows when
+    ``full``) to Parquet and advance the watermark; returns (rows, files)
+    """
+    since = None if full else get_watermark(dataset)
+    until = upper_bound(dataset)
+    run = timezone.now().strftime('%Y%m%dT%H%M%S')
+    writer = _PartitionWriter(os.path.join(root or ROOT, dataset.name), run, schema(dataset)[0])
+    rows = 0
+    try:
+        for batch in record_batches(dataset, since, until, batch_size):
+            for partition, part in _partition(dataset, batch):
+                writer.write(partition, part)
+            rows += batch.num_rows
+    except BaseException:
+        writer.abort()
+        raise
+    files = writer.commit()
+    set_watermark(dataset, until)
+    logger.info(f"Exported {rows} {dataset.name} rows to {len(files)} files (up to {until})")
+    return rows, files
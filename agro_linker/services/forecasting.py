@@ -0,0 +1,310 @@
+"""
+Batch price forecasting for ``PriceTrend``.
+
+All (crop_type, market) series are fitted together. The last
+``FORECAST_HISTORY_DAYS`` of daily prices are loaded with one query into a
+series x day NumPy matrix (gaps are NaN) and every step below is an array
+operation over all series at once; the only Python loops are over months
+and days, never over series.
+
+- Seasonality: a multiplicative index per calendar month and series, from
+  the series' own monthly means where it has enough history, shrunk
+  towards a prior from ``CropCalendar``: prices dip by
+  ``FORECAST_HARVEST_DIP`` in the crop's harvesting months (across all
+  regions) and are correspondingly higher in the others.
+- Level and trend: damped-trend exponential smoothing (Holt) of the
+  deseasonalised prices. Every smoothing constant in ``FORECAST_ALPHAS`` is
+  run side by side (the grid is stacked into the matrix) and each series
+  keeps the one with the lowest one-step-ahead error.
+
+The one-step-ahead forecast of each day is written to
+``PriceTrend.predicted_price`` with ``bulk_update`` (for rows that have
+none yet, or all rows with ``refit=True``). Forecasts of the next
+``FORECAST_HORIZON_DAYS`` are published as JSON to Redis for the MCP
+service (``agro.price_discovery`` in microservice/mcp_service.py):
+
+    agro:forecast:{crop_type}            average over the crop's markets
+    agro:forecast:{crop_type}:{market}   one market
+
+Keys are lower-cased. ``manage.py forecast_prices`` runs it nightly.
+"""
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = getattr(settings, "FORECAST_HISTORY_DAYS", 730)
+HORIZON_DAYS = getattr(settings, "FORECAST_HORIZON_DAYS", 30)
+ALPHAS = getattr(settings, "FORECAST_ALPHAS", (0.1, 0.2, 0.4, 0.6, 0.8))
+BETA = getattr(settings, "FORECAST_BETA", 0.05)
+PHI = getattr(settings, "FORECAST_DAMPING", 0.98)
+HARVEST_DIP = getattr(settings, "FORECAST_HARVEST_DIP", 0.15)
+# Days of a calendar month a series needs before its own seasonality is trusted fully
+SEASON_MIN_DAYS = getattr(settings, "FORECAST_SEASON_MIN_DAYS", 60)
+REDIS_URL = getattr(settings, "MCP_REDIS_URL", "redis://127.0.0.1:6379/0")
+CACHE_TTL = getattr(settings, "FORECAST_CACHE_TTL", 60 * 60 * 48)
+KEY_PREFIX = "agro:forecast"
+
+
+def forecast_key(crop_type, market=None):
+    parts = [KEY_PREFIX, crop_type.strip().lower()]
+    if market:
+        parts.append(market.strip().lower())
+    return ':'.join(parts)
+
+
+# ====================== LOADING ======================
+
+class History:
+    """Daily prices of many series on a common calendar"""
+
+    def __init__(self, series, start, prices, ids, predicted):
+        self.series = series  # [(crop_type, market)], one per row
+        self.start = start  # date of column 0
+        self.prices = prices  # float (series, days), NaN where there is no row
+        self.ids = ids  # int (series, days), PriceTrend pk or 0
+        self.predicted = predicted  # bool (series, days), row already has a predicted_price
+
+    @property
+    def days(self):
+        return self.prices.shape[1]
+
+    def months(self):
+        """Calendar month (0-11) of every column"""
+        import numpy as np
+        return np.array([(self.start + timedelta(days=day)).month - 1 for day in range(self.days)])
+
+
+def load_history(crop_type=None, end=None, days=None):
+    import numpy as np
+    from ..models.market import PriceTrend
+
+    end = end or timezone.localdate()
+    start = end - timedelta(days=(days or HISTORY_DAYS) - 1)
+    rows = PriceTrend.objects.filter(date__gte=start, date__lte=end)
+    if crop_type:
+        rows = rows.filter(crop_type=crop_type)
+    index = {}
+    cells = []
+    for pk, crop, market, day, price, predicted in (
+        rows.order_by().values_list('pk', 'crop_type', 'market', 'date', 'avg_price', 'predicted_price')
+        .iterator(chunk_size=10000)
+    ):
+        row = index.setdefault((crop, market), len(index))
+        cells.append((row, (day - start).days, float(price), pk, predicted is not None))
+
+    width = (end - start).days + 1
+    prices = np.full((len(index), width), np.nan)
+    ids = np.zeros((len(index), width), dtype=np.int64)
+    predicted = np.zeros((len(index), width), dtype=bool)
+    if cells:
+        row, column, price, pk, has_prediction = (np.array(values) for values in zip(*cells))
+        prices[row, column] = price
+        ids[row, column] = pk
+        predicted[row, column] = has_prediction
+    return History(list(index), start, prices, ids, predicted)
+
+
+def calendar_prior(series):
+    """(series, 12) seasonal index implied by the crop calendars"""
+    import numpy as np
+    from ..models.models import CropCalendar
+
+    harvests = defaultdict(set)
+    for crop, months in CropCalendar.objects.values_list('crop_type', 'harvesting_months'):
+        harvests[crop.strip().lower()].update(month - 1 for month in months or [] if 1 <= month <= 12)
+
+    prior = np.ones((len(series), 12))
+    for row, (crop, _) in enumerate(series):
+        months = sorted(harvests.get(crop.strip().lower(), ()))
+        if months and len(months) < 12:
+            prior[row, :] = 1 + HARVEST_DIP * len(months) / (12 - len(months))
+            prior[row, months] = 1 - HARVEST_DIP
+    return prior
+
+
+# ====================== FITTING ======================
+
+def seasonal_index(history, prior):
+    """(series, 12) multiplicative index, own history blended with the prior, mean 1"""
+    import numpy as np
+
+    months = history.months()
+    observed = np.isfinite(history.prices)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        overall = np.nanmean(np.where(observed, history.prices, np.nan), axis=1, keepdims=True)
+        own = np.ones_like(prior)
+        coverage = np.zeros_like(prior)
+        for month in range(12):
+            columns = months == month
+            if not columns.any():
+                continue
+            prices = history.prices[:, columns]
+            counts = np.isfinite(prices).sum(axis=1)
+            means = np.nansum(np.nan_to_num(prices), axis=1) / np.maximum(counts, 1)
+            own[:, month] = np.where(counts > 0, means / overall[:, 0], 1)
+            coverage[:, month] = counts
+    weight = np.clip(coverage / SEASON_MIN_DAYS, 0, 1)
+    index = np.where(np.isfinite(own), weight * own + (1 - weight) * prior, prior)
+    return index / index.mean(axis=1, keepdims=True)
+
+
+def smooth(values, alphas, beta=BETA, phi=PHI):
+    """
+    Damped-trend exponential smoothing of every row of ``values`` (NaN for
+    missing days) with its own ``alphas`` entry. Returns the one-step-ahead
+    forecasts (NaN until a row's first value), and the final level and trend.
+    """
+    import numpy as np
+
+    rows, days = values.shape
+    level = np.full(rows, np.nan)
+    trend = np.zeros(rows)
+    fitted = np.full((rows, days), np.nan)
+    for day in range(days):
+        observed = values[:, day]
+        has = np.isfinite(observed)
+        started = np.isfinite(level)
+        forecast = level + phi * trend
+        fitted[:, day] = forecast
+        updated = alphas * observed + (1 - alphas) * forecast
+        new_level = np.where(has & started, updated, np.where(started, forecast, observed))
+        trend = np.where(
+            has & started, beta * (new_level - level) + (1 - beta) * phi * trend,
+            np.where(started, phi * trend, 0),
+        )
+        level = new_level
+    return fitted, level, trend
+
+
+def fit(history, prior):
+    """
+    Fit every series. Returns (index, fitted prices, level, trend), with the
+    fitted one-step-ahead prices reseasonalised.
+    """
+    import numpy as np
+
+    index = seasonal_index(history, prior)
+    months = history.months()
+    deseasonalised = history.prices / index[:, months]
+
+    # Every alpha of the grid for every series, in one pass
+    grid = np.asarray(ALPHAS, dtype=float)
+    count = len(history.series)
+    stacked = np.tile(deseasonalised, (len(grid), 1))
+    fitted, level, trend = smooth(stacked, np.repeat(grid, count))
+    errors = np.nansum((fitted - stacked) ** 2, axis=1).reshape(len(grid), count)
+    best = errors.argmin(axis=0) * count + np.arange(count)
+    return index, fitted[best] * index[:, months], level[best], trend[best]
+
+
+def project(history, index, level, trend, horizon=None):
+    """(series, horizon) prices of the days after the history"""
+    import numpy as np
+
+    horizon = horizon or HORIZON_DAYS
+    steps = np.arange(1, horizon + 1)
+    damping = np.cumsum(PHI ** steps)
+    end = history.start + timedelta(days=history.days - 1)
+    months = np.array([(end + timedelta(days=int(step))).month - 1 for step in steps])
+    return (level[:, None] + trend[:, None] * damping[None, :]) * index[:, months]
+
+
+# ====================== OUTPUT ======================
+
+def redis_client():
+    """Client of the Redis shared with the MCP service"""
+    import redis
+    return redis.Redis.from_url(REDIS_URL, socket_timeout=5)
+
+
+def publish(history, forecasts):
+    """Store the forecasts of every series, and per crop across its markets"""
+    import numpy as np
+
+    end = history.start + timedelta(days=history.days - 1)
+    dates = [(end + timedelta(days=step)).isoformat() for step in range(1, forecasts.shape[1] + 1)]
+    generated_at = timezone.now().isoformat()
+    last = history.prices[np.arange(len(history.series)), np.maximum.accumulate(
+        np.where(np.isfinite(history.prices), np.arange(history.days), 0), axis=1)[:, -1]]
+
+    payloads = {}
+    by_crop = defaultdict(list)
+    for row, (crop, market) in enumerate(history.series):
+        if not np.isfinite(forecasts[row]).all():
+            continue
+        by_crop[crop].append(row)
+        payloads[forecast_key(crop, market)] = {
+            'crop_type': crop, 'market': market, 'generated_at': generated_at,
+            'last_price': round(float(last[row]), 2),
+            'forecast': [{'date': day, 'price': round(float(price), 2)} for day, price in zip(dates, forecasts[row])],
+        }
+    for crop, rows in by_crop.items():
+        payloads[forecast_key(crop)] = {
+            'crop_type': crop, 'market': None, 'markets': len(rows), 'generated_at': generated_at,
+            'last_price': round(float(last[rows].mean()), 2),
+            'forecast': [
+                {'date': day, 'price': round(float(price), 2)}
+                for day, price in zip(dates, forecasts[rows].mean(axis=0))
+            ],
+        }
+
+    try:
+        pipeline = redis_client().pipeline(transaction=False)
+        for key, payload in payloads.items():
+            pipeline.set(key, json.dumps(payload), ex=CACHE_TTL)
+        pipeline.execute()
+    except Exception as e:
+        logger.error(f"Publishing {len(payloads)} forecasts failed: {str(e)}")
+        return 0
+    return len(payloads)
+
+
+def get_forecast(crop_type, market=None):
+    """The published forecast of a crop (in one market), or None"""
+    try:
+        raw = redis_client().get(forecast_key(crop_type, market))
+    except Exception as e:
+        logger.warning(f"Forecast cache unavailable: {str(e)}")
+        return None
+    return json.loads(raw) if raw else None
+
+
+def write_predictions(history, fitted, refit=False):
+    """bulk_update predicted_price of the rows with a fitted value; returns the number written"""
+    import numpy as np
+    from ..api.v1.optimizations import response_cache
+    from ..models.market import PriceTrend
+
+    target = (history.ids > 0) & np.isfinite(fitted)
+    if not refit:
+        target &= ~history.predicted
+    now = timezone.now()
+    rows = [
+        PriceTrend(pk=int(pk), predicted_price=Decimal(str(round(float(price), 2))), updated_at=now)
+        for pk, price in zip(history.ids[target], fitted[target])
+    ]
+    # bulk_update skips auto_now: updated_at is set here so exports pick the forecasts up
+    PriceTrend.objects.bulk_update(rows, ['predicted_price', 'updated_at'], batch_size=1000)
+    if rows:
+        # bulk_update sends no signals
+        response_cache.invalidate_on_commit(PriceTrend)
+    return len(rows)
+
+
+def run(crop_type=None, refit=False, end=None):
+    """Fit every series, store predictions and publish forecasts; returns (series, predictions, published)"""
+    history = load_history(crop_type, end)
+    if not history.series:
+        return 0, 0, 0
+    index, fitted, level, trend = fit(history, calendar_prior(history.series))
+    written = write_predictions(history, fitted, refit)
+    published = publish(history, project(history, index, level, trend))
+    logger.info(f"Forecast {len(history.series)} price series: {written} predictions, {published} published")
+    return len(history.series), written, published
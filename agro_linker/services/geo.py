@@ -0,0 +1,178 @@
+"""
+Geospatial helpers for farmer locations.
+
+FarmerProfile keeps its free-form ``location`` JSON, but the coordinates are
+also extracted into indexed ``latitude``/``longitude`` columns plus a
+``geohash`` (see FarmerProfile.save). Radius queries narrow the candidates
+with the geohash cells covering the circle and a lat/lng bounding box, both
+index scans, and only compute exact haversine distances for the rows left.
+"""
+import math
+
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ACos, Cos, Greatest, Least, Radians, Sin
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+
+
+def extract_coordinates(location):
+    """
+    (lat, lng) from a location JSON value, accepting ``{lat, lng}``,
+    ``{latitude, longitude}``, ``{lat, lon}`` and GeoJSON points
+    """
+    if not isinstance(location, dict):
+        return None
+    if location.get('type') == 'Point' and isinstance(location.get('coordinates'), (list, tuple)):
+        lng, lat = location['coordinates'][:2]
+    else:
+        lat = location.get('lat', location.get('latitude'))
+        lng = location.get('lng', location.get('lon', location.get('longitude')))
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def parse_point(value):
+    """(lat, lng) from a "lat,lng" string"""
+    try:
+        lat, lng = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        return None
+    return extract_coordinates({'lat': lat, 'lng': lng})
+
+
+def parse_bbox(value):
+    """(south, west, north, east) from a "south,west,north,east" string"""
+    try:
+        south, west, north, east = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        return None
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        return None
+    return south, west, north, east
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# ====================== GEOHASH ======================
+
+def geohash_encode(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (target[0] + target[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            target[0] = mid
+        else:
+            target[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision):
+    """(lat_degrees, lng_degrees) spanned by a cell of the given precision"""
+    lng_bits = math.ceil(5 * precision / 2)
+    lat_bits = math.floor(5 * precision / 2)
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def covering_geohashes(lat, lng, radius_km):
+    """
+    Geohash prefixes whose cells cover the circle: the cell containing the
+    centre and its eight neighbours, at the finest precision whose cells are
+    still at least ``radius_km`` across.
+    """
+    km_per_lng_degree = max(111.32 * math.cos(math.radians(lat)), 1e-6)
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lng_size = geohash_cell_size(candidate)
+        if lat_size * 110.57 >= radius_km and lng_size * km_per_lng_degree >= radius_km:
+            precision = candidate
+            break
+    lat_size, lng_size = geohash_cell_size(precision)
+    cells = set()
+    for d_lat in (-lat_size, 0, lat_size):
+        for d_lng in (-lng_size, 0, lng_size):
+            cell_lat = min(max(lat + d_lat, -90.0), 90.0)
+            cell_lng = (lng + d_lng + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(cell_lat, cell_lng, precision))
+    return sorted(cells)
+
+
+def bounding_box(lat, lng, radius_km):
+    """(south, west, north, east) of the box enclosing the circle"""
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    d_lng = 180.0 if cos_lat < 1e-6 else min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return max(lat - d_lat, -90.0), lng - d_lng, min(lat + d_lat, 90.0), lng + d_lng
+
+
+# ====================== QUERYSETS ======================
+
+def distance_expression(lat, lng, lat_field, lng_field):
+    """Great-circle distance in km (spherical law of cosines) as an ORM expression"""
+    cosine = (
+        Cos(Radians(lat)) * Cos(Radians(F(lat_field))) * Cos(Radians(F(lng_field)) - Radians(lng))
+        + Sin(Radians(lat)) * Sin(Radians(F(lat_field)))
+    )
+    # Clamp rounding noise so ACOS never sees |x| > 1
+    return EARTH_RADIUS_KM * ACos(Least(Greatest(cosine, -1.0), 1.0), output_field=FloatField())
+
+
+def bbox_filter(south, west, north, east, prefix=''):
+    lat_field, lng_field = f"{prefix}latitude", f"{prefix}longitude"
+    condition = Q(**{f"{lat_field}__gte": south, f"{lat_field}__lte": north})
+    if west <= east:
+        return condition & Q(**{f"{lng_field}__gte": west, f"{lng_field}__lte": east})
+    # Box crossing the antimeridian
+    return condition & (Q(**{f"{lng_field}__gte": west}) | Q(**{f"{lng_field}__lte": east}))
+
+
+def within_bbox(queryset, south, west, north, east, prefix=''):
+    return queryset.filter(bbox_filter(south, west, north, east, prefix))
+
+
+def within_radius(queryset, lat, lng, radius_km, prefix=''):
+    """
+    Rows of ``queryset`` (FarmerProfile, or a model reaching one through
+    ``prefix``, e.g. ``farmer__``) within ``radius_km`` of the point,
+    annotated with ``distance_km`` and nearest first
+    """
+    south, west, north, east = bounding_box(lat, lng, radius_km)
+    if west < -180 or east > 180:
+        west, east = (west + 540) % 360 - 180, (east + 540) % 360 - 180
+    cells = Q()
+    for cell in covering_geohashes(lat, lng, radius_km):
+        cells |= Q(**{f"{prefix}geohash__startswith": cell})
+    return (
+        queryset.filter(cells)
+        .filter(bbox_filter(south, west, north, east, prefix))
+        .annotate(distance_km=distance_expression(lat, lng, f"{prefix}latitude", f"{prefix}longitude"))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km')
+    )
+
+
+def annotate_distance(queryset, lat, lng, prefix=''):
+    return queryset.annotate(
+        distance_km=distance_expression(lat, lng, f"{prefix}latitude", f"{prefix}longitude")
+    ).order_by('distance_km')
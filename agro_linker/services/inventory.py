@@ -0,0 +1,297 @@
+"""
+Inventory reservation.
+
+``Product.quantity`` is the quantity still available. Taking stock, for a
+sale or for a hold, locks only the product's own row (``select_for_update``)
+and decrements it with an ``F()`` expression in the same transaction, so
+concurrent acceptances serialise per product and can never oversell, while
+orders on other products go through untouched.
+
+A hold (``InventoryHold``) takes stock out for an order until it is
+committed (the farmer accepts the order) or released. Active holds with an
+``expires_at`` in the past are handed back by ``release_expired``, run from
+``manage.py release_expired_holds``. A product whose whole quantity is held
+is ``RESERVED``; it becomes ``SOLD`` once nothing is left and nothing is
+held, and goes back to ``ACTIVE`` when held stock returns.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HOLD_TTL = timedelta(seconds=getattr(settings, "INVENTORY_HOLD_TTL", 60 * 15))
+RELEASE_BATCH_SIZE = getattr(settings, "INVENTORY_RELEASE_BATCH_SIZE", 500)
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id, requested, available):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Only {available} of product {product_id} available, {requested} requested")
+
+
+def _invalidate_products():
+    # update() and bulk writes send no signals
+    from ..api.v1.optimizations import response_cache
+    from ..models.market import Product
+    response_cache.invalidate_on_commit(Product)
+
+
+def lock_product(product_id):
+    """The product row, locked until the end of the transaction"""
+    from ..models.market import Product
+    return Product.objects.select_for_update().only('id', 'quantity', 'status', 'price').get(pk=product_id)
+
+
+def lock_products(product_ids):
+    """{pk: product} of the product rows, locked in pk order to avoid deadlocks"""
+    from ..models.market import Product
+    return Product.objects.select_for_update().order_by('pk').in_bulk(sorted(set(product_ids)))
+
+
+def take_locked(product, quantity, hold=False):
+    """
+    Decrement a product whose row is locked by the caller. ``hold`` marks
+    the stock as held rather than sold when nothing is left.
+    """
+    from ..models.market import Product
+
+    quantity = Decimal(quantity)
+    if product.status not in (Product.Status.ACTIVE, Product.Status.RESERVED) or quantity > product.quantity:
+        available = product.quantity if product.status in (Product.Status.ACTIVE, Product.Status.RESERVED) else 0
+        raise InsufficientStock(product.pk, quantity, available)
+
+    remaining = product.quantity - quantity
+    status = product.status
+    if remaining <= 0:
+        status = Product.Status.RESERVED if hold or _has_active_holds(product.pk) else Product.Status.SOLD
+    Product.objects.filter(pk=product.pk).update(
+        quantity=F('quantity') - quantity, status=status, updated_at=timezone.now()
+    )
+    product.quantity, product.status = remaining, status
+    _invalidate_products()
+    return product
+
+
+def _has_active_holds(product_id):
+    from ..models.market import InventoryHold
+    return InventoryHold.objects.filter(product_id=product_id, status=InventoryHold.Status.ACTIVE).exists()
+
+
+def hold_locked(product, quantities, ttl=None):
+    """
+    Hold stock on a locked product for several orders at once.
+    ``quantities`` is a list of (order, quantity); returns the holds.
+    """
+    from ..models.market import InventoryHold
+
+    total = sum((Decimal(quantity) for _, quantity in quantities), Decimal(0))
+    take_locked(product, total, hold=True)
+    expires_at = timezone.now() + (ttl if ttl is not None else HOLD_TTL)
+    return InventoryHold.objects.bulk_create([
+        InventoryHold(product_id=product.pk, order=order, quantity=quantity, expires_at=expires_at)
+        for order, quantity in quantities
+    ])
+
+
+def hold_products_locked(products, requests, ttl=None):
+    """
+    Hold stock on many locked products in one statement. ``products`` is
+    {pk: product} and ``requests`` a list of (order, product_id, quantity);
+    returns the holds, one per request.
+    """
+    from ..models.market import InventoryHold, Product
+
+    totals = defaultdict(Decimal)
+    for _, product_id, quantity in requests:
+        totals[product_id] += Decimal(quantity)
+    available = (Product.Status.ACTIVE, Product.Status.RESERVED)
+    for product_id, quantity in totals.items():
+        product = products[product_id]
+        if product.status not in available or quantity > product.quantity:
+            raise InsufficientStock(product_id, quantity, product.quantity if product.status in available else 0)
+
+    now = timezone.now()
+    Product.objects.filter(pk__in=list(totals)).update(
+        quantity=Case(
+            *[When(pk=product_id, then=F('quantity') - quantity) for product_id, quantity in totals.items()],
+            default=F('quantity'),
+        ),
+        status=Case(
+            *[
+                When(pk=product_id, then=Value(Product.Status.RESERVED))
+                for product_id, quantity in totals.items()
+                if products[product_id].quantity - quantity <= 0
+            ],
+            default=F('status'),
+        ),
+        updated_at=now,
+    )
+    for product_id, quantity in totals.items():
+        product = products[product_id]
+        product.quantity -= quantity
+        if product.quantity <= 0:
+            product.status = Product.Status.RESERVED
+    _invalidate_products()
+
+    expires_at = now + (ttl if ttl is not None else HOLD_TTL)
+    return InventoryHold.objects.bulk_create([
+        InventoryHold(product_id=product_id, order=order, quantity=quantity, expires_at=expires_at)
+        for order, product_id, quantity in requests
+    ])
+
+
+@transaction.atomic
+def reserve(product_id, quantity, order=None, ttl=None):
+    """Hold ``quantity`` of a product, raising InsufficientStock"""
+    product = lock_product(product_id)
+    return hold_locked(product, [(order, quantity)], ttl)[0]
+
+
+@transaction.atomic
+def take(product_id, quantity):
+    """Sell ``quantity`` of a product outright, raising InsufficientStock"""
+    return take_locked(lock_product(product_id), quantity)
+
+
+def order_quantities(order):
+    """{product_id: quantity} an order takes, from its offer or its items"""
+    if order.bid_id:
+        return {order.bid.product_id: order.bid.quantity}
+    quantities = defaultdict(Decimal)
+    for item in order.items.all():
+        quantities[item.product_id] += item.quantity
+    return dict(quantities)
+
+
+@transaction.atomic
+def commit_order(order, product_ids=None):
+    """
+    Take the stock of an accepted order: its active holds, and for products
+    without one the quantity straight from stock. Committing an order twice
+    takes stock once. ``product_ids`` limits the commit to some of the
+    order's products: each farmer of a cart accepts their own.
+
+    A hold past its expiry that ``release_expired`` has not handed back yet
+    still has its stock out, so it is committed like any other: taking the
+    quantity again would count it twice.
+    """
+    from ..models.market import InventoryHold, Product
+
+    quantities = order_quantities(order)
+    if product_ids is not None:
+        quantities = {product_id: quantities[product_id] for product_id in product_ids if product_id in quantities}
+    holds = list(
+        InventoryHold.objects.select_for_update().filter(
+            order=order, product_id__in=list(quantities),
+            status__in=[InventoryHold.Status.ACTIVE, InventoryHold.Status.COMMITTED],
+        )
+    )
+    if any(hold.status == InventoryHold.Status.COMMITTED for hold in holds):
+        return holds
+
+    now = timezone.now()
+    # Locked above, so the expiry sweep (skip_locked) cannot release them meanwhile
+    active = holds
+    InventoryHold.objects.filter(pk__in=[hold.pk for hold in active]).update(
+        status=InventoryHold.Status.COMMITTED, updated_at=now
+    )
+    for hold in active:
+        hold.status = InventoryHold.Status.COMMITTED
+
+    held = {hold.product_id for hold in active}
+    missing = {
+        product_id: quantity
+        for product_id, quantity in quantities.items()
+        if product_id not in held
+    }
+    products = lock_products(held | set(missing))
+    taken = []
+    for product_id, quantity in missing.items():
+        take_locked(products[product_id], quantity)
+        taken.append(InventoryHold(
+            product_id=product_id, order=order, quantity=quantity, status=InventoryHold.Status.COMMITTED
+        ))
+
+    # Held stock is already out of the quantity; sold out once no other hold remains
+    sold_out = [
+        product_id for product_id in held
+        if products[product_id].quantity <= 0 and not _has_active_holds(product_id)
+    ]
+    if sold_out:
+        Product.objects.filter(pk__in=sold_out).update(status=Product.Status.SOLD, updated_at=now)
+        _invalidate_products()
+    return active + InventoryHold.objects.bulk_create(taken)
+
+
+def _restock(quantities, now):
+    """Return held stock: one UPDATE for all products in ``quantities``"""
+    from ..models.market import Product
+
+    if not quantities:
+        return
+    Product.objects.filter(pk__in=list(quantities)).update(
+        quantity=Case(
+            *[When(pk=product_id, then=F('quantity') + quantity) for product_id, quantity in quantities.items()],
+            default=F('quantity'),
+        ),
+        status=Case(
+            When(status=Product.Status.RESERVED, then=Value(Product.Status.ACTIVE)),
+            default=F('status'),
+        ),
+        updated_at=now,
+    )
+    _invalidate_products()
+
+
+@transaction.atomic
+def release(hold):
+    """Hand a hold's stock back to its product"""
+    from ..models.market import InventoryHold
+
+    now = timezone.now()
+    released = InventoryHold.objects.filter(pk=hold.pk, status=InventoryHold.Status.ACTIVE).update(
+        status=InventoryHold.Status.RELEASED, updated_at=now
+    )
+    if released:
+        _restock({hold.product_id: hold.quantity}, now)
+    return bool(released)
+
+
+def release_expired(batch_size=None):
+    """Release every active hold past its expiry; returns the number released"""
+    from ..models.market import InventoryHold
+
+    batch_size = batch_size or RELEASE_BATCH_SIZE
+    total = 0
+    while True:
+        with transaction.atomic():
+            now = timezone.now()
+            # skip_locked lets concurrent sweeps (and commits) work on disjoint holds
+            hold_ids = list(
+                InventoryHold.objects.select_for_update(skip_locked=True)
+                .filter(status=InventoryHold.Status.ACTIVE, expires_at__lte=now)
+                .order_by('expires_at')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not hold_ids:
+                break
+            expired = InventoryHold.objects.filter(pk__in=hold_ids)
+            quantities = defaultdict(Decimal)
+            for row in expired.values('product_id').annotate(quantity=Sum('quantity')):
+                quantities[row['product_id']] += row['quantity']
+            expired.update(status=InventoryHold.Status.EXPIRED, updated_at=now)
+            _restock(quantities, now)
+        total += len(hold_ids)
+        logger.info(f"Released {len(hold_ids)} expired inventory holds on {len(quantities)} products")
+        if len(hold_ids) < batch_size:
+            break
+    return total
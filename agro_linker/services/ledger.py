@@ -0,0 +1,233 @@
+"""
+Double-entry wallet ledger.
+
+Money moves between wallets in transfers: two or more ``WalletTransaction``
+legs with the same ``transaction_reference`` whose amounts sum to zero
+(credit positive, debit negative). Money entering or leaving the platform
+is posted against a system wallet (``system_wallet('mobile_money')``), so
+the balances of all wallets always sum to zero too.
+
+Posting never reads a balance to write it back. Each wallet a batch touches
+gets one ``UPDATE ... SET balance = balance + delta, entry_count =
+entry_count + n`` (in wallet pk order, so concurrent batches cannot
+deadlock); a user wallet's update is conditional on the balance covering
+the debit, and InsufficientFunds rolls the whole batch back. The update
+holds the wallet row until commit, so the new ``entry_count`` numbers the
+batch's entries for that wallet without gaps (``sequence``).
+
+References are idempotency keys: a reference already in the ledger is
+skipped (and a concurrent duplicate loses on the unique (reference,
+wallet) constraint and is skipped on retry), so a retried request or
+webhook posts once.
+
+``Wallet.balance`` is the current balance. Past balances come from
+``WalletBalanceSnapshot``: one is taken in the posting transaction every
+``LEDGER_SNAPSHOT_EVERY`` entries of a wallet, and ``manage.py
+snapshot_wallets`` takes one for every wallet with entries since its last,
+so ``balance_as_of`` reads one snapshot plus a bounded tail of entries.
+Balances from before the ledger are carried by an opening snapshot (taken
+by the migration, at sequence 0).
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_EVERY = getattr(settings, "LEDGER_SNAPSHOT_EVERY", 1000)
+# Attempts of a batch that collided with a concurrent post of the same references
+POST_ATTEMPTS = 3
+
+
+class LedgerError(Exception):
+    pass
+
+
+class InsufficientFunds(LedgerError):
+    def __init__(self, wallet_id):
+        self.wallet_id = wallet_id
+        super().__init__(f"Insufficient funds in wallet {wallet_id}")
+
+
+@dataclass
+class Posting:
+    reference: str
+    legs: list  # [(wallet or wallet id, amount)], amounts summing to zero
+    transaction_type: str = 'transfer'
+
+    def deltas(self):
+        """{wallet id: amount}; raises LedgerError for an unbalanced posting"""
+        deltas = defaultdict(Decimal)
+        for wallet, amount in self.legs:
+            deltas[getattr(wallet, 'pk', wallet)] += Decimal(amount)
+        deltas = {wallet_id: amount for wallet_id, amount in deltas.items() if amount}
+        if not self.reference:
+            raise LedgerError("A posting needs a reference")
+        if sum(deltas.values(), Decimal(0)) != 0:
+            raise LedgerError(f"Posting {self.reference} does not balance")
+        if len(deltas) < 2:
+            raise LedgerError(f"Posting {self.reference} moves nothing")
+        return deltas
+
+
+def system_wallet(code):
+    from ..models.finance import Wallet
+    return Wallet.objects.get_or_create(code=code, user=None)[0]
+
+
+# ====================== POSTING ======================
+
+def post(reference, legs, transaction_type='transfer'):
+    """Post one transfer; returns its entries (the existing ones when it was posted before)"""
+    from ..models.finance import WalletTransaction
+
+    post_many([Posting(reference, legs, transaction_type)])
+    return list(WalletTransaction.objects.filter(transaction_reference=reference, sequence__gt=0))
+
+
+def transfer(reference, source, destination, amount, transaction_type='transfer'):
+    return post(reference, [(source, -Decimal(amount)), (destination, Decimal(amount))], transaction_type)
+
+
+def post_many(postings):
+    """
+    Post a batch of transfers in one transaction, skipping references
+    already posted; returns the number posted. Raises LedgerError (and
+    posts nothing) when a posting is invalid or a user wallet would go
+    negative.
+    """
+    postings = list({posting.reference: posting for posting in postings}.values())
+    deltas = {posting.reference: posting.deltas() for posting in postings}
+    for attempt in range(POST_ATTEMPTS):
+        try:
+            return _post(postings, deltas)
+        except IntegrityError:
+            # A concurrent post of one of the references committed first
+            if attempt == POST_ATTEMPTS - 1:
+                raise
+            logger.info(f"Ledger batch of {len(postings)} collided with a concurrent post; retrying")
+
+
+def _post(postings, deltas):
+    from ..models.finance import Wallet, WalletBalanceSnapshot, WalletTransaction
+
+    with transaction.atomic():
+        posted = set(WalletTransaction.objects.filter(
+            transaction_reference__in=list(deltas), sequence__gt=0,
+        ).values_list('transaction_reference', flat=True).distinct())
+        postings = [posting for posting in postings if posting.reference not in posted]
+        if not postings:
+            return 0
+
+        totals = defaultdict(Decimal)
+        counts = defaultdict(int)
+        for posting in postings:
+            for wallet_id, amount in deltas[posting.reference].items():
+                totals[wallet_id] += amount
+                counts[wallet_id] += 1
+        system = set(Wallet.objects.filter(pk__in=list(counts), code__isnull=False).values_list('pk', flat=True))
+
+        for wallet_id in sorted(counts):
+            wallets = Wallet.objects.filter(pk=wallet_id)
+            if wallet_id not in system and totals[wallet_id] < 0:
+                wallets = wallets.filter(balance__gte=-totals[wallet_id])
+            if not wallets.update(balance=F('balance') + totals[wallet_id],
+                                  entry_count=F('entry_count') + counts[wallet_id]):
+                if not Wallet.objects.filter(pk=wallet_id).exists():
+                    raise LedgerError(f"Wallet {wallet_id} does not exist")
+                raise InsufficientFunds(wallet_id)
+
+        # The rows are locked by the updates: the counts read now are ours
+        after = {
+            pk: (balance, count) for pk, balance, count in
+            Wallet.objects.filter(pk__in=list(counts)).values_list('pk', 'balance', 'entry_count')
+        }
+        sequence = {wallet_id: after[wallet_id][1] - counts[wallet_id] for wallet_id in counts}
+        running = {wallet_id: after[wallet_id][0] - totals[wallet_id] for wallet_id in counts}
+        now = timezone.now()
+        entries, snapshots = [], []
+        for posting in postings:
+            for wallet_id, amount in deltas[posting.reference].items():
+                sequence[wallet_id] += 1
+                running[wallet_id] += amount
+                entries.append(WalletTransaction(
+                    wallet_id=wallet_id, amount=amount, transaction_type=posting.transaction_type,
+                    transaction_reference=posting.reference, sequence=sequence[wallet_id], transaction_date=now,
+                ))
+                if sequence[wallet_id] % SNAPSHOT_EVERY == 0:
+                    snapshots.append(WalletBalanceSnapshot(
+                        wallet_id=wallet_id, sequence=sequence[wallet_id], balance=running[wallet_id], as_of=now,
+                    ))
+        WalletTransaction.objects.bulk_create(entries, batch_size=1000)
+        WalletBalanceSnapshot.objects.bulk_create(snapshots)
+    logger.info(f"Posted {len(postings)} transfers ({len(entries)} entries)")
+    return len(postings)
+
+
+# ====================== BALANCES ======================
+
+def balance_as_of(wallet, moment):
+    """Balance of a wallet at ``moment``: the last snapshot before it plus the entries since"""
+    from ..models.finance import WalletBalanceSnapshot, WalletTransaction
+
+    wallet_id = getattr(wallet, 'pk', wallet)
+    snapshot = (
+        WalletBalanceSnapshot.objects.filter(wallet_id=wallet_id, as_of__lte=moment)
+        .order_by('-sequence').values_list('sequence', 'balance').first()
+    )
+    sequence, balance = snapshot or (0, Decimal(0))
+    tail = WalletTransaction.objects.filter(
+        wallet_id=wallet_id, sequence__gt=sequence, transaction_date__lte=moment,
+    ).aggregate(total=Coalesce(Sum('amount'), Decimal(0)))['total']
+    return balance + tail
+
+
+def take_snapshots():
+    """Snapshot every wallet with entries since its last snapshot; returns how many"""
+    from ..models.finance import Wallet, WalletBalanceSnapshot
+
+    now = timezone.now()
+    # balance and entry_count change in the same UPDATE, so each row read is consistent
+    rows = (
+        Wallet.objects.annotate(snapshot_sequence=Coalesce(Max('snapshots__sequence'), 0))
+        .filter(entry_count__gt=F('snapshot_sequence'))
+        .values_list('pk', 'entry_count', 'balance')
+    )
+    snapshots = [
+        WalletBalanceSnapshot(wallet_id=pk, sequence=count, balance=balance, as_of=now)
+        for pk, count, balance in rows.iterator(chunk_size=5000)
+    ]
+    WalletBalanceSnapshot.objects.bulk_create(snapshots, batch_size=1000, ignore_conflicts=True)
+    logger.info(f"Took {len(snapshots)} wallet balance snapshots")
+    return len(snapshots)
+
+
+def verify():
+    """
+    (wallets whose balance differs from their opening snapshot plus their
+    entries, references whose legs do not sum to zero), as lists of ids
+    """
+    from ..models.finance import Wallet, WalletTransaction
+
+    opening = Coalesce(Sum('snapshots__balance', filter=Q(snapshots__sequence=0)), Decimal(0))
+    entries = dict(
+        WalletTransaction.objects.filter(sequence__gt=0).values('wallet')
+        .annotate(total=Sum('amount')).order_by().values_list('wallet', 'total')
+    )
+    wallets = [
+        pk for pk, balance, start in Wallet.objects.annotate(opening=opening).values_list('pk', 'balance', 'opening')
+        if balance != start + entries.get(pk, 0)
+    ]
+    references = list(
+        WalletTransaction.objects.filter(sequence__gt=0).values('transaction_reference')
+        .annotate(total=Sum('amount')).exclude(total=0).order_by()
+        .values_list('transaction_reference', flat=True)
+    )
+    return wallets, references
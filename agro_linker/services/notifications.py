@@ -0,0 +1,347 @@
+"""
+Notification delivery.
+
+Code that wants to tell a user something queues ``Notification`` rows with
+``enqueue`` (one per channel the user opted into); nothing is sent in the
+request. The dispatcher (``manage.py dispatch_notifications``) drains them:
+
+- claims a batch of PENDING rows with ``select_for_update(skip_locked=True)``
+  and marks them SENDING, so any number of workers can run side by side;
+- groups the batch by channel and provider, and within a group by identical
+  content, which goes out through the provider's bulk API where it has one
+  (Africa's Talking, SendGrid, Mailgun); everything else is sent
+  concurrently over the provider's pooled async transport;
+- paces every provider with a rate limit shared by all workers through the
+  cache;
+- writes all outcomes back with a single ``bulk_update``. Failed sends are
+  retried by later batches up to ``NOTIFICATION_MAX_ATTEMPTS``, except
+  those the provider refused (4xx), which would be refused again; rows left
+  SENDING by a crashed worker are reclaimed after ``NOTIFICATION_CLAIM_TIMEOUT``.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = getattr(settings, "NOTIFICATION_PROVIDERS", {
+    'SMS': 'africastalking',
+    'WHATSAPP': 'meta',
+    'EMAIL': 'sendgrid',
+})
+# Messages per second, keyed "TYPE:provider"; providers not listed are unlimited
+RATE_LIMITS = getattr(settings, "NOTIFICATION_RATE_LIMITS", {})
+BATCH_SIZE = getattr(settings, "NOTIFICATION_BATCH_SIZE", 1000)
+BULK_SIZE = getattr(settings, "NOTIFICATION_BULK_SIZE", 500)
+MAX_ATTEMPTS = getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 5)
+RETRY_DELAY = timedelta(seconds=getattr(settings, "NOTIFICATION_RETRY_DELAY", 60))
+CLAIM_TIMEOUT = timedelta(seconds=getattr(settings, "NOTIFICATION_CLAIM_TIMEOUT", 60 * 10))
+CACHE_ALIAS = getattr(settings, "NOTIFICATION_CACHE_ALIAS", "default")
+# Country code of local numbers (leading 0) when matching provider reports
+DEFAULT_COUNTRY_CODE = getattr(settings, "NOTIFICATION_DEFAULT_COUNTRY_CODE", "254")
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def enqueue(user, message, metadata=None, types=None):
+    """
+    Queue ``message`` for ``user`` on ``types``, by default every channel
+    enabled in ``user.notification_preferences``
+    """
+    from ..models.models import Notification
+
+    if types is None:
+        preferences = user.notification_preferences or {}
+        types = [
+            notification_type for notification_type in Notification.NotificationType.values
+            if preferences.get(notification_type.lower())
+        ]
+    return Notification.objects.bulk_create([
+        Notification(user=user, notification_type=notification_type, message=message, metadata=metadata)
+        for notification_type in types
+    ])
+
+
+# ====================== RATE LIMITING ======================
+
+class RateLimiter:
+    """
+    Fixed one-second windows counted in the cache, so the limit holds across
+    all dispatcher processes. Without a cache it only paces this process.
+    """
+
+    def __init__(self, name, per_second, alias=CACHE_ALIAS):
+        self.name = name
+        self.per_second = per_second
+        self.alias = alias
+        self._local = defaultdict(int)
+
+    def _use(self, window, count):
+        key = f"ratelimit:{self.name}:{window}"
+        try:
+            cache = caches[self.alias]
+            cache.add(key, 0, 5)
+            return cache.incr(key, count)
+        except Exception as e:
+            logger.warning(f"Rate limit cache unavailable for {self.name}: {str(e)}")
+            self._local = defaultdict(int, {window: self._local[window]})
+            self._local[window] += count
+            return self._local[window]
+
+    def wait_time(self, count):
+        """0 once ``count`` messages may go out, else seconds until the next window"""
+        if not self.per_second:
+            return 0
+        now = time.time()
+        window = int(now)
+        used = self._use(window, count)
+        if used <= self.per_second or used == count:
+            return 0
+        return window + 1 - now
+
+    async def acquire(self, count=1):
+        while True:
+            delay = self.wait_time(count)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+
+# ====================== DISPATCH ======================
+
+def _channels():
+    from ..models.finance import SMSGateway
+    from ..models.models import EmailService, Notification, WhatsAppService
+
+    Type = Notification.NotificationType
+    # type -> (service class, recipient attribute, single send, bulk send)
+    return {
+        Type.SMS: (SMSGateway, 'phone', 'send_sms', 'send_bulk_sms'),
+        Type.WHATSAPP: (WhatsAppService, 'phone', 'send_message', None),
+        Type.EMAIL: (EmailService, 'email', 'send_email', 'send_bulk_email'),
+    }
+
+
+def _failed(result):
+    return isinstance(result, dict) and result.get('status') == 'failed'
+
+
+def _retryable(result):
+    """Whether a failed send may go through later: not once the provider refused it (4xx)"""
+    status = result.get('status_code')
+    return not (isinstance(status, int) and 400 <= status < 500 and status not in (408, 429))
+
+
+def e164(phone):
+    """``phone`` as +<country code><number>, the form providers report numbers in"""
+    phone = str(phone).strip()
+    digits = ''.join(char for char in phone if char.isdigit())
+    if phone.startswith('+'):
+        return f"+{digits}"
+    if digits.startswith('00'):
+        return f"+{digits[2:]}"
+    if digits.startswith('0'):
+        return f"+{DEFAULT_COUNTRY_CODE}{digits[1:]}"
+    return f"+{digits}"
+
+
+def _bulk_failures(result, recipients):
+    """
+    {recipient: (error, retryable)} of a bulk send, from the per-recipient
+    report where the provider gives one
+    """
+    if _failed(result):
+        return {recipient: (result.get('error', 'failed'), _retryable(result)) for recipient in recipients}
+    report = (result or {}).get('SMSMessageData', {}).get('Recipients') if isinstance(result, dict) else None
+    if report is None:
+        return {}
+    # Africa's Talking reports +E.164 numbers whatever form they were sent in
+    statuses = {e164(entry.get('number')): entry.get('status') for entry in report if entry.get('number')}
+    failures = {}
+    for recipient in recipients:
+        status = statuses.get(e164(recipient))
+        if status != 'Success':
+            failures[recipient] = (status or 'missing from provider report', True)
+    return failures
+
+
+class NotificationDispatcher:
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or BATCH_SIZE
+        self.channels = _channels()
+        self._limiters = {}
+        self._services = {}
+        self._loop = asyncio.new_event_loop()
+
+    def close(self):
+        for service in self._services.values():
+            self._loop.run_until_complete(service.transport.aclose())
+        self._loop.close()
+
+    def claim(self):
+        """Lock a batch of due notifications and mark them SENDING"""
+        from ..models.models import Notification
+
+        Status = Notification.NotificationStatus
+        now = timezone.now()
+        due = (
+            Q(status=Status.PENDING) & (Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - RETRY_DELAY))
+            | Q(status=Status.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT)
+        )
+        with transaction.atomic():
+            ids = list(
+                Notification.objects.select_for_update(skip_locked=True)
+                .filter(due)
+                .order_by('created_at')
+                .values_list('pk', flat=True)[:self.batch_size]
+            )
+            Notification.objects.filter(pk__in=ids).update(
+                status=Status.SENDING, claimed_at=now, attempts=F('attempts') + 1
+            )
+        return list(Notification.objects.filter(pk__in=ids).select_related('user'))
+
+    def dispatch(self):
+        """Send one batch; returns the number of notifications processed"""
+        from ..models.models import Notification
+
+        notifications = self.claim()
+        if not notifications:
+            return 0
+
+        groups = defaultdict(list)
+        for notification in notifications:
+            provider = (notification.metadata or {}).get('provider') or PROVIDERS.get(notification.notification_type)
+            groups[(notification.notification_type, provider)].append(notification)
+
+        outcomes = {}
+        self._loop.run_until_complete(self._send_groups(groups, outcomes))
+
+        Status = Notification.NotificationStatus
+        now = timezone.now()
+        sent = 0
+        for notification in notifications:
+            if notification.pk not in outcomes:
+                notification.status, notification.sent_at, notification.last_error = Status.SENT, now, ''
+                sent += 1
+            else:
+                error, retryable = outcomes[notification.pk]
+                retry = retryable and notification.attempts < MAX_ATTEMPTS
+                notification.status = Status.PENDING if retry else Status.FAILED
+                notification.last_error = str(error)[:1000]
+        Notification.objects.bulk_update(notifications, ['status', 'sent_at', 'last_error'])
+        logger.info(f"Dispatched {len(notifications)} notifications: {sent} sent")
+        return len(notifications)
+
+    async def _send_groups(self, groups, outcomes):
+        await asyncio.gather(*[
+            self._send_group(notification_type, provider, group, outcomes)
+            for (notification_type, provider), group in groups.items()
+        ])
+
+    def _service(self, notification_type, provider):
+        key = (notification_type, provider)
+        if key not in self._services:
+            service_class = self.channels[notification_type][0]
+            self._services[key] = service_class(provider, async_mode=True)
+        return self._services[key]
+
+    def _limiter(self, notification_type, provider):
+        name = f"{notification_type}:{provider}"
+        if name not in self._limiters:
+            self._limiters[name] = RateLimiter(name, RATE_LIMITS.get(name))
+        return self._limiters[name]
+
+    async def _send_group(self, notification_type, provider, notifications, outcomes):
+        """
+        Send notifications of one channel and provider, recording
+        (error, retryable) in ``outcomes`` for those that failed
+        """
+        if notification_type not in self.channels or not provider:
+            for notification in notifications:
+                outcomes[notification.pk] = (f"No provider for {notification_type} notifications", False)
+            return
+        _, attr, send, bulk_send = self.channels[notification_type]
+        service = self._service(notification_type, provider)
+        limiter = self._limiter(notification_type, provider)
+
+        deliverable = []
+        for notification in notifications:
+            if getattr(notification.user, attr, None):
+                deliverable.append(notification)
+            else:
+                outcomes[notification.pk] = (f"User has no {attr}", False)
+
+        if bulk_send and hasattr(service, f"_send_bulk_{provider.lower()}"):
+            by_content = defaultdict(list)
+            for notification in deliverable:
+                by_content[(notification.message, (notification.metadata or {}).get('subject'))].append(notification)
+            bulk_size = min(BULK_SIZE, limiter.per_second or BULK_SIZE)
+            tasks = [
+                self._send_bulk(service, bulk_send, attr, limiter, chunk, outcomes)
+                for chunk_source in by_content.values()
+                for chunk in _chunks(chunk_source, bulk_size)
+            ]
+        else:
+            tasks = [
+                self._send_one(service, send, attr, limiter, notification, outcomes)
+                for notification in deliverable
+            ]
+        await asyncio.gather(*tasks)
+
+    async def _send_bulk(self, service, bulk_send, attr, limiter, notifications, outcomes):
+        first = notifications[0]
+        recipients = [getattr(notification.user, attr) for notification in notifications]
+        args = [recipients, (first.metadata or {}).get('subject', ''), first.message] \
+            if attr == 'email' else [recipients, first.message]
+        await limiter.acquire(len(recipients))
+        result = await getattr(service, bulk_send)(*args)
+        failures = _bulk_failures(result, recipients)
+        for notification, recipient in zip(notifications, recipients):
+            if recipient in failures:
+                outcomes[notification.pk] = failures[recipient]
+
+    async def _send_one(self, service, send, attr, limiter, notification, outcomes):
+        recipient = getattr(notification.user, attr)
+        metadata = notification.metadata or {}
+        await limiter.acquire()
+        if attr == 'email':
+            result = await getattr(service, send)(recipient, metadata.get('subject', ''), notification.message)
+        elif metadata.get('template') and hasattr(service, 'send_template'):
+            result = await service.send_template(
+                recipient, metadata['template'], metadata.get('language', 'en'), metadata.get('parameters'))
+        else:
+            result = await getattr(service, send)(recipient, notification.message)
+        if _failed(result):
+            outcomes[notification.pk] = (result.get('error', 'failed'), _retryable(result))
+
+
+def dispatch_pending(batch_size=None, max_batches=None):
+    """Drain due notifications; returns the number processed"""
+    dispatcher = NotificationDispatcher(batch_size)
+    total = batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            processed = dispatcher.dispatch()
+            if not processed:
+                break
+            total += processed
+            batches += 1
+    finally:
+        dispatcher.close()
+    return total
@@ -0,0 +1,378 @@
+"""
+In-memory order books for the marketplace.
+
+Every product has a book of the open buy side: its ``Bid`` rows and its
+pending, unexpired ``Offer`` rows, in price-time priority (highest amount
+first, oldest first within a price). Price levels are kept in a sorted list,
+so the best bid is read from the top level (skipping only levels left with
+expired offers), a price level is found by bisection and depth is a walk
+over the top levels; nothing touches the database once a book is loaded.
+
+Books are loaded lazily from the database the first time a product is looked
+at in a process, and kept current by the Bid/Offer signals (see
+``agro_linker/signals.py``). Writes made by other processes are picked up
+through a per-product version counter in the cache: a read that finds the
+version moved re-reads only the rows changed since the last sync. A full
+reload happens every ``ORDER_BOOK_MAX_AGE`` seconds to drop deleted bids.
+
+Only offers can be filled: an ``Order`` is tied to the ``Offer`` carrying
+the delivery terms, while a ``Bid`` is a price indication. ``match_offers``
+fills crossing offers against the product's reserve price (``Product.price``)
+and remaining quantity, persisting each batch of fills in one transaction
+and holding the filled stock (``services/inventory.py``) until the farmer
+accepts the order.
+"""
+import bisect
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from . import inventory, price_discovery
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = getattr(settings, "ORDER_BOOK_CACHE_ALIAS", "default")
+MAX_AGE = getattr(settings, "ORDER_BOOK_MAX_AGE", 60 * 5)
+MATCH_BATCH_SIZE = getattr(settings, "ORDER_BOOK_MATCH_BATCH_SIZE", 100)
+# Overlap of incremental syncs, covering transactions that committed late
+SYNC_SKEW = timedelta(seconds=getattr(settings, "ORDER_BOOK_SYNC_SKEW", 5))
+
+BID = 'bid'
+OFFER = 'offer'
+
+
+@dataclass
+class BookEntry:
+    kind: str
+    id: int
+    buyer_id: object
+    price: Decimal
+    quantity: Decimal
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+
+    @property
+    def key(self):
+        return (self.kind, self.id)
+
+    @property
+    def priority(self):
+        return (self.created_at, self.kind, self.id)
+
+    def is_live(self, now):
+        return self.expires_at is None or self.expires_at > now
+
+    @classmethod
+    def from_bid(cls, bid):
+        return cls(BID, bid.pk, bid.buyer_id, bid.amount, bid.quantity, bid.created_at)
+
+    @classmethod
+    def from_offer(cls, offer):
+        return cls(OFFER, offer.pk, offer.buyer_id, offer.amount, offer.quantity,
+                   offer.created_at, offer.expires_at)
+
+
+@dataclass
+class PriceLevel:
+    price: Decimal
+    quantity: Decimal
+    orders: int
+
+
+class OrderBook:
+    """Buy side of one product in price-time priority"""
+
+    def __init__(self, product_id):
+        self.product_id = product_id
+        self.version = None
+        self.synced_at = None
+        self.loaded_at = None
+        self._prices = []   # distinct prices, ascending
+        self._levels = {}   # price -> {key: entry}, oldest first
+        self._entries = {}  # key -> entry
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._prices, self._levels, self._entries = [], {}, {}
+
+    def add(self, entry):
+        with self._lock:
+            self.remove(entry.kind, entry.id)
+            level = self._levels.get(entry.price)
+            if level is None:
+                bisect.insort(self._prices, entry.price)
+                level = self._levels[entry.price] = {}
+            newest = next(reversed(level.values()), None)
+            level[entry.key] = entry
+            if newest is not None and entry.priority < newest.priority:
+                # Synced out of arrival order: restore time priority
+                self._levels[entry.price] = dict(sorted(level.items(), key=lambda item: item[1].priority))
+            self._entries[entry.key] = entry
+
+    def remove(self, kind, id):
+        with self._lock:
+            entry = self._entries.pop((kind, id), None)
+            if entry is None:
+                return None
+            level = self._levels[entry.price]
+            del level[entry.key]
+            if not level:
+                del self._levels[entry.price]
+                del self._prices[bisect.bisect_left(self._prices, entry.price)]
+            return entry
+
+    def entries(self, min_price=None, kind=None):
+        """
+        Live entries in priority order, optionally at or above ``min_price``.
+        Levels are walked from the top one at a time, so reading the best
+        entry only copies the levels above it
+        """
+        now = timezone.now()
+        price = None
+        while True:
+            with self._lock:
+                # The level below the last one walked; the book may have changed since
+                index = len(self._prices) if price is None else bisect.bisect_left(self._prices, price)
+                if index == 0:
+                    return
+                price = self._prices[index - 1]
+                if min_price is not None and price < min_price:
+                    return
+                level = list(self._levels[price].values())
+            for entry in level:
+                if (kind is None or entry.kind == kind) and entry.is_live(now):
+                    yield entry
+
+    def best_bid(self):
+        return next(self.entries(), None)
+
+    def depth(self, levels=10):
+        """Aggregated quantity of the top ``levels`` price levels"""
+        now = timezone.now()
+        depth = []
+        with self._lock:
+            for price in reversed(self._prices):
+                live = [entry for entry in self._levels[price].values() if entry.is_live(now)]
+                if live:
+                    depth.append(PriceLevel(price, sum(entry.quantity for entry in live), len(live)))
+                    if len(depth) == levels:
+                        break
+        return depth
+
+
+class OrderBookRegistry:
+    """Per-process order books, keyed by product id"""
+
+    key_prefix = "orderbook"
+
+    def __init__(self, alias=CACHE_ALIAS):
+        self.alias = alias
+        self._books = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _version_key(self, product_id):
+        return f"{self.key_prefix}:version:{product_id}"
+
+    def current_version(self, product_id):
+        try:
+            return self.cache.get(self._version_key(product_id))
+        except Exception as e:
+            logger.warning(f"Order book version unavailable: {str(e)}")
+            return None
+
+    def bump_version(self, product_id):
+        """Tell other processes the book of ``product_id`` changed"""
+        key = self._version_key(product_id)
+        try:
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, time.time_ns(), None)
+        except Exception as e:
+            logger.warning(f"Order book version bump failed for {key}: {str(e)}")
+
+    def get(self, product_id):
+        """The book of ``product_id``, loaded or synced as needed"""
+        with self._lock:
+            book = self._books.get(product_id)
+            if book is None:
+                book = self._books[product_id] = OrderBook(product_id)
+        version = self.current_version(product_id)
+        with book._lock:
+            if book.loaded_at is None or time.monotonic() - book.loaded_at > MAX_AGE:
+                self.load(book, version)
+            elif version is None or version != book.version:
+                self.sync(book, version)
+        return book
+
+    def load(self, book, version=None):
+        """Rebuild ``book`` from the database"""
+        from ..models.market import Bid, Offer
+
+        now = timezone.now()
+        bids = Bid.objects.filter(product_id=book.product_id).only(
+            'id', 'buyer_id', 'amount', 'quantity', 'created_at')
+        offers = Offer.objects.filter(
+            product_id=book.product_id, status=Offer.Status.PENDING, expires_at__gt=now
+        ).only('id', 'buyer_id', 'amount', 'quantity', 'created_at', 'expires_at')
+        with book._lock:
+            book.clear()
+            for bid in bids.order_by('created_at', 'id'):
+                book.add(BookEntry.from_bid(bid))
+            for offer in offers.order_by('created_at', 'id'):
+                book.add(BookEntry.from_offer(offer))
+            book.version, book.synced_at, book.loaded_at = version, now, time.monotonic()
+
+    def sync(self, book, version=None):
+        """Apply the Bid/Offer rows changed since ``book`` was last synced"""
+        from ..models.market import Bid, Offer
+
+        now = timezone.now()
+        since = book.synced_at - SYNC_SKEW
+        bids = Bid.objects.filter(product_id=book.product_id, created_at__gte=since)
+        offers = Offer.objects.filter(product_id=book.product_id, updated_at__gte=since)
+        with book._lock:
+            for bid in bids:
+                book.add(BookEntry.from_bid(bid))
+            for offer in offers:
+                self._apply_offer(book, offer)
+            book.version, book.synced_at = version, now
+
+    def _apply_offer(self, book, offer):
+        if offer.status == offer.Status.PENDING:
+            book.add(BookEntry.from_offer(offer))
+        else:
+            book.remove(OFFER, offer.pk)
+
+    # Local changes, called from the model signals once committed
+
+    def _loaded(self, product_id):
+        with self._lock:
+            book = self._books.get(product_id)
+        return book if book is not None and book.loaded_at is not None else None
+
+    def bid_saved(self, bid):
+        book = self._loaded(bid.product_id)
+        if book is not None:
+            book.add(BookEntry.from_bid(bid))
+        self.bump_version(bid.product_id)
+
+    def bid_deleted(self, bid):
+        book = self._loaded(bid.product_id)
+        if book is not None:
+            book.remove(BID, bid.pk)
+        self.bump_version(bid.product_id)
+
+    def offer_saved(self, offer):
+        book = self._loaded(offer.product_id)
+        if book is not None:
+            self._apply_offer(book, offer)
+        self.bump_version(offer.product_id)
+
+    def offer_deleted(self, offer):
+        book = self._loaded(offer.product_id)
+        if book is not None:
+            book.remove(OFFER, offer.pk)
+        self.bump_version(offer.product_id)
+
+
+order_books = OrderBookRegistry()
+
+
+# ====================== MATCHING ======================
+
+def is_crossed(product):
+    """Whether a pending offer meets the product's reserve price"""
+    if product.status != product.Status.ACTIVE:
+        return False
+    book = order_books.get(product.pk)
+    return next(book.entries(min_price=product.price, kind=OFFER), None) is not None
+
+
+def match_offers(product_id, batch_size=None):
+    """
+    Fill the pending offers on a product that meet its reserve price, in
+    price-time priority, until its quantity runs out. Offers are filled
+    whole; one that no longer fits is skipped in favour of smaller ones
+    behind it. The filled quantity is held for the new orders. Returns the
+    created orders.
+    """
+    from ..models.market import Offer, Order, Product
+    from ..models.user import BuyerProfile
+
+    batch_size = batch_size or MATCH_BATCH_SIZE
+    book = order_books.get(product_id)
+    product = Product.objects.filter(pk=product_id).only('price', 'status').first()
+    if product is None or product.status != Product.Status.ACTIVE:
+        return []
+
+    candidates = book.entries(min_price=product.price, kind=OFFER)
+    orders = []
+    while True:
+        batch = list(islice(candidates, batch_size))
+        if not batch:
+            break
+        with transaction.atomic():
+            # The product row lock serialises matching (and order acceptance) per product
+            product = Product.objects.select_for_update().filter(
+                pk=product_id, status=Product.Status.ACTIVE).first()
+            if product is None:
+                break
+            now = timezone.now()
+            offers = Offer.objects.select_for_update().filter(
+                pk__in=[entry.id for entry in batch],
+                status=Offer.Status.PENDING,
+                expires_at__gt=now,
+            ).in_bulk()
+
+            remaining = product.quantity
+            filled = []
+            for entry in batch:
+                offer = offers.get(entry.id)
+                if offer is None or offer.amount < product.price or offer.quantity > remaining:
+                    continue
+                remaining -= offer.quantity
+                offer.status = Offer.Status.ACCEPTED
+                offer.updated_at = now
+                filled.append(offer)
+            if not filled:
+                continue
+
+            buyers = dict(
+                BuyerProfile.objects.filter(user_id__in={offer.buyer_id for offer in filled})
+                .values_list('user_id', 'pk')
+            )
+            batch_orders = Order.objects.bulk_create([
+                Order(bid=offer, buyer_id=buyers.get(offer.buyer_id)) for offer in filled
+            ])
+            Offer.objects.bulk_update(filled, ['status', 'updated_at'])
+            # Filled stock is held until the farmer accepts the order
+            inventory.hold_locked(product, [(order, order.bid.quantity) for order in batch_orders])
+            # bulk_update sends no signals
+            for offer in filled:
+                transaction.on_commit(lambda offer=offer: order_books.offer_saved(offer))
+            transaction.on_commit(lambda: price_discovery.mark_dirty([product.name]))
+
+        orders.extend(batch_orders)
+        logger.info(f"Matched {len(batch_orders)} offers on product {product_id}")
+        if remaining <= 0:
+            break
+    return orders
@@ -0,0 +1,137 @@
+"""
+Bulk order creation.
+
+All products of a request are resolved and locked with one ``in_bulk``,
+every line is validated in one pass (errors are collected, not raised one
+at a time), and orders, items and inventory holds are written with
+``bulk_create`` and a single product UPDATE. The cost of an order is a
+handful of statements whatever its number of lines.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+
+from . import inventory, price_discovery
+
+logger = logging.getLogger(__name__)
+
+MAX_LINES = getattr(settings, "BULK_ORDER_MAX_LINES", 1000)
+
+
+@dataclass
+class LineError:
+    order: int
+    line: int
+    product_id: str
+    detail: str
+
+
+class OrderValidationError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid order lines")
+
+
+def _decimal(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def validate_lines(lines, products):
+    """
+    Errors of ``lines`` ((order, line, product_id, quantity) tuples) against
+    ``products`` ({pk: product}). Stock is checked on the total a request
+    takes of each product, across all of its orders.
+    """
+    from ..models.market import Product
+
+    errors = []
+    totals = defaultdict(Decimal)
+    for order_index, line_index, product_id, quantity in lines:
+        product = products.get(product_id)
+        if product is None:
+            errors.append(LineError(order_index, line_index, str(product_id), "Product not found"))
+        elif product.status != Product.Status.ACTIVE:
+            errors.append(LineError(order_index, line_index, str(product_id), "Product is not available"))
+        elif quantity is None or quantity <= 0:
+            errors.append(LineError(order_index, line_index, str(product_id), "Quantity must be positive"))
+        elif quantity < product.minimum_order:
+            errors.append(LineError(
+                order_index, line_index, str(product_id),
+                f"Minimum order is {product.minimum_order} {product.unit}",
+            ))
+        else:
+            totals[product_id] += quantity
+
+    short = {
+        product_id for product_id, total in totals.items()
+        if total > products[product_id].quantity
+    }
+    for order_index, line_index, product_id, quantity in lines:
+        if product_id in short:
+            errors.append(LineError(
+                order_index, line_index, str(product_id),
+                f"Only {products[product_id].quantity} {products[product_id].unit} available",
+            ))
+    return sorted(errors, key=lambda error: (error.order, error.line))
+
+
+def create_orders(buyer, carts, ttl=None):
+    """
+    Create one order per cart for ``buyer`` in a single transaction.
+    ``carts`` is a list of carts, each a list of (product_id, quantity).
+    The stock of every line is held for its order (see services/inventory.py).
+    Raises OrderValidationError with every invalid line; nothing is written
+    then.
+    """
+    from ..models.market import Order, OrderItem
+
+    lines = [
+        (order_index, line_index, product_id, _decimal(quantity))
+        for order_index, cart in enumerate(carts)
+        for line_index, (product_id, quantity) in enumerate(cart)
+    ]
+    if len(lines) > MAX_LINES:
+        raise OrderValidationError([LineError(-1, -1, '', f"At most {MAX_LINES} lines per request")])
+    empty = [LineError(index, -1, '', "Order has no items") for index, cart in enumerate(carts) if not cart]
+    if empty:
+        raise OrderValidationError(empty)
+
+    with transaction.atomic():
+        products = inventory.lock_products(product_id for _, _, product_id, _ in lines)
+        errors = validate_lines(lines, products)
+        if errors:
+            raise OrderValidationError(errors)
+
+        orders = Order.objects.bulk_create([Order(buyer=buyer) for _ in carts])
+        items = OrderItem.objects.bulk_create([
+            OrderItem(
+                order=orders[order_index],
+                product_id=product_id,
+                quantity=quantity,
+                unit_price=products[product_id].price,
+            )
+            for order_index, _, product_id, quantity in lines
+        ])
+        inventory.hold_products_locked(
+            products,
+            [(orders[order_index], product_id, quantity) for order_index, _, product_id, quantity in lines],
+            ttl,
+        )
+        # bulk_create sends no signals
+        transaction.on_commit(lambda: price_discovery.mark_dirty([product.name for product in products.values()]))
+
+    # Serve the items without another query
+    by_order = defaultdict(list)
+    for item in items:
+        by_order[item.order_id].append(item)
+    for order in orders:
+        order._prefetched_objects_cache = {'items': by_order[order.pk]}
+    logger.info(f"Created {len(orders)} orders with {len(items)} items for buyer {buyer.pk}")
+    return orders
@@ -0,0 +1,298 @@
+"""
+Reference prices for price discovery (MCP ``agro.price_discovery``).
+
+The reference price of a crop is a volume-weighted, trimmed mean of what it
+traded and was quoted at over the last ``PRICE_DISCOVERY_WINDOW_DAYS``:
+
+- fills: order items, and offers accepted into orders
+- quotes: pending, unexpired offers, and bids
+- market reports: ``PriceTrend`` days, each counting as
+  ``PRICE_DISCOVERY_TREND_VOLUME`` kg
+
+Prices are converted to per-kg and weighted by kg traded times the weight of
+their source (``PRICE_DISCOVERY_SOURCE_WEIGHTS``: a fill says more than a
+bid). Prices more than ``PRICE_DISCOVERY_MAX_DEVIATION`` times above or
+below the weighted median are dropped (a mistyped price on a large quantity
+would otherwise outweigh the trim), then ``PRICE_DISCOVERY_TRIM`` of the
+weight is cut from each end of the distribution before averaging. Products are grouped by crop on their lower-cased name,
+which is how ``PriceTrend.crop_type`` is matched.
+
+Market reports are the only observations tied to a market, so they also
+give every crop an entry per market (``crop@market``, see ``market_key``),
+priced from that market's reports alone.
+
+The index lives in Redis, where the MCP service keeps an in-process copy
+(microservice/microservice/price_index.py) and serves calls from memory:
+
+    agro:price_index           hash of crop (or crop@market) -> JSON entry
+    agro:price_index:changes   sorted set of crop (or crop@market) -> version of its last change
+    agro:price_index:version   counter of the versions above
+    agro:price_index:dirty     set of crops waiting to be recomputed
+
+Signals (and bulk writers) add crops to the dirty set as their trades and
+quotes change; ``manage.py refresh_price_index`` recomputes only those,
+every second or so, and everything every ``--full-every`` seconds so old
+observations age out of the window. Each write bumps the version of the
+crops it touched, so readers fetch just the changed entries.
+"""
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .forecasting import redis_client
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = getattr(settings, "PRICE_DISCOVERY_WINDOW_DAYS", 14)
+TRIM = getattr(settings, "PRICE_DISCOVERY_TRIM", 0.1)
+TREND_VOLUME = getattr(settings, "PRICE_DISCOVERY_TREND_VOLUME", 1000)
+MAX_DEVIATION = getattr(settings, "PRICE_DISCOVERY_MAX_DEVIATION", 3.0)
+SOURCE_WEIGHTS = getattr(
+    settings, "PRICE_DISCOVERY_SOURCE_WEIGHTS", {'fill': 1.0, 'offer': 0.5, 'bid': 0.25, 'trend': 1.0}
+)
+
+INDEX_KEY = "agro:price_index"
+CHANGES_KEY = f"{INDEX_KEY}:changes"
+VERSION_KEY = f"{INDEX_KEY}:version"
+DIRTY_KEY = f"{INDEX_KEY}:dirty"
+
+# Kilograms per unit of Product.unit (and PriceTrend.price_unit)
+KILOGRAMS = {'kg': 1.0, 'g': 0.001, 'ton': 1000.0}
+
+# Writes entries (empty to remove) and gives them one new version, atomically,
+# so a reader never sees a version before the entries it covers
+_PUBLISH = """
+local version = redis.call('INCR', KEYS[1])
+for i = 1, #ARGV, 2 do
+    if ARGV[i + 1] == '' then
+        redis.call('HDEL', KEYS[2], ARGV[i])
+    else
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+    end
+    redis.call('ZADD', KEYS[3], version, ARGV[i])
+end
+return version
+"""
+
+
+def crop_key(name):
+    return (name or '').strip().lower()
+
+
+def market_key(crop, market):
+    return f"{crop_key(crop)}@{crop_key(market)}"
+
+
+# ====================== OBSERVATIONS ======================
+
+class Observations:
+    """Per-kg prices and weights of many crops, in flat arrays"""
+
+    def __init__(self):
+        self.crops = []
+        self.prices = []
+        self.weights = []
+        self.volumes = []  # kg, market reports excluded
+        self.sources = defaultdict(lambda: defaultdict(int))
+
+    def add(self, crop, source, price, quantity, unit):
+        kilograms = KILOGRAMS.get(unit, 1.0)
+        volume = float(quantity) * kilograms
+        if price is None or price <= 0 or volume <= 0:
+            return
+        self.crops.append(crop_key(crop))
+        self.prices.append(float(price) / kilograms)
+        self.weights.append(volume * SOURCE_WEIGHTS.get(source, 1.0))
+        self.volumes.append(0.0 if source == 'trend' else volume)
+        self.sources[crop_key(crop)][source] += 1
+
+
+def observations(crops=None, now=None):
+    """Observations of the window ending ``now`` (of the given crops only, when given)"""
+    from ..models.market import Bid, Offer, Order, OrderItem, PriceTrend
+
+    now = now or timezone.now()
+    since = now - timedelta(days=WINDOW_DAYS)
+    crops = sorted({crop_key(crop) for crop in crops}) if crops is not None else None
+    found = Observations()
+
+    def of_crops(queryset, field):
+        queryset = queryset.annotate(crop=Lower(field)).order_by()
+        return queryset.filter(crop__in=crops) if crops is not None else queryset
+
+    items = of_crops(OrderItem.objects.filter(order__created_at__gte=since).exclude(
+        order__payment_status__in=[Order.PaymentStatus.FAILED, Order.PaymentStatus.REFUNDED]
+    ), 'product__name')
+    for crop, price, quantity, unit in items.values_list('crop', 'unit_price', 'quantity', 'product__unit'):
+        found.add(crop, 'fill', price, quantity, unit)
+
+    offers = of_crops(Offer.objects.filter(updated_at__gte=since).filter(
+        status__in=[Offer.Status.ACCEPTED, Offer.Status.PENDING]
+    ).exclude(status=Offer.Status.PENDING, expires_at__lte=now), 'product__name')
+    for crop, status, price, quantity, unit in offers.values_list(
+        'crop', 'status', 'amount', 'quantity', 'product__unit'
+    ):
+        found.add(crop, 'fill' if status == Offer.Status.ACCEPTED else 'offer', price, quantity, unit)
+
+    bids = of_crops(Bid.objects.filter(created_at__gte=since), 'product__name')
+    for crop, price, quantity, unit in bids.values_list('crop', 'amount', 'quantity', 'product__unit'):
+        found.add(crop, 'bid', price, quantity, unit)
+
+    trends = of_crops(PriceTrend.objects.filter(date__gte=timezone.localdate(now) - timedelta(days=WINDOW_DAYS)),
+                      'crop_type')
+    for crop, market, price, unit in trends.values_list('crop', 'market', 'avg_price', 'price_unit'):
+        found.add(crop, 'trend', price, TREND_VOLUME / KILOGRAMS.get(unit, 1.0), unit)
+        if crop_key(market):
+            found.add(market_key(crop, market), 'trend', price, TREND_VOLUME / KILOGRAMS.get(unit, 1.0), unit)
+    return found
+
+
+# ====================== PRICES ======================
+
+def _cumulative(codes, weights, starts, ends):
+    """(cumulative weight, restarting at every crop; total weight of every crop)"""
+    import numpy as np
+
+    cumulative = np.cumsum(weights)
+    before = np.append(0.0, cumulative)[starts]  # weight of the crops sorted earlier
+    return cumulative - before[codes], cumulative[ends - 1] - before
+
+
+def reference_prices(found, trim=None):
+    """
+    {crop: (price, median, low, high, volume)} of the observations, for all
+    crops at once. Prices further than ``PRICE_DISCOVERY_MAX_DEVIATION``
+    times from the weighted median are dropped, then ``trim`` of the weight
+    is cut from both ends; the price is the weighted mean of the rest, low
+    and high their range, and volume the kg traded or quoted.
+    """
+    import numpy as np
+
+    trim = TRIM if trim is None else trim
+    if not found.crops:
+        return {}
+    names, codes = np.unique(np.array(found.crops), return_inverse=True)
+    volume = np.bincount(codes, np.asarray(found.volumes), minlength=len(names))
+
+    # Sorted by crop, then price; every crop is a contiguous band
+    order = np.lexsort((np.asarray(found.prices), codes))
+    codes, prices, weights = codes[order], np.asarray(found.prices)[order], np.asarray(found.weights)[order]
+    starts = np.searchsorted(codes, np.arange(len(names)))
+    ends = np.append(starts[1:], len(codes))
+
+    upper, totals = _cumulative(codes, weights, starts, ends)
+    middle = np.minimum(starts + [
+        np.searchsorted(upper[start:end], total / 2) for start, end, total in zip(starts, ends, totals)
+    ], ends - 1)
+    medians = prices[middle]
+    weights = np.where(
+        (prices <= medians[codes] * MAX_DEVIATION) & (prices >= medians[codes] / MAX_DEVIATION), weights, 0)
+
+    # The part of each observation's weight inside the kept band
+    upper, totals = _cumulative(codes, weights, starts, ends)
+    kept = np.clip(
+        np.minimum(upper, ((1 - trim) * totals)[codes]) - np.maximum(upper - weights, (trim * totals)[codes]),
+        0, None,
+    )
+    kept_total = np.bincount(codes, kept, minlength=len(names))
+    means = np.bincount(codes, prices * kept, minlength=len(names)) / kept_total
+    lows = np.minimum.reduceat(np.where(kept > 0, prices, np.inf), starts)
+    highs = np.maximum.reduceat(np.where(kept > 0, prices, -np.inf), starts)
+    return {
+        str(name): (float(means[code]), float(medians[code]), float(lows[code]), float(highs[code]),
+                    float(volume[code]))
+        for code, name in enumerate(names)
+    }
+
+
+def entries(found, now=None):
+    """{crop: index entry} of the observations"""
+    updated_at = (now or timezone.now()).isoformat()
+    return {
+        crop: {
+            'crop_type': crop,
+            'price': round(price, 2),
+            'median': round(median, 2),
+            'low': round(low, 2),
+            'high': round(high, 2),
+            'unit': 'kg',
+            'volume': round(volume, 2),
+            'sources': dict(found.sources[crop]),
+            'window_days': WINDOW_DAYS,
+            'updated_at': updated_at,
+        }
+        for crop, (price, median, low, high, volume) in reference_prices(found).items()
+    }
+
+
+# ====================== INDEX ======================
+
+def publish(changed, removed=()):
+    """Write entries and drop crops from the index; returns the new version"""
+    arguments = []
+    for crop, entry in changed.items():
+        arguments += [crop, json.dumps(entry)]
+    for crop in removed:
+        arguments += [crop, '']
+    if not arguments:
+        return None
+    client = redis_client()
+    return client.register_script(_PUBLISH)(keys=[VERSION_KEY, INDEX_KEY, CHANGES_KEY], args=arguments)
+
+
+def refresh(crops=None, now=None):
+    """
+    Recompute the given crops (every crop when None) and publish them, with
+    their markets; entries left without observations are removed. Returns
+    (published, removed).
+    """
+    now = now or timezone.now()
+    found = observations(crops, now)
+    changed = entries(found, now)
+    indexed = set(key.decode() for key in redis_client().hkeys(INDEX_KEY))
+    if crops is None:
+        keys = indexed | set(changed)
+    else:
+        crops = {crop_key(crop) for crop in crops}
+        keys = crops | {key for key in indexed if key.partition('@')[0] in crops}
+    removed = keys - set(changed)
+    publish(changed, removed)
+    logger.info(f"Price index: {len(changed)} entries published, {len(removed)} removed")
+    return len(changed), len(removed)
+
+
+def mark_dirty(crops):
+    """Queue crops for ``refresh_dirty``; never raises (the full refresh catches up)"""
+    crops = {crop_key(crop) for crop in crops if crop}
+    if not crops:
+        return
+    try:
+        redis_client().sadd(DIRTY_KEY, *crops)
+    except Exception as e:
+        logger.warning(f"Price index: crops not marked dirty: {str(e)}")
+
+
+def mark_products_dirty(product_ids):
+    from ..models.market import Product
+    mark_dirty(Product.objects.filter(pk__in=set(product_ids)).values_list('name', flat=True).distinct())
+
+
+def refresh_dirty(batch_size=500):
+    """Recompute the crops marked dirty; returns how many"""
+    client = redis_client()
+    total = 0
+    while True:
+        crops = [crop.decode() for crop in client.spop(DIRTY_KEY, batch_size) or []]
+        if not crops:
+            return total
+        try:
+            refresh(crops)
+        except Exception:
+            client.sadd(DIRTY_KEY, *crops)
+            raise
+        total += len(crops)
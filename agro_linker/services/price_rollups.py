@@ -0,0 +1,185 @@
+"""
+Price history at several resolutions.
+
+``PriceTrend`` has one row per crop, market and day. ``PriceRollup`` keeps
+the same prices aggregated per week, month and year for every (crop_type,
+market): lowest ``min_price``, highest ``max_price``, and the sum and count
+of the daily ``avg_price``, so rollups of several markets or periods
+combine exactly.
+
+A saved or deleted daily row refreshes only the three periods it falls in
+(one small aggregate over at most a year of that market's rows each), and
+those it fell in before when its crop, market or date changed, from
+``signals.py``; bulk loads, which send no signals, are rolled up with
+``manage.py rollup_prices``, which rebuilds everything in one grouped query
+per resolution.
+
+``price_series`` answers a chart query from the coarsest data that still
+gives enough points: daily rows for short ranges, then weeks, months and
+years as the range grows past ``PRICE_SERIES_MAX_POINTS`` points. Range
+ends are widened to whole periods.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+
+logger = logging.getLogger(__name__)
+
+MAX_POINTS = getattr(settings, "PRICE_SERIES_MAX_POINTS", 200)
+
+DAY = 'day'
+TRUNCATE = {'week': TruncWeek, 'month': TruncMonth, 'year': TruncYear}
+# Finest first
+RESOLUTIONS = [DAY, 'week', 'month', 'year']
+
+
+def period_start(resolution, day):
+    if resolution == 'week':
+        return day - timedelta(days=day.weekday())
+    if resolution == 'month':
+        return day.replace(day=1)
+    if resolution == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_period(resolution, start):
+    if resolution == 'week':
+        return start + timedelta(days=7)
+    if resolution == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    if resolution == 'year':
+        return start.replace(year=start.year + 1)
+    return start + timedelta(days=1)
+
+
+def periods(resolution, start, end):
+    """Number of periods of ``resolution`` covering start..end (inclusive)"""
+    if resolution == 'week':
+        return (period_start('week', end) - period_start('week', start)).days // 7 + 1
+    if resolution == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    if resolution == 'year':
+        return end.year - start.year + 1
+    return (end - start).days + 1
+
+
+def _invalidate():
+    # bulk writes send no signals
+    from ..api.v1.optimizations import response_cache
+    from ..models.market import PriceRollup
+    response_cache.invalidate_on_commit(PriceRollup)
+
+
+# ====================== MAINTENANCE ======================
+
+def refresh(crop_type, market, day):
+    """Recompute the week, month and year of ``day`` for one crop and market"""
+    from ..models.market import PriceRollup, PriceTrend
+
+    rows = PriceTrend.objects.filter(crop_type=crop_type, market=market)
+    with transaction.atomic():
+        for resolution in TRUNCATE:
+            start = period_start(resolution, day)
+            totals = rows.filter(date__gte=start, date__lt=next_period(resolution, start)).aggregate(
+                min_price=Min('min_price'), max_price=Max('max_price'),
+                price_total=Sum('avg_price'), days=Count('pk'),
+            )
+            key = {'crop_type': crop_type, 'market': market, 'resolution': resolution, 'period_start': start}
+            if totals['days']:
+                PriceRollup.objects.update_or_create(**key, defaults=totals)
+            else:
+                PriceRollup.objects.filter(**key).delete()
+    _invalidate()
+
+
+def rebuild(crop_type=None, start=None, end=None):
+    """
+    Recompute every rollup (of one crop, and of whole periods overlapping
+    start..end, when given) with one grouped query per resolution; returns
+    the number of rollups written
+    """
+    from ..models.market import PriceRollup, PriceTrend
+
+    written = 0
+    with transaction.atomic():
+        for resolution, truncate in TRUNCATE.items():
+            rows = PriceTrend.objects.all()
+            stale = PriceRollup.objects.filter(resolution=resolution)
+            if crop_type:
+                rows, stale = rows.filter(crop_type=crop_type), stale.filter(crop_type=crop_type)
+            if start:
+                first = period_start(resolution, start)
+                rows, stale = rows.filter(date__gte=first), stale.filter(period_start__gte=first)
+            if end:
+                last = next_period(resolution, period_start(resolution, end))
+                rows, stale = rows.filter(date__lt=last), stale.filter(period_start__lt=last)
+            rollups = [
+                PriceRollup(resolution=resolution, **row)
+                for row in rows.annotate(period_start=truncate('date')).values('crop_type', 'market', 'period_start')
+                .annotate(
+                    min_price=Min('min_price'), max_price=Max('max_price'),
+                    price_total=Sum('avg_price'), days=Count('pk'),
+                ).order_by()
+            ]
+            stale.delete()
+            PriceRollup.objects.bulk_create(rollups, batch_size=1000)
+            written += len(rollups)
+    _invalidate()
+    logger.info(f"Rebuilt {written} price rollups")
+    return written
+
+
+# ====================== QUERIES ======================
+
+def choose_resolution(start, end, max_points=None):
+    """The finest resolution giving at most ``max_points`` points over start..end"""
+    max_points = max_points or MAX_POINTS
+    for resolution in RESOLUTIONS:
+        if periods(resolution, start, end) <= max_points:
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+def price_series(crop_type, start, end, market=None, resolution=None, max_points=None):
+    """
+    (resolution, points) of the prices of a crop between two dates, in one
+    market or across all of them. Points are dicts with period_start,
+    min_price, avg_price, max_price and days (daily rows aggregated).
+    """
+    from ..models.market import PriceRollup, PriceTrend
+
+    resolution = resolution or choose_resolution(start, end, max_points)
+    first = period_start(resolution, start)
+    if resolution == DAY:
+        rows = (
+            PriceTrend.objects.filter(crop_type=crop_type, date__gte=first, date__lte=end)
+            .annotate(period_start=F('date'))
+        )
+        total, days = Sum('avg_price'), Count('pk')
+    else:
+        rows = PriceRollup.objects.filter(
+            crop_type=crop_type, resolution=resolution, period_start__gte=first, period_start__lte=end
+        )
+        total, days = Sum('price_total'), Sum('days')
+    if market:
+        rows = rows.filter(market=market)
+
+    points = []
+    for row in (
+        rows.values('period_start')
+        .annotate(min_price=Min('min_price'), max_price=Max('max_price'), price_total=total, days=days)
+        .order_by('period_start')
+    ):
+        points.append({
+            'period_start': row['period_start'],
+            'min_price': row['min_price'],
+            'avg_price': row['price_total'] / row['days'],
+            'max_price': row['max_price'],
+            'days': row['days'],
+        })
+    return resolution, points
@@ -0,0 +1,209 @@
+"""
+Thrift contribution reconciliation against mobile-money statements.
+
+A treasurer uploads the provider's statement (CSV, JSON Lines or a JSON
+array) after a meeting day and every contribution it proves is verified
+at once. The statement is read as a stream, ``RECONCILIATION_CHUNK_SIZE``
+lines at a time, and each chunk is hash-joined against the contributions
+by ``transaction_reference``: one query per chunk fetches the
+contributions it names, and matching happens in dicts.
+
+- a line whose reference and amount match an unverified contribution
+  verifies it; all of a chunk's matches go through
+  ``thrift_pot.verify_contributions``, one UPDATE of the contributions
+  and grouped ``F()`` increments of the pots and memberships
+- a line whose amount differs is reported, not verified
+- lines naming a contribution already verified, no contribution at all,
+  or a reference seen earlier in the statement are reported
+- with ``group``, the group's unverified contributions that the statement
+  never mentioned are reported as missing
+
+Column names vary by provider; ``RECONCILIATION_COLUMNS`` lists the names
+accepted for each field. Amounts are compared to the cent. JSON arrays
+are parsed whole (the standard library has no streaming JSON parser);
+providers that can export JSON Lines should.
+"""
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.conf import settings
+
+from . import thrift_pot
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = getattr(settings, "RECONCILIATION_CHUNK_SIZE", 5000)
+COLUMNS = getattr(settings, "RECONCILIATION_COLUMNS", {
+    'reference': ['transaction_reference', 'reference', 'receipt_no', 'receipt', 'transaction_id', 'txn_id'],
+    'amount': ['amount', 'paid_in', 'credit', 'value'],
+})
+FORMATS = ['csv', 'json', 'jsonl']
+
+
+class StatementError(ValueError):
+    """A statement that cannot be read as records"""
+
+
+@dataclass
+class Report:
+    lines: int = 0
+    verified: int = 0
+    already_verified: list = field(default_factory=list)
+    amount_mismatches: list = field(default_factory=list)  # [(reference, statement amount, contribution amount)]
+    unknown: list = field(default_factory=list)
+    duplicates: list = field(default_factory=list)
+    unreadable: list = field(default_factory=list)  # line numbers
+    missing: list = field(default_factory=list)  # unverified contributions of the group not on the statement
+
+    def as_dict(self):
+        return {
+            'lines': self.lines,
+            'verified': self.verified,
+            'already_verified': self.already_verified,
+            'amount_mismatches': [
+                {'transaction_reference': reference, 'statement_amount': str(statement), 'expected_amount': str(expected)}
+                for reference, statement, expected in self.amount_mismatches
+            ],
+            'unknown': self.unknown,
+            'duplicates': self.duplicates,
+            'unreadable': self.unreadable,
+            'missing': self.missing,
+        }
+
+
+# ====================== STATEMENT PARSING ======================
+
+def _normalise(name):
+    return str(name).strip().lower().replace(' ', '_').replace('.', '')
+
+
+def _field(record, names):
+    for name in names:
+        if record.get(name) not in (None, ''):
+            return record[name]
+    return None
+
+
+def _amount(value):
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    return Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+def _csv_records(stream):
+    reader = csv.DictReader(stream)
+    try:
+        yield from reader
+    except csv.Error as e:
+        raise StatementError(f"Malformed CSV at line {reader.line_num}: {str(e)}") from e
+
+
+def format_for(filename):
+    """Statement format of a file name, by extension (csv by default)"""
+    extension = str(filename).rsplit('.', 1)[-1].lower()
+    return {'ndjson': 'jsonl'}.get(extension, extension if extension in FORMATS else 'csv')
+
+
+def read_statement(stream, statement_format='csv'):
+    """
+    Yield (line number, reference, amount) from a statement, a binary or
+    text stream; amount is None when unreadable. Raises StatementError (or
+    another ValueError) when the statement is not a list of records.
+    """
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(stream, 'mode', ''):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if statement_format == 'csv':
+        records = _csv_records(stream)
+    elif statement_format == 'jsonl':
+        records = (json.loads(line) for line in stream if line.strip())
+    elif statement_format == 'json':
+        records = json.load(stream)
+        if not isinstance(records, list):
+            raise StatementError("A JSON statement must be an array of objects")
+    else:
+        raise ValueError(f"Unknown statement format {statement_format}")
+
+    for number, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            raise StatementError(f"Line {number} is not an object")
+        record = {_normalise(key): value for key, value in record.items()}
+        reference = _field(record, COLUMNS['reference'])
+        try:
+            amount = _amount(_field(record, COLUMNS['amount']))
+        except (InvalidOperation, TypeError, ValueError):
+            amount = None
+        yield number, str(reference).strip() if reference is not None else None, amount
+
+
+# ====================== RECONCILIATION ======================
+
+def reconcile(stream, statement_format='csv', group=None, verified_by=None, dry_run=False):
+    """
+    Verify the contributions a statement proves; returns a Report. With
+    ``group``, only that group's contributions are matched. ``dry_run``
+    reports without verifying.
+    """
+    from ..models.thrift import ThriftContribution
+
+    report = Report()
+    seen = set()
+    lines = read_statement(stream, statement_format)
+    while True:
+        chunk = list(islice(lines, CHUNK_SIZE))
+        if not chunk:
+            break
+        report.lines += len(chunk)
+
+        statement = {}
+        for number, reference, amount in chunk:
+            if not reference or amount is None:
+                report.unreadable.append(number)
+            elif reference in seen:
+                report.duplicates.append(reference)
+            else:
+                seen.add(reference)
+                statement[reference] = amount
+
+        contributions = ThriftContribution.objects.filter(transaction_reference__in=list(statement))
+        if group is not None:
+            contributions = contributions.filter(membership__group=group)
+        found = {
+            reference: (pk, amount, is_verified) for pk, reference, amount, is_verified in
+            contributions.values_list('pk', 'transaction_reference', 'amount', 'is_verified')
+        }
+
+        matched = []
+        for reference, amount in statement.items():
+            if reference not in found:
+                report.unknown.append(reference)
+                continue
+            pk, expected, is_verified = found[reference]
+            if is_verified:
+                report.already_verified.append(reference)
+            elif amount != expected:
+                report.amount_mismatches.append((reference, amount, expected))
+            else:
+                matched.append(pk)
+        if dry_run:
+            report.verified += len(matched)
+        elif matched:
+            # Counts only the contributions nobody verified meanwhile
+            report.verified += thrift_pot.verify_contributions(matched, verified_by)
+
+    if group is not None:
+        report.missing = [
+            reference for reference in
+            ThriftContribution.objects.filter(membership__group=group, is_verified=False)
+            .values_list('transaction_reference', flat=True).iterator(chunk_size=5000)
+            if reference not in seen
+        ]
+    logger.info(
+        f"Reconciled a statement of {report.lines} lines: {report.verified} verified, "
+        f"{len(report.amount_mismatches)} amount mismatches, {len(report.unknown)} unknown"
+    )
+    return report
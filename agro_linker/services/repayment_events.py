@@ -0,0 +1,232 @@
+"""
+Queued processing of MFI repayment webhooks.
+
+The webhook only verifies the signature and stores each payment as a
+``RepaymentEvent`` (``receive``): one lookup and one insert, keyed by the
+unique ``transaction_reference``, so the MFI gets its answer in
+milliseconds and a retry of a payment already received is acknowledged
+without being stored or posted again.
+
+The worker (``manage.py process_repayment_events``) posts them:
+
+- claims a batch of due PENDING events with
+  ``select_for_update(skip_locked=True)`` and marks them PROCESSING, so any
+  number of workers can run side by side;
+- keeps each loan's events in the order they were received: an event is
+  only claimed with every unfinished event of its loan received before it,
+  so a loan's payments are never posted out of order or by two workers at
+  once, and an event waiting for a retry holds back the ones behind it;
+- posts the batch through ``repayments.post_repayments``, one transaction
+  (a fixed number of queries) per ``REPAYMENT_BATCH_SIZE`` events. Should
+  one fail, its events are posted one by one so a single bad event only
+  holds back its own loan, while those committed before keep their
+  results instead of being found recorded and reported as duplicates;
+- writes all outcomes back with a single ``bulk_update``. Failed events are
+  retried after ``REPAYMENT_EVENT_RETRY_DELAY`` up to
+  ``REPAYMENT_EVENT_MAX_ATTEMPTS``; events left PROCESSING by a crashed
+  worker are reclaimed after ``REPAYMENT_EVENT_CLAIM_TIMEOUT``.
+
+Payments to an unknown loan, of a non-positive amount or with a malformed
+payload are REJECTED and not retried; FAILED events ran out of attempts. Both are kept for review.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import repayments
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, "REPAYMENT_EVENT_BATCH_SIZE", 1000)
+MAX_ATTEMPTS = getattr(settings, "REPAYMENT_EVENT_MAX_ATTEMPTS", 5)
+RETRY_DELAY = timedelta(seconds=getattr(settings, "REPAYMENT_EVENT_RETRY_DELAY", 60))
+CLAIM_TIMEOUT = timedelta(seconds=getattr(settings, "REPAYMENT_EVENT_CLAIM_TIMEOUT", 60 * 10))
+
+ACCEPTED, DUPLICATE = 'accepted', 'duplicate'
+
+
+# ====================== INGESTION ======================
+
+def receive(payloads):
+    """
+    Store repayment webhook payloads (dicts of LoanRepaymentIn fields) for
+    the worker; returns ACCEPTED or DUPLICATE for each, in order
+    """
+    from ..models.finance import RepaymentEvent
+
+    references = [payload['transaction_reference'] for payload in payloads]
+    received = set(
+        RepaymentEvent.objects.filter(transaction_reference__in=references)
+        .values_list('transaction_reference', flat=True)
+    )
+    statuses, events = [], {}
+    for reference, payload in zip(references, payloads):
+        if reference in received or reference in events:
+            statuses.append(DUPLICATE)
+            continue
+        statuses.append(ACCEPTED)
+        events[reference] = RepaymentEvent(
+            transaction_reference=reference, loan_reference=payload['loan_reference'], payload=payload,
+        )
+    # A concurrent delivery of the same payment may insert first; its copy stands
+    RepaymentEvent.objects.bulk_create(list(events.values()), batch_size=1000, ignore_conflicts=True)
+    return statuses
+
+
+# ====================== PROCESSING ======================
+
+def _payment(event):
+    payload = event.payload
+    payment_date = payload.get('payment_date')
+    if isinstance(payment_date, str):
+        payment_date = parse_datetime(payment_date) or parse_date(payment_date)
+    return repayments.Payment(
+        loan_reference=event.loan_reference,
+        amount=Decimal(str(payload['amount'])),
+        transaction_reference=event.transaction_reference,
+        payment_date=payment_date,
+        payment_method=payload.get('payment_method') or 'mobile_money',
+    )
+
+
+class RepaymentEventWorker:
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or BATCH_SIZE
+
+    def claim(self):
+        """Lock a batch of due events, in order within each loan, and mark them PROCESSING"""
+        from ..models.finance import RepaymentEvent
+
+        Status = RepaymentEvent.Status
+        now = timezone.now()
+        due = (
+            Q(status=Status.PENDING) & (Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - RETRY_DELAY))
+            | Q(status=Status.PROCESSING, claimed_at__lt=now - CLAIM_TIMEOUT)
+        )
+        with transaction.atomic():
+            candidates = list(
+                RepaymentEvent.objects.select_for_update(skip_locked=True)
+                .filter(due)
+                .order_by('pk')
+                .values_list('pk', 'loan_reference')[:self.batch_size]
+            )
+            if not candidates:
+                return []
+            # Unfinished events of the same loans received up to the last candidate, claimable or not
+            ahead = defaultdict(list)
+            for pk, loan_reference in (
+                RepaymentEvent.objects.filter(
+                    loan_reference__in={loan_reference for _, loan_reference in candidates},
+                    status__in=[Status.PENDING, Status.PROCESSING],
+                    pk__lte=candidates[-1][0],
+                ).order_by('pk').values_list('pk', 'loan_reference')
+            ):
+                ahead[loan_reference].append(pk)
+            claimable = {pk for pk, _ in candidates}
+            ids = []
+            for loan_reference, pks in ahead.items():
+                # A loan's events up to the first one this worker may not take
+                for pk in pks:
+                    if pk not in claimable:
+                        break
+                    ids.append(pk)
+            RepaymentEvent.objects.filter(pk__in=ids).update(
+                status=Status.PROCESSING, claimed_at=now, attempts=F('attempts') + 1
+            )
+        return list(RepaymentEvent.objects.filter(pk__in=ids).order_by('pk'))
+
+    def process(self):
+        """Post one batch; returns the number of events processed"""
+        from ..models.finance import RepaymentEvent
+
+        events = self.claim()
+        if not events:
+            return 0
+
+        outcomes, payments = {}, {}
+        for event in events:
+            try:
+                payments[event.pk] = _payment(event)
+            except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+                # Retrying cannot fix the payload
+                outcomes[event.pk] = repayments.Result(
+                    event.transaction_reference, repayments.REJECTED, f"Malformed payload: {e!r}")
+        outcomes.update(self.post([event for event in events if event.pk in payments], payments))
+
+        Status = RepaymentEvent.Status
+        now = timezone.now()
+        processed = 0
+        for event in events:
+            outcome = outcomes[event.pk]
+            if outcome is None:
+                event.status, event.claimed_at, event.attempts = Status.PENDING, None, event.attempts - 1
+                continue
+            if isinstance(outcome, Exception):
+                event.status = Status.PENDING if event.attempts < MAX_ATTEMPTS else Status.FAILED
+                event.last_error = str(outcome)[:1000]
+                continue
+            event.result = outcome.as_dict()
+            event.processed_at, event.last_error = now, outcome.error
+            if outcome.status == repayments.REJECTED:
+                event.status = Status.REJECTED
+            else:
+                event.status = Status.PROCESSED
+                processed += 1
+        RepaymentEvent.objects.bulk_update(
+            events, ['status', 'attempts', 'claimed_at', 'result', 'processed_at', 'last_error'], batch_size=1000)
+        logger.info(f"Processed {len(events)} repayment events: {processed} posted or already recorded")
+        return len(events)
+
+    def post(self, events, payments):
+        """
+        {event pk: Result, the exception that failed it, or None if it waits
+        behind a failed event of its loan} of posting ``payments`` ({event
+        pk: Payment}), one transaction per chunk of ``REPAYMENT_BATCH_SIZE``
+        """
+        outcomes = {}
+        failed_loans = set()
+        for start in range(0, len(events), repayments.BATCH_SIZE):
+            chunk = []
+            for event in events[start:start + repayments.BATCH_SIZE]:
+                if event.loan_reference in failed_loans:
+                    # Waits behind the failed event of its loan
+                    outcomes[event.pk] = None
+                else:
+                    chunk.append(event)
+            try:
+                results = repayments.post_repayments([payments[event.pk] for event in chunk])
+            except Exception as e:
+                logger.warning(f"Repayment event batch of {len(chunk)} failed, posting one by one: {str(e)}")
+            else:
+                outcomes.update(zip([event.pk for event in chunk], results))
+                continue
+            for event in chunk:
+                if event.loan_reference in failed_loans:
+                    outcomes[event.pk] = None
+                    continue
+                try:
+                    outcomes[event.pk], = repayments.post_repayments([payments[event.pk]])
+                except Exception as error:
+                    outcomes[event.pk] = error
+                    failed_loans.add(event.loan_reference)
+        return outcomes
+
+
+def process_pending(batch_size=None, max_batches=None):
+    """Drain due repayment events; returns the number processed"""
+    worker = RepaymentEventWorker(batch_size)
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        processed = worker.process()
+        if not processed:
+            break
+        total += processed
+        batches += 1
+    return total
@@ -0,0 +1,195 @@
+"""
+Loan repayment posting.
+
+A batch of MFI repayments is posted in one transaction with a fixed number
+of queries, whatever its size:
+
+1. the transaction references already recorded (duplicates are reported,
+   not posted again; ``LoanRepayment.transaction_reference`` is unique, so
+   a concurrent post of the same payment fails that batch's insert and the
+   batch is retried without it)
+2. the loans, locked ``FOR UPDATE`` in pk order so concurrent batches
+   queue instead of deadlocking
+3. their open installments
+
+Each payment is then allocated in memory, in payment date order, down the
+waterfall of its loan's installments: oldest due date first, each filled
+up to its amount before the next. Anything left once every installment is
+paid stays on the loan as ``amount_paid`` (an overpayment). The results are
+written with one ``bulk_create`` of the repayments and one ``bulk_update``
+each of the installments and loans touched, so every row is written once
+per batch rather than once per payment.
+
+A loan with installments is repaid when none is left open; one without
+(older loans) when ``amount_paid`` reaches ``amount``.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, "REPAYMENT_BATCH_SIZE", 1000)
+REPAYABLE = ['approved', 'disbursed', 'partially_paid']
+OPEN = ['pending', 'overdue', 'partially_paid']
+POSTED, DUPLICATE, REJECTED = 'posted', 'duplicate', 'rejected'
+# Attempts of a batch that collided with a concurrent post of the same payments
+POST_ATTEMPTS = 3
+
+
+@dataclass
+class Payment:
+    loan_reference: str
+    amount: Decimal
+    transaction_reference: str
+    payment_date: Optional[datetime] = None
+    payment_method: str = 'mobile_money'
+
+
+@dataclass
+class Result:
+    transaction_reference: str
+    status: str  # POSTED, DUPLICATE or REJECTED
+    error: str = ''
+    balance: Optional[Decimal] = None  # still owed on the loan after the batch
+
+    def as_dict(self):
+        return {
+            'transaction_reference': self.transaction_reference,
+            'status': self.status,
+            'error': self.error,
+            'balance': float(self.balance) if self.balance is not None else None,
+        }
+
+
+def _moment(value):
+    if value is None:
+        return timezone.now()
+    if not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, time.min)
+    return value if timezone.is_aware(value) else timezone.make_aware(value)
+
+
+def allocate(amount, installments):
+    """
+    Spread ``amount`` over ``installments`` (oldest first) in place; returns
+    (installments touched, amount left over)
+    """
+    touched = []
+    for installment in installments:
+        if amount <= 0:
+            break
+        due = installment.amount - (installment.amount_paid or 0)
+        if due <= 0:
+            continue
+        paid = min(due, amount)
+        installment.amount_paid = (installment.amount_paid or 0) + paid
+        installment.status = 'paid' if installment.amount_paid >= installment.amount else 'partially_paid'
+        amount -= paid
+        touched.append(installment)
+    return touched, amount
+
+
+def post_repayments(payments):
+    """Post payments in batches of ``REPAYMENT_BATCH_SIZE``; returns a Result per payment, in order"""
+    payments = list(payments)
+    results = []
+    for start in range(0, len(payments), BATCH_SIZE):
+        batch = payments[start:start + BATCH_SIZE]
+        for attempt in range(POST_ATTEMPTS):
+            try:
+                results.extend(_post(batch))
+                break
+            except IntegrityError:
+                # A concurrent post of one of the payments committed first
+                if attempt == POST_ATTEMPTS - 1:
+                    raise
+                logger.info(f"Repayment batch of {len(batch)} collided with a concurrent post; retrying")
+    return results
+
+
+def _post(payments):
+    from ..models.finance import LoanApplication, LoanRepayment, RepaymentSchedule
+
+    results = {}
+    valid = []
+    seen = set()
+    for index, payment in enumerate(payments):
+        amount = Decimal(str(payment.amount))
+        if not payment.transaction_reference:
+            results[index] = Result('', REJECTED, "Missing transaction reference")
+        elif amount <= 0:
+            results[index] = Result(payment.transaction_reference, REJECTED, "Amount must be positive")
+        elif payment.transaction_reference in seen:
+            results[index] = Result(payment.transaction_reference, DUPLICATE)
+        else:
+            seen.add(payment.transaction_reference)
+            valid.append((index, payment, amount))
+
+    with transaction.atomic():
+        recorded = set(LoanRepayment.objects.filter(
+            transaction_reference__in=list(seen)).values_list('transaction_reference', flat=True))
+        loans = {
+            loan.reference_id: loan for loan in
+            LoanApplication.objects.select_for_update().filter(
+                reference_id__in={payment.loan_reference for _, payment, _ in valid}, status__in=REPAYABLE,
+            ).order_by('pk').only('reference_id', 'amount', 'amount_paid', 'status', 'disbursement_date')
+        }
+        installments = defaultdict(list)
+        for installment in RepaymentSchedule.objects.filter(
+            loan__in=list(loans.values()), status__in=OPEN,
+        ).order_by('due_date', 'installment_number').only('loan', 'amount', 'amount_paid', 'status'):
+            installments[installment.loan_id].append(installment)
+
+        repayments, touched, touched_loans = [], {}, {}
+        for index, payment, amount in sorted(valid, key=lambda item: _moment(item[1].payment_date)):
+            loan = loans.get(payment.loan_reference)
+            if payment.transaction_reference in recorded:
+                results[index] = Result(payment.transaction_reference, DUPLICATE)
+                continue
+            if loan is None:
+                results[index] = Result(payment.transaction_reference, REJECTED, "No repayable loan with this reference")
+                continue
+            allocated, _ = allocate(amount, installments[loan.pk])
+            for installment in allocated:
+                touched[installment.pk] = installment
+            loan.amount_paid += amount
+            touched_loans[loan.pk] = loan
+            repayments.append(LoanRepayment(
+                loan=loan, amount=amount, transaction_reference=payment.transaction_reference,
+                payment_date=_moment(payment.payment_date), payment_method=payment.payment_method,
+            ))
+            results[index] = Result(payment.transaction_reference, POSTED)
+
+        balances = {}
+        for loan in touched_loans.values():
+            open_installments = [item for item in installments[loan.pk] if item.status != 'paid']
+            if installments[loan.pk]:
+                balance = sum((item.amount - (item.amount_paid or 0) for item in open_installments), Decimal(0))
+                repaid = not open_installments
+            else:
+                balance = max(loan.amount - loan.amount_paid, Decimal(0))
+                repaid = balance <= 0
+            loan.status = 'repaid' if repaid else 'partially_paid'
+            balances[loan.pk] = balance
+
+        LoanRepayment.objects.bulk_create(repayments, batch_size=1000)
+        RepaymentSchedule.objects.bulk_update(list(touched.values()), ['amount_paid', 'status'], batch_size=1000)
+        LoanApplication.objects.bulk_update(list(touched_loans.values()), ['amount_paid', 'status'], batch_size=1000)
+
+    for index, payment, _ in valid:
+        loan = loans.get(payment.loan_reference)
+        if loan is not None and loan.pk in balances:
+            results[index].balance = balances[loan.pk]
+    logger.info(
+        f"Posted {len(repayments)} of {len(payments)} repayments to {len(touched_loans)} loans, "
+        f"{len(touched)} installments"
+    )
+    return [results[index] for index in range(len(payments))]
@@ -0,0 +1,462 @@
+"""
+Full-text and faceted product search.
+
+Products are mirrored into a vendor specific search index that is kept up to
+date incrementally from Product/ProductCategory signals:
+
+- SQLite: an FTS5 table ranked with bm25(), with an fts5vocab table over it
+  that supplies the term dictionary used for typo tolerance.
+- PostgreSQL: one weighted tsvector per product behind a GIN index, ranked
+  with ts_rank_cd(), plus a pg_trgm indexed term dictionary.
+
+The tables are created by migration 0002_product_search_index and can be
+rebuilt with ``manage.py rebuild_search_index``.
+"""
+import logging
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.expressions import RawSQL
+
+from agro_linker.models.market import Product
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "agro_linker_product_search"
+VOCAB_TABLE = "agro_linker_product_search_vocab"
+TERMS_TABLE = "agro_linker_product_search_terms"
+
+# Ranked matches fetched per round while filling a page of filtered results
+MAX_CANDIDATES = getattr(settings, "PRODUCT_SEARCH_MAX_CANDIDATES", 1000)
+PRICE_BUCKETS = getattr(settings, "PRODUCT_SEARCH_PRICE_BUCKETS", [0, 100, 500, 1000, 5000, 10000])
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+TERM_UPPER_BOUND = "\uffff"
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or "")]
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions), giving up early once it exceeds ``limit``
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def allowed_edits(term):
+    if len(term) <= 3:
+        return 0
+    return 1 if len(term) <= 6 else 2
+
+
+def product_document(product):
+    """Searchable text of a product, one entry per indexed column"""
+    return {
+        'name': product.name,
+        'variety': product.variety,
+        'category': product.category.name if product.category_id else '',
+        'quality_grade': product.quality_grade,
+        'description': product.description,
+    }
+
+
+class SearchBackend:
+    """Vendor specific storage and ranking of the product search index"""
+
+    def index(self, products):
+        raise NotImplementedError
+
+    def remove(self, product_ids):
+        raise NotImplementedError
+
+    def match(self, groups, limit, offset=0):
+        """Ranked (product_id, rank) pairs matching every group of alternative terms"""
+        raise NotImplementedError
+
+    def match_sql(self, groups):
+        """(sql, params) of a query selecting the ids of every product matching ``groups``, unranked"""
+        raise NotImplementedError
+
+    def known_terms(self, terms):
+        raise NotImplementedError
+
+    def similar_terms(self, term, limit=3):
+        raise NotImplementedError
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+
+class SQLiteSearchBackend(SearchBackend):
+    # bm25 column weights: product_id, name, variety, category, quality_grade, description
+    WEIGHTS = (0, 10.0, 4.0, 4.0, 2.0, 1.0)
+
+    def index(self, products):
+        rows = []
+        for product in products:
+            document = product_document(product)
+            rows.append((product.pk.hex, document['name'], document['variety'], document['category'],
+                         document['quality_grade'], document['description']))
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE product_id = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (product_id, name, variety, category, quality_grade, description) "
+                f"VALUES (%s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE product_id = %s",
+                               [(uuid.UUID(str(pk)).hex,) for pk in product_ids])
+
+    def expression(self, groups):
+        return " AND ".join(
+            "(" + " OR ".join(f'"{term}"*' for term in group) + ")" for group in groups
+        )
+
+    def match(self, groups, limit, offset=0):
+        weights = ", ".join(str(weight) for weight in self.WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT product_id, bm25({SEARCH_TABLE}, {weights}) AS rank FROM {SEARCH_TABLE} "
+                f"WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s OFFSET %s",
+                [self.expression(groups), limit, offset],
+            )
+            # bm25() is lower-is-better; flip it so callers can sort descending
+            return [(uuid.UUID(product_id), -rank) for product_id, rank in cursor.fetchall()]
+
+    def match_sql(self, groups):
+        # product_id holds the same 32 hex digits Django stores UUIDs as on SQLite
+        return f"SELECT product_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [self.expression(groups)]
+
+    def known_terms(self, terms):
+        # Terms are stored porter-stemmed, so ask the index itself instead of the vocabulary
+        known = set()
+        with connection.cursor() as cursor:
+            for term in terms:
+                cursor.execute(f"SELECT 1 FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s LIMIT 1", [f'"{term}"*'])
+                if cursor.fetchone():
+                    known.add(term)
+        return known
+
+    def similar_terms(self, term, limit=3):
+        max_edits = allowed_edits(term)
+        if not max_edits:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT term, doc FROM {VOCAB_TABLE} WHERE term >= %s AND term < %s "
+                f"AND length(term) BETWEEN %s AND %s",
+                [term[0], term[0] + TERM_UPPER_BOUND, len(term) - max_edits - 1, len(term) + max_edits],
+            )
+            scored = []
+            for candidate, doc_count in cursor.fetchall():
+                # Vocabulary terms are stemmed ("maize" -> "maiz"), so also compare
+                # against the term truncated to the candidate's length
+                full = edit_distance(term, candidate, max_edits)
+                distance = min(full, edit_distance(term[:len(candidate)], candidate, max_edits))
+                if distance <= max_edits:
+                    scored.append((distance, full, -doc_count, candidate))
+        return [candidate for *_, candidate in sorted(scored)[:limit]]
+
+
+class PostgresSearchBackend(SearchBackend):
+    CONFIG = "english"
+
+    def index(self, products):
+        rows, words = [], set()
+        for product in products:
+            document = product_document(product)
+            rows.append((str(product.pk), document['name'], document['variety'], document['category'],
+                         document['quality_grade'], document['description']))
+            for text in document.values():
+                words.update(token for token in tokenize(text) if len(token) > 2)
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (product_id, document) VALUES (%s, "
+                f"setweight(to_tsvector('{self.CONFIG}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.CONFIG}', %s || ' ' || %s), 'B') || "
+                f"setweight(to_tsvector('{self.CONFIG}', %s), 'C') || "
+                f"setweight(to_tsvector('{self.CONFIG}', %s), 'D')) "
+                f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+            if words:
+                cursor.executemany(
+                    f"INSERT INTO {TERMS_TABLE} (word) VALUES (%s) ON CONFLICT DO NOTHING",
+                    [(word,) for word in words],
+                )
+
+    def remove(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE product_id = ANY(%s::uuid[])",
+                           [[str(pk) for pk in product_ids]])
+
+    def expression(self, groups):
+        return " & ".join(
+            "(" + " | ".join(f"{term}:*" for term in group) + ")" for group in groups
+        )
+
+    def match(self, groups, limit, offset=0):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT product_id, ts_rank_cd(document, query) AS rank "
+                f"FROM {SEARCH_TABLE}, to_tsquery('{self.CONFIG}', %s) query "
+                f"WHERE document @@ query ORDER BY rank DESC, product_id LIMIT %s OFFSET %s",
+                [self.expression(groups), limit, offset],
+            )
+            return [(product_id, rank) for product_id, rank in cursor.fetchall()]
+
+    def match_sql(self, groups):
+        return (
+            f"SELECT product_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('{self.CONFIG}', %s)",
+            [self.expression(groups)],
+        )
+
+    def known_terms(self, terms):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT word FROM {TERMS_TABLE} WHERE word = ANY(%s)", [list(terms)])
+            known = {word for (word,) in cursor.fetchall()}
+        # Prefixes of indexed words are fine too (search-as-you-type)
+        for term in set(terms) - known:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT 1 FROM {TERMS_TABLE} WHERE word LIKE %s LIMIT 1", [term + "%"])
+                if cursor.fetchone():
+                    known.add(term)
+        return known
+
+    def similar_terms(self, term, limit=3):
+        if not allowed_edits(term):
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT word FROM {TERMS_TABLE} WHERE word %% %s "
+                f"ORDER BY similarity(word, %s) DESC LIMIT %s",
+                [term, term, limit],
+            )
+            return [word for (word,) in cursor.fetchall()]
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {SEARCH_TABLE}, {TERMS_TABLE}")
+
+
+def search_backend():
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    if connection.vendor == "sqlite":
+        return SQLiteSearchBackend()
+    raise NotImplementedError(f"Product search is not supported on {connection.vendor}")
+
+
+# ====================== INDEX MAINTENANCE ======================
+
+def index_products(products):
+    """(Re)index the given products"""
+    search_backend().index(products)
+
+
+def index_product_ids(product_ids):
+    products = Product.objects.filter(pk__in=list(product_ids)).select_related('category')
+    index_products(products)
+
+
+def remove_products(product_ids):
+    search_backend().remove(list(product_ids))
+
+
+def rebuild_index(batch_size=1000):
+    """Repopulate the whole index from the product table"""
+    backend = search_backend()
+    total = 0
+    with transaction.atomic():
+        backend.clear()
+        batch = []
+        for product in Product.objects.select_related('category').order_by().iterator(chunk_size=batch_size):
+            batch.append(product)
+            if len(batch) >= batch_size:
+                backend.index(batch)
+                total += len(batch)
+                batch = []
+        backend.index(batch)
+        total += len(batch)
+    logger.info(f"Rebuilt product search index with {total} products")
+    return total
+
+
+# ====================== QUERYING ======================
+
+@dataclass
+class ProductSearchResult:
+    total: int
+    items: List[Product]
+    facets: Dict[str, list]
+    query: Optional[str] = None
+    corrected_query: Optional[str] = None
+    suggestions: Dict[str, List[str]] = field(default_factory=dict)
+
+
+def expand_terms(backend, terms):
+    """
+    Typo tolerance: every term unknown to the index is replaced by the closest
+    indexed terms. Returns the OR-groups to match and the corrections applied.
+    """
+    known = backend.known_terms(terms)
+    groups, suggestions = [], {}
+    for term in terms:
+        if term in known:
+            groups.append([term])
+            continue
+        similar = backend.similar_terms(term)
+        if similar:
+            suggestions[term] = similar
+            groups.append(similar)
+        else:
+            groups.append([term])
+    return groups, suggestions
+
+
+def apply_filters(queryset, category=None, quality_grade=None, organic_certified=None,
+                  unit=None, min_price=None, max_price=None, farmer_id=None):
+    if category:
+        queryset = queryset.filter(category__name__iexact=category)
+    if quality_grade:
+        queryset = queryset.filter(quality_grade=quality_grade)
+    if organic_certified is not None:
+        queryset = queryset.filter(organic_certified=organic_certified)
+    if unit:
+        queryset = queryset.filter(unit=unit)
+    if min_price is not None:
+        queryset = queryset.filter(price__gte=min_price)
+    if max_price is not None:
+        queryset = queryset.filter(price__lt=max_price)
+    if farmer_id:
+        queryset = queryset.filter(farmer_id=farmer_id)
+    return queryset
+
+
+def facet_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def price_bucket_label(low, high):
+    return f"{low}-{high}" if high is not None else f"{low}+"
+
+
+def compute_facets(queryset):
+    """
+    Facet counts over ``queryset`` using one GROUP BY for the categorical
+    facets and one conditional aggregate for the price buckets.
+    """
+    categorical = {'category': {}, 'quality_grade': {}, 'organic_certified': {}, 'unit': {}}
+    rows = queryset.order_by().values(
+        'category__name', 'quality_grade', 'organic_certified', 'unit'
+    ).annotate(count=Count('id'))
+    for row in rows:
+        for facet, key in (('category', 'category__name'), ('quality_grade', 'quality_grade'),
+                           ('organic_certified', 'organic_certified'), ('unit', 'unit')):
+            value = row[key]
+            categorical[facet][value] = categorical[facet].get(value, 0) + row['count']
+
+    bounds = list(zip(PRICE_BUCKETS, PRICE_BUCKETS[1:] + [None]))
+    aggregates = {}
+    for index, (low, high) in enumerate(bounds):
+        condition = Q(price__gte=low) if high is None else Q(price__gte=low, price__lt=high)
+        aggregates[f"bucket_{index}"] = Count('id', filter=condition)
+    bucket_counts = queryset.order_by().aggregate(**aggregates)
+
+    facets = {
+        facet: sorted(
+            ({'value': facet_value(value), 'count': count}
+             for value, count in values.items() if value not in (None, '')),
+            key=lambda item: -item['count'],
+        )
+        for facet, values in categorical.items()
+    }
+    facets['price'] = [
+        {'value': price_bucket_label(low, high), 'count': bucket_counts[f"bucket_{index}"]}
+        for index, (low, high) in enumerate(bounds)
+    ]
+    return facets
+
+
+def search_products(q=None, limit=20, offset=0, **filters):
+    """
+    Ranked, faceted search over active products.
+
+    Without ``q`` the filtered products are returned newest first. With
+    ``q``, total and facets are computed over every filtered product the
+    index matches (the match is a subquery of the filtered queryset); the
+    page is filled by walking the ranked matches PRODUCT_SEARCH_MAX_CANDIDATES
+    at a time, keeping those that pass the filters, until it is full.
+    """
+    queryset = apply_filters(Product.objects.filter(status=Product.Status.ACTIVE), **filters)
+    terms = tokenize(q)
+
+    if not terms:
+        total = queryset.count()
+        items = list(queryset.select_related('category').order_by('-created_at')[offset:offset + limit])
+        return ProductSearchResult(total=total, items=items, facets=compute_facets(queryset), query=q)
+
+    backend = search_backend()
+    groups, suggestions = expand_terms(backend, terms)
+    sql, params = backend.match_sql(groups)
+    matched = queryset.filter(pk__in=RawSQL(sql, params))
+    total = matched.count()
+
+    ordered_ids, start = [], 0
+    while len(ordered_ids) < min(offset + limit, total):
+        ranked = backend.match(groups, MAX_CANDIDATES, start)
+        if not ranked:
+            break
+        start += len(ranked)
+        allowed = set(matched.filter(pk__in=[product_id for product_id, _ in ranked]).values_list('pk', flat=True))
+        ordered_ids.extend(product_id for product_id, _ in ranked if product_id in allowed)
+    page_ids = ordered_ids[offset:offset + limit]
+    products = Product.objects.select_related('category').in_bulk(page_ids)
+
+    corrected = None
+    if suggestions:
+        corrected = " ".join(suggestions.get(term, [term])[0] for term in terms)
+
+    return ProductSearchResult(
+        total=total,
+        items=[products[product_id] for product_id in page_ids if product_id in products],
+        facets=compute_facets(matched),
+        query=q,
+        corrected_query=corrected,
+        suggestions=suggestions,
+    )
@@ -0,0 +1,150 @@
+"""
+Thrift pot accounting.
+
+Every (group, cycle) has a ``ThriftPot`` with the running total and count
+of its verified contributions and the total paid out of it; every
+membership keeps its own ``total_contributions`` and ``total_payouts``.
+They are updated as money moves, never recomputed from the contributions:
+
+- ``credit`` adds newly verified contributions, called in the transaction
+  that verifies them (``ThriftContribution.save`` for one,
+  ``verify_contributions`` for many). The pots and memberships touched
+  are incremented in place (``SET total = total + delta``) with one
+  ``bulk_update`` each, however many contributions are credited.
+- ``rotate_payout`` pays what is left in the current cycle's pot to the
+  next active member in rotation order, with the pot row locked so two
+  rotations cannot pay the same money twice.
+
+Payout rotation, cycle totals (``ThriftCycle.calculate_totals``) and
+member balances are then single row reads, however many years of
+contributions a group has.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class ThriftPotError(Exception):
+    pass
+
+
+# ====================== CONTRIBUTIONS ======================
+
+def credit(entries):
+    """
+    Add verified contributions, given as (membership id, group id, cycle,
+    amount, date paid) tuples, to their pots and members. Call inside the
+    transaction that verifies them.
+    """
+    from ..models.thrift import ThriftMembership, ThriftPot
+
+    pots = defaultdict(lambda: [Decimal(0), 0])
+    members = defaultdict(lambda: [Decimal(0), None])
+    for membership_id, group_id, cycle, amount, date_paid in entries:
+        pots[(group_id, cycle)][0] += amount
+        pots[(group_id, cycle)][1] += 1
+        members[membership_id][0] += amount
+        if date_paid and (members[membership_id][1] is None or date_paid > members[membership_id][1]):
+            members[membership_id][1] = date_paid
+    if not pots:
+        return
+
+    now = timezone.now()
+    ThriftPot.objects.bulk_create(
+        [ThriftPot(group_id=group_id, cycle=cycle) for group_id, cycle in pots], ignore_conflicts=True)
+    pot_ids = {
+        (group_id, cycle): pk for pk, group_id, cycle in
+        ThriftPot.objects.filter(
+            group_id__in={group_id for group_id, _ in pots}, cycle__in={cycle for _, cycle in pots},
+        ).values_list('pk', 'group_id', 'cycle')
+    }
+    ThriftPot.objects.bulk_update(
+        sorted((
+            ThriftPot(
+                pk=pot_ids[key],
+                total_contributions=F('total_contributions') + amount,
+                contribution_count=F('contribution_count') + count,
+                updated_at=now,
+            )
+            for key, (amount, count) in pots.items()
+        ), key=lambda pot: pot.pk),
+        ['total_contributions', 'contribution_count', 'updated_at'], batch_size=1000,
+    )
+    ThriftMembership.objects.bulk_update(
+        [
+            ThriftMembership(
+                pk=membership_id,
+                total_contributions=F('total_contributions') + amount,
+                last_contribution_date=(
+                    Greatest(Coalesce('last_contribution_date', latest), latest) if latest
+                    else F('last_contribution_date')
+                ),
+            )
+            for membership_id, (amount, latest) in sorted(members.items())
+        ],
+        ['total_contributions', 'last_contribution_date'], batch_size=1000,
+    )
+
+
+def verify_contributions(contribution_ids, verified_by=None):
+    """Mark contributions verified and credit them; returns how many were not verified before"""
+    from ..models.thrift import ThriftContribution
+
+    with transaction.atomic():
+        rows = list(
+            ThriftContribution.objects.select_for_update(of=('self',))
+            .filter(pk__in=list(contribution_ids), is_verified=False)
+            .values_list('pk', 'membership_id', 'membership__group_id', 'cycle', 'amount', 'date_paid')
+        )
+        ThriftContribution.objects.filter(pk__in=[row[0] for row in rows]).update(
+            is_verified=True, verified_at=timezone.now(), verified_by=verified_by)
+        credit(row[1:] for row in rows)
+    logger.info(f"Verified {len(rows)} thrift contributions")
+    return len(rows)
+
+
+# ====================== PAYOUTS ======================
+
+def rotate_payout(group, cycle=None):
+    """
+    Pay the undistributed pot of ``cycle`` (the group's current cycle by
+    default) to the active member after the last beneficiary in rotation
+    order; returns the ThriftPayout
+    """
+    from ..models.thrift import ThriftMembership, ThriftPayout, ThriftPot
+
+    cycle = cycle or group.current_cycle
+    with transaction.atomic():
+        pot, _ = ThriftPot.objects.select_for_update().get_or_create(group=group, cycle=cycle)
+        available = pot.balance
+        if available <= 0:
+            raise ThriftPotError(f"Nothing to pay out for cycle {cycle} of {group.name}")
+
+        last_order = (
+            ThriftPayout.objects.filter(group=group).order_by('-created_at', '-pk')
+            .values_list('payout_order', flat=True).first()
+        ) or 0
+        members = ThriftMembership.objects.filter(group=group, is_active=True).order_by('rotation_order')
+        beneficiary = members.filter(rotation_order__gt=last_order).first() or members.first()
+        if beneficiary is None:
+            raise ThriftPotError(f"{group.name} has no active members")
+
+        payout = ThriftPayout.objects.create(
+            group=group,
+            beneficiary_id=beneficiary.user_id,
+            cycle=cycle,
+            amount=available,
+            payout_order=beneficiary.rotation_order,
+        )
+        ThriftPot.objects.filter(pk=pot.pk).update(total_payouts=F('total_payouts') + available,
+                                                  updated_at=timezone.now())
+        ThriftMembership.objects.filter(pk=beneficiary.pk).update(total_payouts=F('total_payouts') + available)
+    logger.info(f"Paid {available} of cycle {cycle} of thrift group {group.pk} to member {beneficiary.pk}")
+    return payout
@@ -0,0 +1,250 @@
+"""
+Thrift cycle scheduling.
+
+``manage.py run_thrift_scheduler`` (daily) advances every active group at
+once; the work is a fixed number of queries per pass, whatever the number
+of groups:
+
+1. Groups without a ``ThriftCycle`` for their ``current_cycle`` get one.
+   It starts the day after the previous cycle ended (the group's creation
+   date plus the earlier cycles' length when there is none) and lasts
+   ``cycle_duration`` weeks.
+2. Cycles that ended before today are closed. Active members who joined
+   before the end and recorded no contribution for the cycle (an
+   ``Exists`` anti-join) get a MISSED_CONTRIBUTION ``ThriftPenalty`` of
+   ``THRIFT_MISSED_CONTRIBUTION_PENALTY`` times the contribution, inserted
+   with one ``bulk_create``; the partial unique constraint keeps a rerun
+   from penalising twice. The cycle's totals are copied from its pot, its
+   pot is paid out in rotation when ``THRIFT_AUTO_PAYOUT`` is on, and the
+   group's ``current_cycle`` moves on.
+
+Passes repeat until no cycle is left to close, so a scheduler that missed
+days catches up (at most ``max_passes`` cycles per run).
+
+3. Regular meetings are created for the next ``THRIFT_MEETING_HORIZON_DAYS``
+   from ``meeting_schedule``. Schedules read like "Every Saturday", "Every
+   other Tuesday", "Every 2 weeks on Friday", "Every 2nd Saturday" or
+   "Every last Sunday"; each distinct text is parsed once. Groups whose
+   schedule cannot be read are counted and skipped.
+"""
+import calendar
+import logging
+import re
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PENALTY_RATE = Decimal(str(getattr(settings, "THRIFT_MISSED_CONTRIBUTION_PENALTY", 0.1)))
+AUTO_PAYOUT = getattr(settings, "THRIFT_AUTO_PAYOUT", False)
+MEETING_HORIZON = timedelta(days=getattr(settings, "THRIFT_MEETING_HORIZON_DAYS", 30))
+MEETING_TIME = time.fromisoformat(getattr(settings, "THRIFT_MEETING_TIME", "10:00"))
+
+WEEKDAYS = [name.lower() for name in calendar.day_name]
+ORDINALS = {'1st': 1, 'first': 1, '2nd': 2, 'second': 2, '3rd': 3, 'third': 3, '4th': 4, 'fourth': 4,
+            'last': -1}
+_WEEKDAY = r"(?P<weekday>" + "|".join(WEEKDAYS) + r")s?"
+WEEKLY = re.compile(r"every\s+(?:(?P<other>other)\s+|(?P<weeks>\d+)\s+weeks?\s+on\s+)?" + _WEEKDAY)
+MONTHLY = re.compile(r"every\s+(?P<ordinal>" + "|".join(ORDINALS) + r")\s+" + _WEEKDAY)
+
+
+# ====================== MEETING SCHEDULES ======================
+
+def parse_schedule(text):
+    """
+    ('weekly', weekday, every n weeks) or ('monthly', weekday, nth of the
+    month, -1 for the last) of a meeting schedule, None when unreadable
+    """
+    text = ' '.join(str(text or '').lower().split())
+    match = MONTHLY.search(text)
+    if match:
+        return 'monthly', WEEKDAYS.index(match['weekday']), ORDINALS[match['ordinal']]
+    match = WEEKLY.search(text)
+    if match:
+        weeks = 2 if match['other'] else int(match['weeks'] or 1)
+        return 'weekly', WEEKDAYS.index(match['weekday']), max(weeks, 1)
+    return None
+
+
+def meeting_dates(schedule, start, end, anchor):
+    """Dates from ``start`` to ``end`` (inclusive) a parsed schedule falls on; ``anchor`` fixes fortnights"""
+    kind, weekday, step = schedule
+    dates = []
+    if kind == 'weekly':
+        first = anchor + timedelta(days=(weekday - anchor.weekday()) % 7)
+        if first < start:
+            periods = -(-(start - first).days // (7 * step))
+            first += timedelta(weeks=periods * step)
+        day = first
+        while day <= end:
+            dates.append(day)
+            day += timedelta(weeks=step)
+        return dates
+    year, month = start.year, start.month
+    while date(year, month, 1) <= end:
+        days = [week[weekday] for week in calendar.monthcalendar(year, month) if week[weekday]]
+        if step <= len(days):
+            day = date(year, month, days[step - 1 if step > 0 else -1])
+            if start <= day <= end:
+                dates.append(day)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return dates
+
+
+def schedule_meetings(today=None):
+    """Create the regular meetings of active groups up to the horizon; returns (created, groups skipped)"""
+    from ..models.thrift import ThriftGroup, ThriftMeeting
+
+    today = today or timezone.localdate()
+    end = today + MEETING_HORIZON
+    groups = list(ThriftGroup.objects.filter(is_active=True).values_list(
+        'pk', 'meeting_schedule', 'created_at', 'meeting_location'))
+    existing = set(
+        ThriftMeeting.objects.filter(group__is_active=True, meeting_date__range=(today, end))
+        .values_list('group_id', 'meeting_date')
+    )
+    parsed, meetings, skipped = {}, [], 0
+    for group_id, text, created_at, location in groups:
+        if text not in parsed:
+            parsed[text] = parse_schedule(text)
+        if parsed[text] is None:
+            skipped += 1
+            continue
+        for day in meeting_dates(parsed[text], today, end, timezone.localtime(created_at).date()):
+            if (group_id, day) not in existing:
+                meetings.append(ThriftMeeting(
+                    group_id=group_id, meeting_date=day, start_time=MEETING_TIME,
+                    location=location or {}, is_regular=True,
+                ))
+    ThriftMeeting.objects.bulk_create(meetings, batch_size=1000)
+    if skipped:
+        logger.warning(f"{skipped} thrift groups have a meeting schedule that cannot be read")
+    return len(meetings), skipped
+
+
+# ====================== CYCLES ======================
+
+def open_cycles():
+    """Create the ThriftCycle of every active group's current cycle that has none; returns how many"""
+    from ..models.thrift import ThriftCycle, ThriftGroup
+
+    previous = ThriftCycle.objects.filter(
+        group=OuterRef('pk'), cycle_number__lt=OuterRef('current_cycle'),
+    ).order_by('-cycle_number')
+    groups = (
+        ThriftGroup.objects.filter(is_active=True)
+        .exclude(Exists(ThriftCycle.objects.filter(group=OuterRef('pk'), cycle_number=OuterRef('current_cycle'))))
+        .annotate(previous_end=Subquery(previous.values('end_date')[:1]))
+        .values_list('pk', 'current_cycle', 'cycle_duration', 'created_at', 'previous_end')
+    )
+    cycles = []
+    for group_id, cycle, duration, created_at, previous_end in groups:
+        length = timedelta(weeks=max(duration, 1))
+        if previous_end:
+            start = previous_end + timedelta(days=1)
+        else:
+            start = timezone.localtime(created_at).date() + length * (cycle - 1)
+        cycles.append(ThriftCycle(
+            group_id=group_id, cycle_number=cycle, start_date=start, end_date=start + length - timedelta(days=1),
+        ))
+    ThriftCycle.objects.bulk_create(cycles, batch_size=1000, ignore_conflicts=True)
+    return len(cycles)
+
+
+def close_cycles(today=None):
+    """
+    Close the current cycles of active groups that ended before ``today``:
+    penalise missed contributions, settle totals (and payouts) and move the
+    groups on. Returns (cycles closed, penalties, payouts).
+    """
+    from ..models.thrift import ThriftContribution, ThriftCycle, ThriftGroup, ThriftMembership, ThriftPenalty, ThriftPot
+
+    today = today or timezone.localdate()
+    with transaction.atomic():
+        cycles = list(
+            ThriftCycle.objects.select_for_update(of=('self',))
+            .filter(is_completed=False, end_date__lt=today, group__is_active=True,
+                    cycle_number=F('group__current_cycle'))
+            .select_related('group')
+        )
+        if not cycles:
+            return 0, 0, 0
+        ends = {cycle.group_id: cycle.end_date for cycle in cycles}
+
+        Kind = ThriftPenalty.Kind
+        missed = (
+            ThriftMembership.objects.filter(group__in=list(ends), is_active=True)
+            .exclude(Exists(ThriftContribution.objects.filter(
+                membership=OuterRef('pk'), cycle=OuterRef('group__current_cycle'))))
+            .exclude(Exists(ThriftPenalty.objects.filter(
+                membership=OuterRef('pk'), cycle=OuterRef('group__current_cycle'), kind=Kind.MISSED_CONTRIBUTION)))
+            .values_list('pk', 'group_id', 'join_date', 'group__current_cycle', 'group__contribution_amount')
+        )
+        penalties = [
+            ThriftPenalty(
+                membership_id=membership_id, kind=Kind.MISSED_CONTRIBUTION, cycle=cycle,
+                amount=(contribution * PENALTY_RATE).quantize(Decimal('0.01')),
+                reason=f"No contribution for cycle {cycle}",
+            )
+            for membership_id, group_id, joined, cycle, contribution in missed
+            if timezone.localtime(joined).date() <= ends[group_id]
+        ]
+        ThriftPenalty.objects.bulk_create(penalties, batch_size=1000, ignore_conflicts=True)
+
+        payouts = _pay_out(cycles) if AUTO_PAYOUT else 0
+        pots = {
+            (group_id, cycle): (contributions, paid) for group_id, cycle, contributions, paid in
+            ThriftPot.objects.filter(group__in=list(ends), cycle__in={cycle.cycle_number for cycle in cycles})
+            .values_list('group_id', 'cycle', 'total_contributions', 'total_payouts')
+        }
+        for cycle in cycles:
+            cycle.total_contributions, cycle.total_payouts = pots.get((cycle.group_id, cycle.cycle_number), (0, 0))
+            cycle.is_completed = True
+        ThriftCycle.objects.bulk_update(cycles, ['total_contributions', 'total_payouts', 'is_completed'],
+                                        batch_size=1000)
+        ThriftGroup.objects.filter(pk__in=list(ends)).update(current_cycle=F('current_cycle') + 1)
+    logger.info(f"Closed {len(cycles)} thrift cycles: {len(penalties)} penalties, {payouts} payouts")
+    return len(cycles), len(penalties), payouts
+
+
+def _pay_out(cycles):
+    """Pay the pots of closing cycles in rotation; one payout per group with money left"""
+    from ..models.thrift import ThriftPot
+    from . import thrift_pot
+
+    funded = set(
+        ThriftPot.objects.filter(
+            group__in=[cycle.group_id for cycle in cycles], total_contributions__gt=F('total_payouts'),
+        ).values_list('group_id', 'cycle')
+    )
+    paid = 0
+    for cycle in cycles:
+        if (cycle.group_id, cycle.cycle_number) not in funded:
+            continue
+        try:
+            thrift_pot.rotate_payout(cycle.group, cycle.cycle_number)
+            paid += 1
+        except thrift_pot.ThriftPotError as e:
+            logger.warning(f"No payout for cycle {cycle.cycle_number} of thrift group {cycle.group_id}: {str(e)}")
+    return paid
+
+
+def run(today=None, max_passes=12):
+    """Open, close and schedule everything due; returns a dict of counts"""
+    today = today or timezone.localdate()
+    counts = dict.fromkeys(['cycles_opened', 'cycles_closed', 'penalties', 'payouts'], 0)
+    for _ in range(max_passes):
+        counts['cycles_opened'] += open_cycles()
+        closed, penalties, payouts = close_cycles(today)
+        if not closed:
+            break
+        counts['cycles_closed'] += closed
+        counts['penalties'] += penalties
+        counts['payouts'] += payouts
+    counts['meetings'], counts['unreadable_schedules'] = schedule_meetings(today)
+    return counts
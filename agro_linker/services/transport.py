@@ -0,0 +1,299 @@
+"""
+Shared HTTP transport for the integration providers (email, SMS, mobile
+money, WhatsApp).
+
+Every provider gets one long-lived ``requests.Session`` (and, for async
+callers, one ``aiohttp.ClientSession`` per event loop) whose connection pool
+keeps TLS connections to the provider open between messages. On top of the
+pool each provider has:
+
+- a concurrency limit, so a burst of sends can't open hundreds of sockets
+  or trip the provider's own throttling;
+- retries with exponential backoff and full jitter. Failures to connect
+  (nothing was sent), 429 and 503 (the request was not processed) are
+  retried for every method; timeouts, connections dropped once open and
+  other 5xx only for idempotent methods, so a payment POST is never sent
+  twice;
+- a circuit breaker that fails fast for ``reset_timeout`` seconds after
+  ``failure_threshold`` consecutive failures instead of queueing requests
+  against a provider that is down.
+
+Defaults come from ``settings.INTEGRATION_TRANSPORT`` and can be overridden
+per provider in its config (``{NAMESPACE}_PROVIDERS[provider]``).
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'timeout': 30,
+    'pool_size': 20,
+    'max_concurrency': 20,
+    'max_retries': 3,
+    'backoff_base': 0.5,   # seconds
+    'backoff_cap': 10,     # seconds
+    'failure_threshold': 5,
+    'reset_timeout': 30,   # seconds
+}
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+# Statuses meaning the provider did not process the request
+UNPROCESSED_STATUSES = frozenset({429, 503})
+RETRYABLE_STATUSES = frozenset({500, 502, 504}) | UNPROCESSED_STATUSES
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without a request while a provider's circuit is open"""
+
+
+def transport_options(config=None):
+    options = dict(DEFAULTS)
+    options.update(getattr(settings, 'INTEGRATION_TRANSPORT', {}))
+    options.update({key: value for key, value in (config or {}).items() if key in DEFAULTS})
+    return options
+
+
+def backoff_delay(attempt, base, cap):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after(headers):
+    """Seconds asked for by a Retry-After header, if any"""
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def connect_failed(error):
+    """
+    Whether a requests error means no connection was made, so the provider
+    cannot have seen the request. A connection dropped after sending (e.g.
+    RemoteDisconnected) is not one: it may have been processed.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.Timeout):
+        return False
+    reason = error.args[0] if error.args else None
+    # requests wraps urllib3's MaxRetryError, whose reason is the actual failure
+    return isinstance(getattr(reason, 'reason', reason), NewConnectionError)
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open after a cool-down"""
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def check(self):
+        if self.state == 'open':
+            raise CircuitOpenError(f"Circuit open for {self.name}, failing fast")
+
+    def record_success(self):
+        with self._lock:
+            self.failures, self.opened_at = 0, None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                # A failed half-open probe re-opens for another cool-down
+                if self.opened_at is None:
+                    logger.warning(f"Opening circuit for {self.name} after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+
+class IntegrationTransport:
+    """Pooled, rate-limited and retrying HTTP client for one provider"""
+
+    def __init__(self, name, config=None):
+        self.name = name
+        self.options = transport_options(config)
+        self.breaker = CircuitBreaker(name, self.options['failure_threshold'], self.options['reset_timeout'])
+        self._semaphore = threading.BoundedSemaphore(self.options['max_concurrency'])
+        self._async_semaphores = {}
+        self._async_sessions = {}
+        self._session = None
+        self._lock = threading.Lock()
+
+    # ---------------------- sync ----------------------
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.options['pool_size'],
+                        max_retries=0,
+                        pool_block=True,
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def _should_retry(self, method, attempt, status=None, connect_error=False, timeout=False):
+        if attempt >= self.options['max_retries'] - 1:
+            return False
+        if connect_error or status in UNPROCESSED_STATUSES:
+            return True
+        return method.upper() in IDEMPOTENT_METHODS and (timeout or status in RETRYABLE_STATUSES)
+
+    def _delay(self, attempt, headers=None):
+        delay = backoff_delay(attempt, self.options['backoff_base'], self.options['backoff_cap'])
+        asked = retry_after(headers)
+        return max(delay, min(asked, self.options['backoff_cap'])) if asked is not None else delay
+
+    def request(self, method, url, **kwargs):
+        """Send a request and return the ``requests.Response`` (raised for HTTP errors)"""
+        kwargs.setdefault('timeout', self.options['timeout'])
+        attempt = 0
+        while True:
+            self.breaker.check()
+            try:
+                with self._semaphore:
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.breaker.record_failure()
+                connect_error = connect_failed(e)
+                if not self._should_retry(method, attempt, connect_error=connect_error,
+                                          timeout=not connect_error):
+                    logger.error(f"{self.name} request failed after {attempt + 1} attempts: {str(e)}")
+                    raise
+                time.sleep(self._delay(attempt))
+            else:
+                if response.status_code >= 500 or response.status_code == 429:
+                    self.breaker.record_failure()
+                    if self._should_retry(method, attempt, status=response.status_code):
+                        time.sleep(self._delay(attempt, response.headers))
+                        attempt += 1
+                        continue
+                else:
+                    self.breaker.record_success()
+                response.raise_for_status()
+                return response
+            attempt += 1
+
+    # ---------------------- async ----------------------
+
+    def _async_state(self):
+        """Session and semaphore of the running event loop"""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.options['pool_size'], keepalive_timeout=60)
+            session = self._async_sessions[loop] = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.options['timeout']),
+            )
+            self._async_semaphores[loop] = asyncio.Semaphore(self.options['max_concurrency'])
+        return session, self._async_semaphores[loop]
+
+    async def arequest(self, method, url, **kwargs):
+        """
+        Async variant of ``request``; returns (status, headers, decoded JSON
+        or text), raising ``aiohttp.ClientResponseError`` for HTTP errors.
+        ``auth`` may be a (user, password) tuple as with requests.
+        """
+        import aiohttp
+
+        if isinstance(kwargs.get('auth'), tuple):
+            kwargs['auth'] = aiohttp.BasicAuth(*kwargs['auth'])
+        # requests leaves out None headers and form values; aiohttp refuses them
+        for name in ('headers', 'data'):
+            if isinstance(kwargs.get(name), dict):
+                kwargs[name] = {key: value for key, value in kwargs[name].items() if value is not None}
+        session, semaphore = self._async_state()
+        attempt = 0
+        while True:
+            self.breaker.check()
+            try:
+                async with semaphore:
+                    async with session.request(method, url, **kwargs) as response:
+                        status, headers = response.status, response.headers
+                        if response.content_type == 'application/json':
+                            body = await response.json()
+                        else:
+                            body = await response.text()
+                        if status >= 500 or status == 429:
+                            self.breaker.record_failure()
+                            if self._should_retry(method, attempt, status=status):
+                                await asyncio.sleep(self._delay(attempt, headers))
+                                attempt += 1
+                                continue
+                        else:
+                            self.breaker.record_success()
+                        response.raise_for_status()
+                        return status, headers, body
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.breaker.record_failure()
+                # Only ClientConnectorError means nothing was sent; a server disconnect may follow the body
+                connect_error = isinstance(e, aiohttp.ClientConnectorError)
+                if not self._should_retry(method, attempt, connect_error=connect_error, timeout=not connect_error):
+                    logger.error(f"{self.name} request failed after {attempt + 1} attempts: {str(e)}")
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                attempt += 1
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.pop(loop, None)
+        self._async_semaphores.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(name, config=None):
+    """The process-wide transport of a provider, e.g. ``SMS:africastalking``"""
+    transport = _transports.get(name)
+    if transport is None:
+        with _transports_lock:
+            transport = _transports.get(name)
+            if transport is None:
+                transport = _transports[name] = IntegrationTransport(name, config)
+    return transport
@@ -0,0 +1,273 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_init, post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from .api.v1.optimizations import response_cache
+from .models.chat import ChatRoom
+from .models.finance import LoanApplication
+from .models.market import Bid, Offer, Order, Product, ProductCategory, PriceTrend
+from .models.models import WeatherData
+from .models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+# ====================== RESPONSE CACHE ======================
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductCategory)
+@receiver([post_save, post_delete], sender=PriceTrend)
+@receiver([post_save, post_delete], sender=WeatherData)
+def invalidate_response_cache(sender, **kwargs):
+    """Drop cached API responses built from the changed model"""
+    response_cache.invalidate_on_commit(sender)
+
+
+# ====================== PRODUCT SEARCH ======================
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    """Keep the full-text index in step with the product row"""
+    from .services.search import index_product_ids
+    transaction.on_commit(lambda: index_product_ids([instance.pk]))
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    from .services.search import remove_products
+    transaction.on_commit(lambda: remove_products([instance.pk]))
+
+
+@receiver(post_save, sender=ProductCategory)
+def reindex_category_products(sender, instance, created, **kwargs):
+    """Category names are part of every product document in the category"""
+    if created:
+        return
+    from .services.search import index_product_ids
+    product_ids = list(instance.product_set.values_list('pk', flat=True))
+    transaction.on_commit(lambda: index_product_ids(product_ids))
+
+
+# ====================== PRICE ROLLUPS ======================
+
+ROLLUP_FIELDS = ('crop_type', 'market', 'date')
+
+
+@receiver(post_init, sender=PriceTrend)
+def remember_price_period(sender, instance, **kwargs):
+    if set(ROLLUP_FIELDS) & instance.get_deferred_fields():
+        instance._rollup_key = None
+    else:
+        instance._rollup_key = tuple(getattr(instance, field) for field in ROLLUP_FIELDS)
+
+
+@receiver(pre_save, sender=PriceTrend)
+def load_price_period(sender, instance, **kwargs):
+    if instance._rollup_key is None and instance.pk:
+        instance._rollup_key = PriceTrend.objects.filter(pk=instance.pk).values_list(*ROLLUP_FIELDS).first()
+
+
+@receiver([post_save, post_delete], sender=PriceTrend)
+def refresh_price_rollups(sender, instance, **kwargs):
+    """
+    Re-aggregate the week, month and year the daily price falls in, and
+    those it fell in before its crop, market or date changed
+    """
+    from .services.price_rollups import refresh
+
+    key = tuple(getattr(instance, field) for field in ROLLUP_FIELDS)
+    keys = {key, instance._rollup_key} - {None}
+    instance._rollup_key = key
+
+    def apply():
+        for crop_type, market, day in keys:
+            try:
+                refresh(crop_type, market, day)
+            except Exception:
+                # rollup_prices rebuilds from the daily rows
+                logger.exception(f"Price rollups not refreshed for {crop_type} at {market}")
+
+    transaction.on_commit(apply)
+
+# ====================== ORDER BOOK ======================
+
+@receiver(post_save, sender=Bid)
+def book_bid(sender, instance, **kwargs):
+    from .services.orderbook import order_books
+    transaction.on_commit(lambda: order_books.bid_saved(instance))
+
+
+@receiver(post_delete, sender=Bid)
+def unbook_bid(sender, instance, **kwargs):
+    from .services.orderbook import order_books
+    transaction.on_commit(lambda: order_books.bid_deleted(instance))
+
+
+@receiver(post_save, sender=Offer)
+def book_offer(sender, instance, **kwargs):
+    """Keep the book current and fill the offer if it meets the reserve price"""
+    from .services.orderbook import match_offers, order_books
+
+    def apply():
+        order_books.offer_saved(instance)
+        if instance.status == Offer.Status.PENDING and getattr(settings, 'ORDER_BOOK_AUTO_MATCH', True):
+            try:
+                match_offers(instance.product_id)
+            except Exception:
+                # The offer is saved either way; the match_orders sweep retries
+                logger.exception(f"Matching failed for product {instance.product_id}")
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_delete, sender=Offer)
+def unbook_offer(sender, instance, **kwargs):
+    from .services.orderbook import order_books
+    transaction.on_commit(lambda: order_books.offer_deleted(instance))
+
+
+@receiver(post_save, sender=Product)
+def match_repriced_product(sender, instance, created, **kwargs):
+    """A lower reserve price or restocked quantity can cross pending offers"""
+    if created or not getattr(settings, 'ORDER_BOOK_AUTO_MATCH', True):
+        return
+    from .services.orderbook import is_crossed, match_offers
+
+    def apply():
+        try:
+            if is_crossed(instance):
+                match_offers(instance.pk)
+        except Exception:
+            logger.exception(f"Matching failed for product {instance.pk}")
+
+    transaction.on_commit(apply)
+
+
+# ====================== PRICE DISCOVERY ======================
+
+@receiver([post_save, post_delete], sender=Bid)
+@receiver([post_save, post_delete], sender=Offer)
+def reprice_traded_crop(sender, instance, **kwargs):
+    """Queue the crop for services/price_discovery.py; refresh_price_index recomputes it"""
+    from .services.price_discovery import mark_products_dirty
+    transaction.on_commit(lambda: mark_products_dirty([instance.product_id]))
+
+
+@receiver([post_save, post_delete], sender=PriceTrend)
+def reprice_reported_crop(sender, instance, **kwargs):
+    from .services.price_discovery import mark_dirty
+    transaction.on_commit(lambda: mark_dirty([instance.crop_type]))
+
+
+# ====================== ANALYTICS ======================
+
+def _bump_on_commit(moment, **deltas):
+    from .services.analytics import bump
+
+    def apply():
+        try:
+            bump(moment, **deltas)
+        except Exception:
+            # build_analytics recomputes the hour from the source tables
+            logger.exception(f"Analytics counters not updated for {moment}")
+
+    transaction.on_commit(apply)
+
+
+# The states below are remembered when a row is loaded. A deferred field
+# (.only()/.defer()) would cost a query per row to read there, so it stays
+# unknown (None) and is read from the database only if the row is saved.
+
+@receiver(post_init, sender=Order)
+def remember_order_paid(sender, instance, **kwargs):
+    if 'payment_status' in instance.get_deferred_fields():
+        instance._analytics_paid = None
+    else:
+        instance._analytics_paid = instance.payment_status == Order.PaymentStatus.PAID
+
+
+@receiver(pre_save, sender=Order)
+def load_order_paid(sender, instance, **kwargs):
+    if instance._analytics_paid is None:
+        status = Order.objects.filter(pk=instance.pk).values_list('payment_status', flat=True).first()
+        instance._analytics_paid = status == Order.PaymentStatus.PAID
+
+
+@receiver(post_init, sender=LoanApplication)
+def remember_loan_disbursed(sender, instance, **kwargs):
+    if 'disbursement_date' in instance.get_deferred_fields():
+        instance._analytics_disbursed = None
+    else:
+        instance._analytics_disbursed = instance.disbursement_date is not None
+
+
+@receiver(pre_save, sender=LoanApplication)
+def load_loan_disbursed(sender, instance, **kwargs):
+    if instance._analytics_disbursed is None:
+        instance._analytics_disbursed = LoanApplication.objects.filter(
+            pk=instance.pk, disbursement_date__isnull=False).exists()
+
+
+@receiver(post_save, sender=User)
+def count_registration(sender, instance, created, **kwargs):
+    if created:
+        _bump_on_commit(instance.created_at, new_registrations=1)
+
+
+@receiver(post_save, sender=Order)
+def count_paid_order(sender, instance, **kwargs):
+    """Count an order when it becomes paid (and uncount a refund) in the hour it was created"""
+    paid = instance.payment_status == Order.PaymentStatus.PAID
+    if paid == instance._analytics_paid:
+        return
+    instance._analytics_paid = paid
+    sign = 1 if paid else -1
+
+    def apply():
+        from .services.analytics import bump, order_figures
+        try:
+            value, units = order_figures(instance)
+            bump(instance.created_at, transactions_completed=sign,
+                 total_transaction_value=sign * value, transaction_units=sign * units)
+        except Exception:
+            logger.exception(f"Analytics counters not updated for order {instance.pk}")
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=LoanApplication)
+def count_disbursement(sender, instance, **kwargs):
+    disbursed = instance.disbursement_date is not None
+    if disbursed and not instance._analytics_disbursed:
+        _bump_on_commit(instance.disbursement_date, loans_disbursed=1, loan_amount_disbursed=instance.amount)
+    instance._analytics_disbursed = disbursed
+
+
+# ====================== CHAT ======================
+
+@receiver(m2m_changed, sender=ChatRoom.participants.through)
+def sync_unread_counters(sender, instance, action, reverse, pk_set, **kwargs):
+    """Participants of a room have an unread counter (services/chat.py), from joining to leaving"""
+    from .services import chat
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # user.chat_rooms.add(...): pk_set holds rooms
+        if action == 'post_clear':
+            # The rooms are gone from the table by now; the counters still name them
+            for room_id in list(instance.chat_unread_counters.values_list('room_id', flat=True)):
+                chat.remove_participants(room_id, [instance.pk])
+            return
+        for room_id in pk_set:
+            if action == 'post_add':
+                chat.add_participants(room_id, [instance.pk])
+            else:
+                chat.remove_participants(room_id, [instance.pk])
+    elif action == 'post_add':
+        chat.add_participants(instance.pk, pk_set)
+    else:
+        chat.remove_participants(instance.pk, None if action == 'post_clear' else pk_set)
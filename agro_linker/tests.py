@@ -1,10 +1,698 @@
-# # tests/test_api.py
-# from ninja.testing import TestClient
-# from agro_linker.api.api import api
-
-# client = TestClient(api, urls_namespace="test_api")
-
-# def test_product_list():
-#     response = client.get("/market/products")
-#     assert response.status_code == 200
-#     assert len(response.json()) > 0
\ No newline at end of file
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from channels.testing import WebsocketCommunicator
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from agro_linker.models import (
+    APIToken, Broadcast, BuyerProfile, ChatRoom, FarmerProfile, InventoryHold, LoanApplication, LoanRepayment,
+    Notification, Offer, Order, PriceRollup, PriceTrend, Product, ProductCategory, RepaymentEvent, RepaymentSchedule,
+    ThriftContribution, ThriftGroup, ThriftMembership, User, Wallet, WalletBalanceSnapshot, WalletTransaction,
+)
+from agro_linker.models.finance import SMSGateway
+from agro_linker.services import (
+    chat, export, ledger, notifications, orderbook, price_discovery, repayment_events, repayments, thrift_pot,
+)
+
+API = '/api/v1/v1'
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def make_user(phone, role='FARMER', **fields):
+    return User.objects.create(phone=phone, national_id=phone, role=role, **fields)
+
+
+def api_key(user):
+    return APIToken.objects.create(user=user).key
+
+
+# ====================== LEDGER ======================
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.mobile_money = ledger.system_wallet('mobile_money')
+        self.alice = Wallet.objects.create(user=make_user('+254700000001'))
+        self.bob = Wallet.objects.create(user=make_user('+254700000002'))
+
+    def deposit(self, wallet, amount, reference):
+        return ledger.transfer(reference, self.mobile_money, wallet, amount, 'deposit')
+
+    def balances(self):
+        return {
+            wallet.pk: (wallet.balance, wallet.entry_count)
+            for wallet in Wallet.objects.filter(pk__in=[self.mobile_money.pk, self.alice.pk, self.bob.pk])
+        }
+
+    def test_transfer_moves_balances_and_numbers_entries(self):
+        self.deposit(self.alice, 100, 'DEP-1')
+        entries = ledger.transfer('TR-1', self.alice, self.bob, Decimal('30.50'))
+
+        self.assertEqual(sorted(entry.amount for entry in entries), [Decimal('-30.50'), Decimal('30.50')])
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.mobile_money.refresh_from_db()
+        self.assertEqual((self.alice.balance, self.alice.entry_count), (Decimal('69.50'), 2))
+        self.assertEqual((self.bob.balance, self.bob.entry_count), (Decimal('30.50'), 1))
+        self.assertEqual(self.mobile_money.balance, Decimal(-100))
+        self.assertEqual(
+            list(WalletTransaction.objects.filter(wallet=self.alice).order_by('sequence').values_list('sequence', flat=True)),
+            [1, 2],
+        )
+        self.assertEqual(ledger.verify(), ([], []))
+
+    def test_reposting_a_reference_posts_nothing(self):
+        self.deposit(self.alice, 100, 'DEP-1')
+        first = ledger.transfer('TR-1', self.alice, self.bob, 40)
+        before = self.balances()
+
+        again = ledger.transfer('TR-1', self.alice, self.bob, 40)
+
+        self.assertEqual({entry.pk for entry in again}, {entry.pk for entry in first})
+        self.assertEqual(self.balances(), before)
+        self.assertEqual(ledger.post_many([ledger.Posting('TR-1', [(self.alice, -40), (self.bob, 40)])]), 0)
+        self.assertEqual(WalletTransaction.objects.filter(transaction_reference='TR-1').count(), 2)
+
+    def test_duplicate_references_in_a_batch_post_once(self):
+        postings = [ledger.Posting('DEP-1', [(self.mobile_money, -25), (self.alice, 25)], 'deposit')] * 3
+
+        self.assertEqual(ledger.post_many(postings), 1)
+        self.alice.refresh_from_db()
+        self.assertEqual((self.alice.balance, self.alice.entry_count), (Decimal(25), 1))
+
+    def test_insufficient_funds_rolls_back_the_batch(self):
+        self.deposit(self.alice, 50, 'DEP-1')
+        before = self.balances()
+
+        with self.assertRaises(ledger.InsufficientFunds) as raised:
+            ledger.post_many([
+                ledger.Posting('DEP-2', [(self.mobile_money, -10), (self.bob, 10)]),
+                ledger.Posting('TR-1', [(self.alice, -80), (self.bob, 80)]),
+            ])
+
+        self.assertEqual(raised.exception.wallet_id, self.alice.pk)
+        self.assertEqual(self.balances(), before)
+        self.assertFalse(WalletTransaction.objects.filter(transaction_reference__in=['DEP-2', 'TR-1']).exists())
+        # Nothing was taken: the numbering carries on from the last posted entry
+        self.deposit(self.alice, 30, 'DEP-3')
+        self.assertEqual(WalletTransaction.objects.get(transaction_reference='DEP-3', wallet=self.alice).sequence, 2)
+
+    def test_system_wallets_may_go_negative(self):
+        self.deposit(self.alice, 10, 'DEP-1')
+        self.mobile_money.refresh_from_db()
+        self.assertEqual(self.mobile_money.balance, Decimal(-10))
+
+    def test_invalid_postings_are_rejected(self):
+        with self.assertRaises(ledger.LedgerError):
+            ledger.post('TR-1', [(self.alice, -10), (self.bob, 5)])
+        with self.assertRaises(ledger.LedgerError):
+            ledger.post('TR-2', [(self.alice, -10), (self.alice, 10)])
+        with self.assertRaises(ledger.LedgerError):
+            ledger.post('', [(self.mobile_money, -10), (self.alice, 10)])
+        self.assertFalse(WalletTransaction.objects.exists())
+
+    def test_snapshots_every_n_entries(self):
+        with mock.patch.object(ledger, 'SNAPSHOT_EVERY', 2):
+            for number in range(1, 6):
+                self.deposit(self.alice, 10, f'DEP-{number}')
+
+        self.assertEqual(
+            list(WalletBalanceSnapshot.objects.filter(wallet=self.alice).order_by('sequence').values_list('sequence', 'balance')),
+            [(2, Decimal(20)), (4, Decimal(40))],
+        )
+        # The system wallet had 5 entries too; both get a snapshot of their latest entry
+        self.assertEqual(ledger.take_snapshots(), 2)
+        self.assertEqual(WalletBalanceSnapshot.objects.get(wallet=self.alice, sequence=5).balance, Decimal(50))
+        self.assertEqual(ledger.take_snapshots(), 0)
+
+    def test_balance_as_of(self):
+        start = timezone.make_aware(datetime(2026, 1, 1, 12))
+        with mock.patch.object(ledger, 'SNAPSHOT_EVERY', 2):
+            for day, (reference, amount) in enumerate([('DEP-1', 100), ('DEP-2', 50), ('DEP-3', 25)]):
+                with mock.patch('django.utils.timezone.now', return_value=start + timedelta(days=day)):
+                    self.deposit(self.alice, amount, reference)
+            with mock.patch('django.utils.timezone.now', return_value=start + timedelta(days=3)):
+                ledger.transfer('TR-1', self.alice, self.bob, 60)
+
+        # Snapshots after DEP-2 (day 1) and TR-1 (day 3)
+        self.assertEqual(ledger.balance_as_of(self.alice, start - timedelta(hours=1)), Decimal(0))
+        self.assertEqual(ledger.balance_as_of(self.alice, start), Decimal(100))
+        self.assertEqual(ledger.balance_as_of(self.alice, start + timedelta(days=1)), Decimal(150))
+        self.assertEqual(ledger.balance_as_of(self.alice, start + timedelta(days=2, hours=1)), Decimal(175))
+        self.assertEqual(ledger.balance_as_of(self.alice, start + timedelta(days=3)), Decimal(115))
+        self.assertEqual(ledger.balance_as_of(self.bob.pk, start + timedelta(days=3)), Decimal(60))
+        self.alice.refresh_from_db()
+        self.assertEqual(ledger.balance_as_of(self.alice, timezone.now()), self.alice.balance)
+
+
+# ====================== REPAYMENTS ======================
+
+class RepaymentTests(TestCase):
+    def setUp(self):
+        self.farmer = FarmerProfile.objects.create(user=make_user('+254700000001'), farm_size=2, location={})
+        self.loan = self.make_loan('LOAN-1', 300)
+        RepaymentSchedule.objects.bulk_create([
+            RepaymentSchedule(loan=self.loan, installment_number=number, amount=100,
+                              due_date=date(2026, 1, 1) + timedelta(days=30 * number))
+            for number in (1, 2, 3)
+        ])
+
+    def make_loan(self, reference, amount, status='disbursed'):
+        return LoanApplication.objects.create(
+            farmer=self.farmer, amount=amount, purpose='Seed', repayment_period_months=3, interest_rate=0,
+            collateral_details='', reference_id=reference, status=status,
+        )
+
+    def installments(self):
+        return list(
+            RepaymentSchedule.objects.filter(loan=self.loan).order_by('installment_number')
+            .values_list('amount_paid', 'status')
+        )
+
+    def test_payment_fills_the_oldest_installments_first(self):
+        result, = repayments.post_repayments([repayments.Payment('LOAN-1', Decimal(150), 'MP-1')])
+
+        self.assertEqual((result.status, result.balance), (repayments.POSTED, Decimal(150)))
+        self.assertEqual(self.installments(), [(Decimal(100), 'paid'), (Decimal(50), 'partially_paid'), (None, 'pending')])
+        self.loan.refresh_from_db()
+        self.assertEqual((self.loan.amount_paid, self.loan.status), (Decimal(150), 'partially_paid'))
+
+    def test_payments_of_a_batch_continue_the_waterfall(self):
+        results = repayments.post_repayments([
+            repayments.Payment('LOAN-1', Decimal(80), 'MP-2', date(2026, 2, 2)),
+            repayments.Payment('LOAN-1', Decimal(70), 'MP-1', date(2026, 2, 1)),
+        ])
+
+        self.assertEqual([result.status for result in results], [repayments.POSTED] * 2)
+        self.assertEqual(self.installments(), [(Decimal(100), 'paid'), (Decimal(50), 'partially_paid'), (None, 'pending')])
+        self.assertEqual(LoanRepayment.objects.filter(loan=self.loan).count(), 2)
+
+    def test_overpayment_repays_the_loan_and_stays_on_it(self):
+        result, = repayments.post_repayments([repayments.Payment('LOAN-1', Decimal(350), 'MP-1')])
+
+        self.assertEqual(result.balance, Decimal(0))
+        self.assertEqual(self.installments(), [(Decimal(100), 'paid')] * 3)
+        self.loan.refresh_from_db()
+        self.assertEqual((self.loan.amount_paid, self.loan.status), (Decimal(350), 'repaid'))
+
+    def test_duplicate_references_are_not_posted_again(self):
+        results = repayments.post_repayments([
+            repayments.Payment('LOAN-1', Decimal(100), 'MP-1'),
+            repayments.Payment('LOAN-1', Decimal(100), 'MP-1'),
+        ])
+        retried, = repayments.post_repayments([repayments.Payment('LOAN-1', Decimal(100), 'MP-1')])
+
+        self.assertEqual([result.status for result in results], [repayments.POSTED, repayments.DUPLICATE])
+        self.assertEqual(retried.status, repayments.DUPLICATE)
+        self.assertEqual(LoanRepayment.objects.filter(transaction_reference='MP-1').count(), 1)
+        self.loan.refresh_from_db()
+        self.assertEqual(self.loan.amount_paid, Decimal(100))
+        self.assertEqual(self.installments()[1], (None, 'pending'))
+
+    def test_invalid_payments_are_rejected(self):
+        self.make_loan('LOAN-2', 100, status='pending')
+        results = repayments.post_repayments([
+            repayments.Payment('LOAN-1', Decimal(0), 'MP-1'),
+            repayments.Payment('LOAN-1', Decimal(10), ''),
+            repayments.Payment('NO-SUCH-LOAN', Decimal(10), 'MP-2'),
+            repayments.Payment('LOAN-2', Decimal(10), 'MP-3'),
+        ])
+
+        self.assertEqual([result.status for result in results], [repayments.REJECTED] * 4)
+        self.assertFalse(LoanRepayment.objects.exists())
+        self.assertEqual(self.installments(), [(None, 'pending')] * 3)
+
+    def test_loan_without_installments_is_repaid_by_its_amount(self):
+        self.make_loan('LOAN-2', 100, status='approved')
+
+        first, = repayments.post_repayments([repayments.Payment('LOAN-2', Decimal(60), 'MP-1')])
+        second, = repayments.post_repayments([repayments.Payment('LOAN-2', Decimal(40), 'MP-2')])
+
+        self.assertEqual((first.balance, second.balance), (Decimal(40), Decimal(0)))
+        self.assertEqual(LoanApplication.objects.get(reference_id='LOAN-2').status, 'repaid')
+
+    def test_worker_keeps_the_results_of_chunks_committed_before_a_failure(self):
+        repayment_events.receive([
+            {'loan_reference': 'LOAN-1', 'amount': 100, 'transaction_reference': reference}
+            for reference in ('MP-1', 'MP-2')
+        ])
+        post = repayments._post
+        calls = []
+
+        def fail_second_chunk(payments):
+            calls.append(payments)
+            if len(calls) == 2:
+                raise RuntimeError('connection lost')
+            return post(payments)
+
+        with mock.patch.object(repayments, 'BATCH_SIZE', 1), \
+                mock.patch.object(repayments, '_post', side_effect=fail_second_chunk):
+            repayment_events.process_pending()
+
+        events = RepaymentEvent.objects.order_by('transaction_reference')
+        self.assertEqual([event.result['status'] for event in events], [repayments.POSTED] * 2)
+        self.assertEqual(LoanRepayment.objects.filter(loan=self.loan).count(), 2)
+
+
+# ====================== API KEYS ======================
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class ChatApiTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('+254700000001')
+        self.bob = make_user('+254700000002')
+        self.key = api_key(self.alice)
+        self.room = ChatRoom.objects.create()
+        self.room.participants.add(self.alice, self.bob)
+        self.message, = chat.save_messages([(self.room.pk, self.bob.pk, 'Maize is ready')])
+
+    def get(self, path, key=None):
+        return self.client.get(f'{API}{path}', HTTP_X_API_KEY=key or self.key)
+
+    def test_requests_without_a_valid_key_are_refused(self):
+        self.assertEqual(self.client.get(f'{API}/chat/unread').status_code, 401)
+        self.assertEqual(self.get('/chat/unread', key='not-a-key').status_code, 401)
+        self.alice.is_active = False
+        self.alice.save()
+        self.assertEqual(self.get('/chat/unread').status_code, 401)
+
+    def test_unread_count(self):
+        response = self.get('/chat/unread')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'unread': 1})
+
+    def test_inbox(self):
+        response = self.get('/chat/rooms')
+
+        self.assertEqual(response.status_code, 200)
+        room, = response.json()['items']
+        self.assertEqual((room['room_id'], room['unread_count']), (self.room.pk, 1))
+
+    def test_room_messages(self):
+        response = self.get(f'/chat/rooms/{self.room.pk}/messages')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([message['content'] for message in response.json()['items']], ['Maize is ready'])
+        outsider = api_key(make_user('+254700000003'))
+        self.assertEqual(self.get(f'/chat/rooms/{self.room.pk}/messages', key=outsider).status_code, 404)
+
+    def test_mark_room_read(self):
+        response = self.client.post(
+            f'{API}/chat/rooms/{self.room.pk}/read', {'up_to': self.message.pk},
+            content_type='application/json', HTTP_X_API_KEY=self.key,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'unread_count': 0, 'last_read_id': self.message.pk})
+        self.assertEqual(self.get('/chat/unread').json(), {'unread': 0})
+
+
+# ====================== CHAT SOCKETS ======================
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class ChatSocketTests(TransactionTestCase):
+    def setUp(self):
+        self.user = make_user('+254700000001')
+        self.key = api_key(self.user)
+
+    async def handshake(self, path='/ws/chat/', headers=()):
+        from project.asgi import application
+
+        communicator = WebsocketCommunicator(
+            application, path, headers=[(b'origin', b'http://testserver'), *headers],
+        )
+        connected, code = await communicator.connect()
+        await communicator.disconnect()
+        return connected, code
+
+    async def test_api_key_is_accepted(self):
+        self.assertEqual(await self.handshake(headers=[(b'x-api-key', self.key.encode())]), (True, None))
+        self.assertEqual(await self.handshake(f'/ws/chat/?token={self.key}'), (True, None))
+
+    async def test_missing_or_unknown_key_is_rejected(self):
+        self.assertEqual(await self.handshake(), (False, 4401))
+        self.assertEqual(await self.handshake(headers=[(b'x-api-key', b'not-a-key')]), (False, 4401))
+
+
+# ====================== THRIFT ======================
+
+class ThriftApiTests(TestCase):
+    def setUp(self):
+        self.admin = make_user('+254700000001')
+        self.member = make_user('+254700000002')
+        self.admin_key, self.member_key = api_key(self.admin), api_key(self.member)
+        self.group = ThriftGroup.objects.create(
+            name='Chama', admin=self.admin, meeting_schedule='Saturdays', contribution_amount=100, cycle_duration=2,
+        )
+        memberships = [
+            ThriftMembership.objects.create(group=self.group, user=user, rotation_order=order)
+            for order, user in enumerate([self.admin, self.member], start=1)
+        ]
+        for number, membership in enumerate(memberships, start=1):
+            ThriftContribution.objects.create(
+                membership=membership, cycle=1, amount=100, payment_method='MOBILE_MONEY',
+                transaction_reference=f'MP{number}',
+            )
+
+    def reconcile(self, name, content, key=None):
+        return self.client.post(
+            f'{API}/thrift/groups/{self.group.pk}/reconcile', {'statement': SimpleUploadedFile(name, content)},
+            HTTP_X_API_KEY=key or self.admin_key,
+        )
+
+    def test_get_pot(self):
+        response = self.client.get(f'{API}/thrift/groups/{self.group.pk}/pot', HTTP_X_API_KEY=self.member_key)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['cycle'], 1)
+
+    def test_admin_rotates_the_payout(self):
+        path = f'{API}/thrift/rotate-payout/{self.group.pk}'
+        thrift_pot.verify_contributions(ThriftContribution.objects.values_list('pk', flat=True))
+
+        self.assertEqual(self.client.post(path, HTTP_X_API_KEY=self.member_key).status_code, 403)
+        response = self.client.post(path, HTTP_X_API_KEY=self.admin_key)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['beneficiary'], response.json()['amount']), (str(self.admin.pk), 200))
+        self.assertEqual(self.client.post(path, HTTP_X_API_KEY=self.admin_key).status_code, 400)
+
+    def test_admin_reconciles_a_statement(self):
+        response = self.reconcile('statement.csv', b'Receipt No.,Paid In\nMP1,100.00\nMP9,50\n')
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['verified'], report['unknown'], report['missing']), (1, ['MP9'], ['MP2']))
+        self.assertTrue(ThriftContribution.objects.get(transaction_reference='MP1').is_verified)
+
+    def test_only_the_admin_may_reconcile(self):
+        response = self.reconcile('statement.csv', b'reference,amount\nMP1,100\n', key=self.member_key)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ThriftContribution.objects.filter(is_verified=True).exists())
+
+    def test_unreadable_statements_are_refused(self):
+        for name, content in [
+            ('statement.json', b'[{"reference": "MP1", "amount": 100}, "MP2"]'),
+            ('statement.json', b'{"reference": "MP1", "amount": 100}'),
+            ('statement.jsonl', b'{"reference": "MP1", "amount": 100}\n[1, 2]\n'),
+            ('statement.csv', b'reference,amount\n"' + b'x' * 200000 + b'",100\n'),
+            ('statement.csv', b'\xff\xfe'),
+        ]:
+            with self.subTest(name=name, content=content):
+                self.assertEqual(self.reconcile(name, content).status_code, 400)
+
+
+# ====================== BROADCASTS ======================
+
+class BroadcastApiTests(TestCase):
+    def setUp(self):
+        self.staff_key = api_key(make_user('+254700000001', role='ADMIN', is_staff=True))
+        self.farmer_key = api_key(make_user('+254700000002'))
+
+    def post(self, path, payload=None, key=None):
+        return self.client.post(
+            f'{API}/whatsapp{path}', payload or {}, content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {key or self.staff_key}',
+        )
+
+    def test_staff_create_follow_and_cancel_a_broadcast(self):
+        response = self.post('/broadcasts', {'message': 'Rain expected tomorrow', 'roles': ['FARMER']})
+        self.assertEqual(response.status_code, 201)
+        broadcast_id = response.json()['id']
+
+        response = self.client.get(
+            f'{API}/whatsapp/broadcasts/{broadcast_id}', HTTP_AUTHORIZATION=f'Bearer {self.staff_key}')
+        self.assertEqual((response.status_code, response.json()['status']), (200, Broadcast.Status.QUEUED))
+
+        self.assertEqual(self.post(f'/broadcasts/{broadcast_id}/cancel').status_code, 200)
+        self.assertEqual(self.post(f'/broadcasts/{broadcast_id}/cancel').status_code, 409)
+
+    def test_broadcasts_are_staff_only(self):
+        self.assertEqual(self.post('/broadcasts', {'message': 'Hi'}, key=self.farmer_key).status_code, 401)
+        self.assertEqual(self.post('/broadcasts', {'message': 'Hi'}, key='not-a-key').status_code, 401)
+        self.assertEqual(
+            self.client.post(f'{API}/whatsapp/broadcasts', {'message': 'Hi'}, content_type='application/json').status_code,
+            401,
+        )
+        self.assertFalse(Broadcast.objects.exists())
+
+    def test_invalid_broadcasts_are_refused(self):
+        self.assertEqual(self.post('/broadcasts', {'roles': ['FARMER']}).status_code, 400)
+        self.assertEqual(self.post('/broadcasts', {'message': 'Hi', 'roles': ['PIRATE']}).status_code, 400)
+
+
+# ====================== EXPORT ======================
+
+@mock.patch.object(export, 'WATERMARK_LAG', timedelta(0))
+class ExportApiTests(TestCase):
+    def setUp(self):
+        self.staff_key = api_key(make_user('+254700000001', role='ADMIN', is_staff=True))
+
+    def add_price(self, day, price):
+        return PriceTrend.objects.create(
+            crop_type='maize', market='Nairobi', date=day, avg_price=price, min_price=price, max_price=price,
+        )
+
+    def export(self, dataset, key=None, **params):
+        response = self.client.get(
+            f'{API}/export/{dataset}', params, HTTP_AUTHORIZATION=f'Bearer {key or self.staff_key}')
+        if response.status_code != 200:
+            return response, None
+        import pyarrow as pa
+
+        return response, pa.ipc.open_stream(b''.join(response.streaming_content)).read_all()
+
+    def test_staff_export_a_dataset(self):
+        self.add_price(date(2026, 3, 1), 40)
+
+        response, table = self.export('price_trends')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Export-Watermark'], 'updated_at')
+        self.assertEqual(table.column('crop_type').to_pylist(), ['maize'])
+
+    def test_exports_are_staff_only(self):
+        farmer_key = api_key(make_user('+254700000002'))
+
+        self.assertEqual(self.export('orders', key=farmer_key)[0].status_code, 401)
+        self.assertEqual(self.client.get(f'{API}/export/orders').status_code, 401)
+
+    def test_rows_backfilled_for_past_dates_are_exported_next_time(self):
+        corrected = self.add_price(date(2026, 3, 1), 40)
+        response, _ = self.export('price_trends')
+        since = response['X-Export-Until']
+
+        self.add_price(date(2025, 12, 1), 35)
+        corrected.avg_price = 42
+        corrected.save()
+        _, table = self.export('price_trends', since=since)
+
+        self.assertEqual(sorted(table.column('date').to_pylist()), [date(2025, 12, 1), date(2026, 3, 1)])
+        response, _ = self.export('price_trends', since=since)
+        _, table = self.export('price_trends', since=response['X-Export-Until'])
+        self.assertEqual(table.num_rows, 0)
+
+    def test_unknown_dataset_or_watermark(self):
+        self.assertEqual(self.export('passwords')[0].status_code, 404)
+        self.assertEqual(self.export('bids', since='yesterday')[0].status_code, 400)
+
+
+# ====================== ORDERS ======================
+
+class OrderApiTests(TestCase):
+    def setUp(self):
+        category = ProductCategory.objects.create(name='Grains')
+        self.products, self.farmer_keys = [], []
+        for phone, name in [('+254700000001', 'maize'), ('+254700000002', 'beans')]:
+            farmer = make_user(phone)
+            FarmerProfile.objects.create(user=farmer, farm_size=2)
+            self.farmer_keys.append(api_key(farmer))
+            self.products.append(Product.objects.create(
+                farmer=farmer.farmer_profile, category=category, name=name,
+                price=50, quantity=100, status=Product.Status.ACTIVE,
+            ))
+        self.buyer = make_user('+254700000003', role='BUYER')
+        BuyerProfile.objects.create(user=self.buyer, company_name='Mills', license_number='L1', business_type='retailer')
+        self.buyer_key = api_key(self.buyer)
+
+    def get(self, path, key):
+        return self.client.get(f'{API}/orders{path}', HTTP_X_API_KEY=key)
+
+    def post(self, path, data, key):
+        return self.client.post(f'{API}/orders{path}', data, content_type='application/json', HTTP_X_API_KEY=key)
+
+    def place_cart(self):
+        response = self.post('/', [{'product_id': str(product.pk), 'quantity': 10} for product in self.products],
+                             self.buyer_key)
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def test_cart_is_listed_for_its_buyer_and_farmers(self):
+        order_id = self.place_cart()
+
+        for key in [self.buyer_key, *self.farmer_keys]:
+            response = self.get('/', key)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([order['id'] for order in response.json()['items']], [order_id])
+
+    def test_orders_need_an_api_key(self):
+        self.assertEqual(self.client.get(f'{API}/orders/').status_code, 401)
+        self.assertEqual(self.post('/', [], 'unknown').status_code, 401)
+
+    def test_only_buyers_place_orders(self):
+        response = self.post('/', [{'product_id': str(self.products[0].pk), 'quantity': 10}], self.farmer_keys[0])
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_each_farmer_of_a_cart_accepts_their_own_items(self):
+        order_id = self.place_cart()
+
+        self.assertEqual(self.post(f'/orders/{order_id}/accept', {}, self.buyer_key).status_code, 403)
+        self.assertEqual(self.post(f'/orders/{order_id}/accept', {}, self.farmer_keys[0]).status_code, 200)
+        committed = InventoryHold.objects.filter(order_id=order_id, status=InventoryHold.Status.COMMITTED)
+        self.assertEqual(list(committed.values_list('product_id', flat=True)), [self.products[0].pk])
+
+        self.assertEqual(self.post(f'/orders/{order_id}/accept', {}, self.farmer_keys[1]).status_code, 200)
+        self.assertEqual(committed.count(), 2)
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].quantity, 90)
+
+    def test_buyer_updates_the_payment_status(self):
+        order_id = self.place_cart()
+
+        response = self.post(f'/{order_id}/status', {'status': 'PAID'}, self.buyer_key)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['payment_status'], 'PAID')
+        self.assertEqual(self.post(f'/{order_id}/status', {'status': 'GIFTED'}, self.buyer_key).status_code, 400)
+        stranger = api_key(make_user('+254700000004', role='BUYER'))
+        self.assertEqual(self.post(f'/{order_id}/status', {'status': 'FAILED'}, stranger).status_code, 403)
+
+    def test_matched_offers_are_listed_for_their_buyer(self):
+        offer = Offer.objects.create(
+            product=self.products[0], buyer=self.buyer, amount=55, quantity=20,
+            delivery_address='Eldoret', delivery_date=date(2026, 11, 1),
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+
+        order, = orderbook.match_offers(self.products[0].pk)
+
+        self.assertEqual(order.buyer_id, self.buyer.buyer_profile.pk)
+        self.assertEqual([item['bid_id'] for item in self.get('/', self.buyer_key).json()['items']], [offer.pk])
+        self.assertEqual(self.post(f'/orders/{order.pk}/accept', {}, self.farmer_keys[0]).status_code, 200)
+
+
+# ====================== NOTIFICATIONS ======================
+
+class NotificationDispatchTests(TestCase):
+    def setUp(self):
+        self.local = make_user('0711000001')
+        self.international = make_user('+254711000002')
+        for user in (self.local, self.international):
+            notifications.enqueue(user, 'Maize prices are up', types=['SMS'])
+
+    def dispatch(self, **provider):
+        with mock.patch.object(SMSGateway, '_send_bulk_africastalking', mock.AsyncMock(**provider)) as send:
+            notifications.dispatch_pending(max_batches=1)
+        return send
+
+    def statuses(self):
+        return dict(Notification.objects.values_list('user__phone', 'status'))
+
+    def http_error(self, status):
+        import aiohttp
+        from yarl import URL
+
+        url = URL('https://api.africastalking.com/version1/messaging')
+        return aiohttp.ClientResponseError(aiohttp.RequestInfo(url, 'POST', {}, url), (), status=status)
+
+    def test_report_numbers_match_local_phones(self):
+        send = self.dispatch(return_value={'SMSMessageData': {'Recipients': [
+            {'number': '+254711000001', 'status': 'Success'},
+            {'number': '+254711000002', 'status': 'Success'},
+        ]}})
+
+        send.assert_awaited_once()
+        self.assertEqual(set(self.statuses().values()), {'SENT'})
+
+    def test_recipients_the_provider_failed_are_retried(self):
+        self.dispatch(return_value={'SMSMessageData': {'Recipients': [
+            {'number': '+254711000001', 'status': 'Success'},
+            {'number': '+254711000002', 'status': 'InternalServerError'},
+        ]}})
+
+        self.assertEqual(self.statuses(), {'0711000001': 'SENT', '+254711000002': 'PENDING'})
+
+    def test_refused_requests_are_not_retried(self):
+        self.dispatch(side_effect=self.http_error(401))
+        self.assertEqual(set(self.statuses().values()), {'FAILED'})
+
+    def test_outages_are_retried(self):
+        self.dispatch(side_effect=self.http_error(503))
+        self.assertEqual(set(self.statuses().values()), {'PENDING'})
+
+
+# ====================== PRICE DISCOVERY ======================
+
+class PriceDiscoveryTests(TestCase):
+    def setUp(self):
+        for market, price in [('Nairobi', 40), ('Mombasa', 60)]:
+            PriceTrend.objects.create(
+                crop_type='Maize', market=market, date=timezone.localdate(), avg_price=price, min_price=price,
+                max_price=price,
+            )
+
+    def test_market_reports_give_entries_per_market(self):
+        entries = price_discovery.entries(price_discovery.observations(['maize']))
+
+        self.assertEqual(set(entries), {'maize', 'maize@nairobi', 'maize@mombasa'})
+        self.assertEqual((entries['maize@nairobi']['price'], entries['maize@mombasa']['price']), (40, 60))
+
+    def test_refresh_removes_markets_without_reports(self):
+        client = mock.Mock()
+        client.hkeys.return_value = [b'maize', b'maize@kisumu', b'beans@kisumu']
+
+        with mock.patch.object(price_discovery, 'redis_client', return_value=client), \
+                mock.patch.object(price_discovery, 'publish') as publish:
+            self.assertEqual(price_discovery.refresh(['Maize']), (3, 1))
+
+        changed, removed = publish.call_args.args
+        self.assertEqual(removed, {'maize@kisumu'})
+
+
+# ====================== PRICE ROLLUPS ======================
+
+class PriceRollupTests(TestCase):
+    def save(self, trend):
+        with self.captureOnCommitCallbacks(execute=True):
+            trend.save()
+
+    def rollups(self):
+        return set(PriceRollup.objects.values_list('market', 'resolution', 'period_start', 'days'))
+
+    def test_moved_rows_leave_their_old_periods(self):
+        trend = PriceTrend(crop_type='maize', market='Nairobi', date=date(2025, 12, 31), avg_price=40,
+                           min_price=38, max_price=42)
+        self.save(trend)
+
+        trend.date, trend.market = date(2026, 1, 2), 'Eldoret'
+        self.save(trend)
+
+        self.assertEqual(self.rollups(), {
+            ('Eldoret', 'week', date(2025, 12, 29), 1),
+            ('Eldoret', 'month', date(2026, 1, 1), 1),
+            ('Eldoret', 'year', date(2026, 1, 1), 1),
+        })
+
+    def test_rows_loaded_without_their_period_are_moved_too(self):
+        self.save(PriceTrend(crop_type='maize', market='Nairobi', date=date(2026, 3, 2), avg_price=40,
+                             min_price=38, max_price=42))
+
+        trend = PriceTrend.objects.only('pk', 'avg_price').get()
+        trend.crop_type = 'beans'
+        self.save(trend)
+
+        self.assertEqual(set(PriceRollup.objects.values_list('crop_type', flat=True)), {'beans'})
@@ -1,2 +1,2 @@
- # External API integrations
-
+ # External API integrations
+
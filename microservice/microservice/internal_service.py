@@ -1 +1 @@
-# internal related services
+# internal related services
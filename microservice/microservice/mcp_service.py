@@ -1,11 +1,61 @@
-from fastapi import FastAPI
-from fastmcp import MCPServer
-
-app = FastAPI()
-mcp_server = MCPServer(app)
-
-@mcp_server.procedure("agro.price_discovery")
-async def price_discovery(params: dict):
-    crop_type = params.get("crop_type")
-    # Simulate price lookup or computation
-    return {"price": 340.5, "crop_type": crop_type}
+from fastapi import FastAPI
+from fastmcp import MCPServer
+
+from .price_index import price_index
+from .redis_service import get_json
+
+app = FastAPI()
+mcp_server = MCPServer(app)
+
+# Published by the Django app (agro_linker/services/forecasting.py)
+FORECAST_KEY = "agro:forecast"
+
+
+def forecast_key(crop_type, market=None):
+    parts = [FORECAST_KEY, crop_type.strip().lower()]
+    if market:
+        parts.append(market.strip().lower())
+    return ":".join(parts)
+
+
+@app.on_event("startup")
+async def start_price_index():
+    price_index.start()
+
+
+@app.on_event("shutdown")
+async def stop_price_index():
+    await price_index.stop()
+
+
+@mcp_server.procedure("agro.price_discovery")
+async def price_discovery(params: dict):
+    """
+    Reference price of a crop, in ``market`` when given, from the
+    in-process index (no I/O); the forecast, which is a Redis read, only
+    with ``include_forecast``. A forecast Redis cannot serve is left out.
+    """
+    crop_type = params.get("crop_type")
+    market = params.get("market")
+    if not crop_type:
+        return {"error": "crop_type is required"}
+    entry = price_index.get(crop_type, market)
+    if entry is None:
+        return {"price": None, "crop_type": crop_type, "market": market, "error": "No recent prices"}
+    result = {
+        "price": entry["price"],
+        "crop_type": crop_type,
+        "market": market,
+        "unit": entry["unit"],
+        "median": entry["median"],
+        "low": entry["low"],
+        "high": entry["high"],
+        "volume": entry["volume"],
+        "sources": entry["sources"],
+        "window_days": entry["window_days"],
+        "updated_at": entry["updated_at"],
+    }
+    if params.get("include_forecast"):
+        forecast = await get_json(forecast_key(crop_type, market))
+        result["forecast"] = forecast["forecast"] if forecast else None
+    return result
@@ -0,0 +1,83 @@
+# In-process copy of the price discovery index published by the Django app
+# (agro_linker/services/price_discovery.py). Lookups are dict reads; a
+# background task fetches only the crops whose version moved since the
+# last sync.
+import asyncio
+import json
+import logging
+import os
+
+from .redis_service import get_redis
+
+logger = logging.getLogger(__name__)
+
+INDEX_KEY = "agro:price_index"
+CHANGES_KEY = f"{INDEX_KEY}:changes"
+SYNC_INTERVAL = float(os.getenv("PRICE_INDEX_SYNC_INTERVAL", "1.0"))
+
+
+class PriceIndex:
+    def __init__(self, interval=SYNC_INTERVAL):
+        self.interval = interval
+        self.entries = {}
+        self.version = 0
+        self.loaded = False
+        self._task = None
+
+    def get(self, crop_type, market=None):
+        """Entry of a crop, or of the crop in one market (keyed crop@market)"""
+        key = crop_type.strip().lower()
+        if market:
+            key = f"{key}@{market.strip().lower()}"
+        return self.entries.get(key)
+
+    async def load(self):
+        """Replace the copy with the whole index"""
+        redis = get_redis()
+        # The version is read first: entries written meanwhile are fetched again by the next sync
+        latest = await redis.zrevrange(CHANGES_KEY, 0, 0, withscores=True)
+        entries = await redis.hgetall(INDEX_KEY)
+        self.entries = {crop: json.loads(entry) for crop, entry in entries.items()}
+        self.version = int(latest[0][1]) if latest else 0
+        self.loaded = True
+
+    async def sync(self):
+        """Apply the changes since the last sync; returns how many crops changed"""
+        if not self.loaded:
+            await self.load()
+            return len(self.entries)
+        redis = get_redis()
+        changes = await redis.zrangebyscore(CHANGES_KEY, f"({self.version}", "+inf", withscores=True)
+        if not changes:
+            return 0
+        crops = [crop for crop, _ in changes]
+        for crop, entry in zip(crops, await redis.hmget(INDEX_KEY, crops)):
+            if entry is None:
+                self.entries.pop(crop, None)
+            else:
+                self.entries[crop] = json.loads(entry)
+        self.version = max(int(version) for _, version in changes)
+        return len(crops)
+
+    async def run(self):
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Calls keep being served from the last copy
+                logger.exception("Price index sync failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+price_index = PriceIndex()
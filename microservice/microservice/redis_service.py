@@ -0,0 +1,29 @@
+# Shared Redis client of the microservice
+import json
+import logging
+import os
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+_client = None
+
+
+def get_redis():
+    global _client
+    if _client is None:
+        _client = redis.from_url(REDIS_URL, decode_responses=True)
+    return _client
+
+
+async def get_json(key):
+    """The JSON value of ``key``; None when missing or when Redis is unreachable"""
+    try:
+        raw = await get_redis().get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Redis read of {key} failed: {str(e)}")
+        return None
+    return json.loads(raw) if raw else None
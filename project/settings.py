@@ -77,6 +77,7 @@ INSTALLED_APPS = [
     "ninja",
     "corsheaders",
     "django_redis",
+    "channels",
     # "django.contrib.postgres",  # For PostgreSQL specific features
 
 ]
@@ -105,8 +106,180 @@ CACHES["backup"] = {
     "LOCATION": "fallback",
 }
 
-NINJA_PAGINATION_CLASS = 'ninja.pagination.LimitOffsetPagination'
-NINJA_LIMIT_OFFSET_PAGINATION_DEFAULT_LIMIT = 50
+# Rendered GET responses of the Ninja API, tagged by model and invalidated
+# from model signals (agro_linker/api/v1/optimizations.py)
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = 60 * 5
+
+# In-memory order books (agro_linker/services/orderbook.py)
+ORDER_BOOK_AUTO_MATCH = True
+ORDER_BOOK_MAX_AGE = 60 * 5
+ORDER_BOOK_MATCH_BATCH_SIZE = 100
+
+# Inventory holds (agro_linker/services/inventory.py)
+INVENTORY_HOLD_TTL = 60 * 15
+INVENTORY_RELEASE_BATCH_SIZE = 500
+
+# Pooled HTTP transport of the integration providers (agro_linker/services/transport.py);
+# any key can be overridden per provider in its {NAMESPACE}_PROVIDERS config
+INTEGRATION_TRANSPORT = {
+    'timeout': 30,
+    'pool_size': 20,
+    'max_concurrency': 20,
+    'max_retries': 3,
+    'backoff_base': 0.5,
+    'backoff_cap': 10,
+    'failure_threshold': 5,
+    'reset_timeout': 30,
+}
+
+# Notification dispatch (agro_linker/services/notifications.py); rate limits are
+# messages per second per "TYPE:provider", shared by all dispatcher workers
+NOTIFICATION_PROVIDERS = {
+    'SMS': 'africastalking',
+    'WHATSAPP': 'meta',
+    'EMAIL': 'sendgrid',
+}
+NOTIFICATION_RATE_LIMITS = {
+    'SMS:africastalking': 100,
+    'WHATSAPP:meta': 80,
+    'EMAIL:sendgrid': 100,
+}
+NOTIFICATION_BATCH_SIZE = 1000
+NOTIFICATION_MAX_ATTEMPTS = 5
+# Country code of phones stored without one (0711...), to match provider reports
+NOTIFICATION_DEFAULT_COUNTRY_CODE = '254'
+
+# WhatsApp broadcasts (agro_linker/services/broadcast.py): worker processes
+# per `send_broadcasts` run and recipients per chunk handed to a worker
+BROADCAST_WORKERS = 4
+BROADCAST_CHUNK_SIZE = 500
+
+# Analytics backfills (agro_linker/services/analytics.py): worker processes and
+# days each worker builds per task
+ANALYTICS_BACKFILL_WORKERS = 4
+ANALYTICS_BACKFILL_DAYS_PER_TASK = 7
+
+# Columnar exports (agro_linker/services/export.py): rows per Arrow batch, rows
+# per Parquet file, and how far behind now incremental exports stop
+EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+EXPORT_BATCH_SIZE = 50000
+EXPORT_FILE_ROWS = 1000000
+EXPORT_WATERMARK_LAG = 60  # seconds
+
+# Price history charts (agro_linker/services/price_rollups.py): series switch to
+# weekly, monthly then yearly rollups beyond this many points
+PRICE_SERIES_MAX_POINTS = 200
+
+# Redis shared with the MCP service (microservice/), which reads price forecasts
+# and the price discovery index from it
+MCP_REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
+
+# Price forecasting (agro_linker/services/forecasting.py); forecasts are published
+# to Redis as JSON for the MCP service
+FORECAST_HISTORY_DAYS = 730
+FORECAST_HORIZON_DAYS = 30
+FORECAST_HARVEST_DIP = 0.15
+FORECAST_CACHE_TTL = 60 * 60 * 48
+
+# Price discovery (agro_linker/services/price_discovery.py): reference prices per
+# crop from the last PRICE_DISCOVERY_WINDOW_DAYS of trades and quotes. Prices over
+# PRICE_DISCOVERY_MAX_DEVIATION times off the median are dropped and
+# PRICE_DISCOVERY_TRIM of the volume is cut from each tail; one PriceTrend day
+# counts as PRICE_DISCOVERY_TREND_VOLUME kg
+PRICE_DISCOVERY_WINDOW_DAYS = 14
+PRICE_DISCOVERY_MAX_DEVIATION = 3.0
+PRICE_DISCOVERY_TRIM = 0.1
+PRICE_DISCOVERY_TREND_VOLUME = 1000
+PRICE_DISCOVERY_SOURCE_WEIGHTS = {'fill': 1.0, 'offer': 0.5, 'bid': 0.25, 'trend': 1.0}
+
+# Wallet ledger (agro_linker/services/ledger.py): a balance snapshot is taken
+# every LEDGER_SNAPSHOT_EVERY entries of a wallet, bounding balance-as-of reads
+LEDGER_SNAPSHOT_EVERY = 1000
+
+# Loan amortisation (agro_linker/services/amortization.py): due dates on these
+# days (ISO dates) and weekends move to the next business day
+LOAN_HOLIDAYS = []
+AMORTIZATION_BATCH_SIZE = 2000
+
+# Loan repayments (agro_linker/services/repayments.py): payments posted per
+# transaction, and the most one MFI webhook call may carry
+REPAYMENT_BATCH_SIZE = 1000
+REPAYMENT_WEBHOOK_MAX_BATCH = 50000
+
+# MFI repayment webhooks are stored and acknowledged, then posted by
+# manage.py process_repayment_events (agro_linker/services/repayment_events.py);
+# delays are seconds
+REPAYMENT_EVENT_BATCH_SIZE = 1000
+REPAYMENT_EVENT_MAX_ATTEMPTS = 5
+REPAYMENT_EVENT_RETRY_DELAY = 60
+REPAYMENT_EVENT_CLAIM_TIMEOUT = 60 * 10
+
+# Credit scoring (agro_linker/services/credit_scoring.py): component weights,
+# points off per defaulted loan, the revenue/orders/hectares earning full
+# marks, and the limit of a perfect score; limits are cached (seconds)
+# between nightly runs of manage.py score_farmers
+CREDIT_SCORE_WEIGHTS = {
+    'repayment': 0.35,
+    'sales': 0.25,
+    'thrift': 0.15,
+    'farm': 0.15,
+    'verification': 0.10,
+}
+CREDIT_DEFAULT_PENALTY = 150
+CREDIT_SALES_WINDOW_DAYS = 365
+CREDIT_REFERENCE_REVENUE = 500000
+CREDIT_REFERENCE_ORDERS = 24
+CREDIT_REFERENCE_FARM_SIZE = 10
+CREDIT_LIMIT_MAX = 200000
+CREDIT_SCORE_BATCH_SIZE = 20000
+CREDIT_LIMIT_CACHE_TIMEOUT = 60 * 60 * 26
+
+# Thrift statement reconciliation (agro_linker/services/reconciliation.py):
+# statement lines matched per query
+RECONCILIATION_CHUNK_SIZE = 5000
+
+# Thrift cycle scheduler (agro_linker/services/thrift_scheduler.py): penalty
+# for a missed contribution as a share of the contribution, whether closing
+# a cycle pays its pot out in rotation, and how far ahead meetings are created
+THRIFT_MISSED_CONTRIBUTION_PENALTY = 0.1
+THRIFT_AUTO_PAYOUT = False
+THRIFT_MEETING_HORIZON_DAYS = 30
+THRIFT_MEETING_TIME = "10:00"
+
+# WebSockets (project/asgi.py): the Redis channel layer fans chat events out
+# across ASGI processes. Events to a connection that stops reading are
+# dropped past `capacity` per channel, or after `expiry` seconds
+ASGI_APPLICATION = 'project.asgi.application'
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "CONFIG": {
+            "hosts": [os.getenv('CHANNELS_REDIS_URL', 'redis://127.0.0.1:6379/2')],
+            "capacity": 1000,
+            "expiry": 30,
+            "group_expiry": 86400,
+        },
+    },
+}
+
+# Chat (agro_linker/services/chat.py): messages and read receipts are saved in
+# batches every CHAT_FLUSH_INTERVAL seconds or CHAT_FLUSH_SIZE messages; senders
+# are told to retry past CHAT_MAX_PENDING unsaved messages per process. Each
+# connection may send CHAT_RATE_LIMIT frames a second, bursts of CHAT_RATE_BURST
+CHAT_FLUSH_INTERVAL = 0.05
+CHAT_FLUSH_SIZE = 500
+CHAT_MAX_PENDING = 5000
+CHAT_MAX_MESSAGE_LENGTH = 4000
+CHAT_RATE_LIMIT = 10
+CHAT_RATE_BURST = 30
+CHAT_TYPING_INTERVAL = 3
+CHAT_PARTICIPANTS_TTL = 60
+
+# Keyset pagination with signed cursors (agro_linker/api/v1/pagination.py)
+NINJA_PAGINATION_CLASS = 'agro_linker.api.v1.pagination.CursorPagination'
+NINJA_PAGINATION_PER_PAGE = 50
+NINJA_PAGINATION_MAX_LIMIT = 200
 
 
 